@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Offline asset inlining for CV templates.
+
+Replaces remote and local stylesheets (including Google Fonts) with inline
+<style> blocks whose fonts and images are embedded as data: URIs, and embeds
+the CV portrait image the same way. Results are cached on disk, so once the
+cache is warm, rendering needs no network access at all.
+
+Warm the cache on a machine with network access, then copy the cache folder
+to the render nodes:
+
+    python asset_inliner.py
+
+On air-gapped render nodes set CV_OFFLINE=1: assets missing from the cache
+then fail at once instead of waiting for a network timeout. Failed
+downloads and templates that could not be inlined are retried at most every
+INLINE_RETRY_SECONDS, so renders do not keep waiting on an unreachable host.
+"""
+
+import os
+import re
+import sys
+import time
+import base64
+import hashlib
+import mimetypes
+import urllib.parse
+import urllib.request
+
+ASSET_CACHE_DIR = os.getenv("CV_ASSET_CACHE", ".asset_cache")
+
+# Google Fonts serves woff2 files only to browsers it recognises
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+FETCH_TIMEOUT = 30
+
+# Never download; only assets already in the cache can be inlined
+OFFLINE = os.getenv("CV_OFFLINE", "").lower() in ("1", "true", "yes")
+
+# How long a failed download or template inlining is remembered before it is tried again
+INLINE_RETRY_SECONDS = float(os.getenv("CV_INLINE_RETRY_SECONDS", 300))
+
+# URL -> (retry time, error) of recent failed downloads
+_failed_fetches = {}
+
+LINK_PATTERN = re.compile(r'<link\b[^>]*>', re.IGNORECASE)
+IMG_PATTERN = re.compile(r'(<img\b[^>]*\bsrc=)(["\'])([^"\']+)\2', re.IGNORECASE)
+ATTR_PATTERN = re.compile(r'(\w+)\s*=\s*(["\'])(.*?)\2', re.DOTALL)
+CSS_URL_PATTERN = re.compile(r'url\(\s*(["\']?)([^"\')]+)\1\s*\)')
+
+FONT_TYPES = {
+    '.woff2': 'font/woff2',
+    '.woff': 'font/woff',
+    '.ttf': 'font/ttf',
+    '.otf': 'font/otf',
+}
+
+def is_remote(url: str) -> bool:
+    """Whether a reference points at an http(s) resource."""
+    return url.startswith(('http://', 'https://', '//'))
+
+def is_inlinable(url: str) -> bool:
+    """Skip references that are already embedded or filled in at render time."""
+    return bool(url) and not url.startswith(('data:', '#')) and '{{' not in url
+
+def guess_type(url: str, default: str = 'application/octet-stream') -> str:
+    """Guess a MIME type from a URL or path."""
+    path = urllib.parse.urlparse(url).path
+    ext = os.path.splitext(path)[1].lower()
+    return FONT_TYPES.get(ext) or mimetypes.guess_type(path)[0] or default
+
+def fetch_asset(url: str, cache_dir: str = ASSET_CACHE_DIR) -> tuple[bytes, str]:
+    """
+    Download a remote asset, caching it on disk by URL.
+
+    Returns (content, mime_type). A cached copy is used without touching the
+    network, so render nodes only need a warm cache. Raises OSError when the
+    asset is not cached and OFFLINE is set, or when it failed to download
+    less than INLINE_RETRY_SECONDS ago.
+    """
+    if url.startswith('//'):
+        url = 'https:' + url
+
+    assets_dir = os.path.join(cache_dir, "assets")
+    key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    data_path = os.path.join(assets_dir, key)
+    type_path = data_path + ".type"
+
+    if os.path.exists(data_path) and os.path.exists(type_path):
+        with open(data_path, 'rb') as f:
+            content = f.read()
+        with open(type_path, 'r', encoding='utf-8') as f:
+            mime_type = f.read().strip()
+        return content, mime_type
+
+    if OFFLINE:
+        raise OSError(f"{url} is not in the asset cache and CV_OFFLINE is set")
+    failed = _failed_fetches.get(url)
+    if failed is not None and time.monotonic() < failed[0]:
+        raise OSError(f"{url} failed to download recently: {failed[1]}")
+
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    try:
+        with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+            content = response.read()
+            mime_type = response.headers.get_content_type()
+    except OSError as e:
+        _failed_fetches[url] = (time.monotonic() + INLINE_RETRY_SECONDS, e)
+        raise
+    _failed_fetches.pop(url, None)
+    if mime_type in ('application/octet-stream', 'text/plain'):
+        mime_type = guess_type(url, mime_type)
+
+    os.makedirs(assets_dir, exist_ok=True)
+    _write_atomic(data_path, content)
+    _write_atomic(type_path, mime_type.encode('utf-8'))
+    return content, mime_type
+
+def load_asset(ref: str, base: str, cache_dir: str = ASSET_CACHE_DIR) -> tuple[bytes, str, str]:
+    """
+    Load an asset referenced from a document at `base` (a URL or a folder).
+
+    Returns (content, mime_type, resolved_location).
+    """
+    if is_remote(ref):
+        location = ref
+    elif is_remote(base):
+        location = urllib.parse.urljoin(base, ref)
+    else:
+        path = urllib.parse.unquote(ref[len('file://'):] if ref.startswith('file://') else ref)
+        location = path if os.path.isabs(path) else os.path.join(base, path)
+        with open(location, 'rb') as f:
+            return f.read(), guess_type(location), os.path.dirname(location)
+
+    content, mime_type = fetch_asset(location, cache_dir)
+    return content, mime_type, location
+
+def to_data_uri(content: bytes, mime_type: str) -> str:
+    """Encode bytes as a base64 data: URI."""
+    return f"data:{mime_type};base64,{base64.b64encode(content).decode('ascii')}"
+
+def inline_css(css: str, base: str, cache_dir: str = ASSET_CACHE_DIR) -> str:
+    """Embed every url(...) in a stylesheet (fonts, images) as a data: URI."""
+    def replace_url(match):
+        ref = match.group(2).strip()
+        if not is_inlinable(ref):
+            return match.group(0)
+        content, mime_type, _ = load_asset(ref, base, cache_dir)
+        return f"url({to_data_uri(content, mime_type)})"
+
+    return CSS_URL_PATTERN.sub(replace_url, css)
+
+def inline_html_assets(html: str, base_dir: str, cache_dir: str = ASSET_CACHE_DIR) -> str:
+    """
+    Replace stylesheet links and static images in an HTML document with inline content.
+
+    Placeholders such as {{image}} are left for the template engine.
+    Raises OSError (including URLError) if an asset cannot be loaded.
+    """
+    def replace_link(match):
+        tag = match.group(0)
+        attrs = {name.lower(): value for name, _, value in ATTR_PATTERN.findall(tag)}
+        href = attrs.get('href', '')
+        if 'stylesheet' not in attrs.get('rel', '').lower() or not is_inlinable(href):
+            return tag
+
+        content, _, location = load_asset(href, base_dir, cache_dir)
+        css = inline_css(content.decode('utf-8'), location, cache_dir)
+        media = f' media="{attrs["media"]}"' if 'media' in attrs else ''
+        return f"<style{media}>\n{css}\n</style>"
+
+    def replace_img(match):
+        ref = match.group(3)
+        if not is_inlinable(ref):
+            return match.group(0)
+        content, mime_type, _ = load_asset(ref, base_dir, cache_dir)
+        return f"{match.group(1)}{match.group(2)}{to_data_uri(content, mime_type)}{match.group(2)}"
+
+    html = LINK_PATTERN.sub(replace_link, html)
+    return IMG_PATTERN.sub(replace_img, html)
+
+# (stamp, inlined path, retry time) keyed by source path, invalidated when the
+# source changes. Failures map to the source path itself until the retry time.
+_inlined_templates = {}
+
+def inline_template_assets(template_path: str, cache_dir: str = ASSET_CACHE_DIR) -> str:
+    """
+    Return the path of a self-contained copy of a template.
+
+    The copy is built once per template content and stored under
+    <cache_dir>/templates. If an asset cannot be loaded (e.g. no network and
+    a cold cache), a warning is printed and the original template path is
+    returned so rendering can still fall back to the network; that result is
+    reused for INLINE_RETRY_SECONDS before inlining is tried again.
+    """
+    abs_path = os.path.abspath(template_path)
+    stat = os.stat(abs_path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _inlined_templates.get(abs_path)
+    if cached is not None and cached[0] == stamp and (cached[2] is None or time.monotonic() < cached[2]):
+        return cached[1]
+
+    with open(abs_path, 'r', encoding='utf-8') as f:
+        source = f.read()
+
+    digest = hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(abs_path))[0]
+    output_path = os.path.join(cache_dir, "templates", f"{stem}-{digest}.html")
+
+    if not os.path.exists(output_path):
+        try:
+            inlined = inline_html_assets(source, os.path.dirname(abs_path), cache_dir)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Warning: could not inline assets for {template_path}: {e}")
+            _inlined_templates[abs_path] = (stamp, template_path, time.monotonic() + INLINE_RETRY_SECONDS)
+            return template_path
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        _write_atomic(output_path, inlined.encode('utf-8'))
+
+    _inlined_templates[abs_path] = (stamp, output_path, None)
+    return output_path
+
+def inline_cv_image(cv_data: dict, cache_dir: str = ASSET_CACHE_DIR) -> dict:
+    """
+    Return CV data with the portrait image embedded as a data: URI.
+
+    Handles local paths (which pages loaded with set_content cannot read) and
+    remote URLs (downloaded once into the cache). The caller's dict is not
+    modified. If the image cannot be loaded, the data is returned unchanged.
+    """
+    image = cv_data.get('image')
+    if not image or not is_inlinable(image):
+        return cv_data
+
+    try:
+        if is_remote(image):
+            content, mime_type = fetch_asset(image, cache_dir)
+        else:
+            content, mime_type, _ = load_asset(image, os.getcwd(), cache_dir)
+    except OSError as e:
+        print(f"Warning: could not embed image {image}: {e}")
+        return cv_data
+
+    if not mime_type.startswith('image/'):
+        mime_type = guess_type(image, 'image/jpeg')
+    return {**cv_data, 'image': to_data_uri(content, mime_type)}
+
+def _write_atomic(path: str, content: bytes):
+    """Write a file via a temporary name so readers never see a partial file."""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+if __name__ == "__main__":
+    # Warm the cache for every template (or the templates given as arguments)
+    templates_dir = "templates"
+    names = sys.argv[1:] or sorted(f for f in os.listdir(templates_dir) if f.endswith('.html'))
+    for name in names:
+        path = inline_template_assets(os.path.join(templates_dir, name))
+        print(f"{name} -> {path}")
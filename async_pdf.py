@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Concurrent HTML to PDF generation using playwright.async_api.
+
+Spreads render jobs over a few browser instances with a fixed number of
+reusable pages, so many CVs are printed at once instead of one at a time.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+from playwright.async_api import async_playwright
+from main import populate_template
+from asset_inliner import inline_cv_image, inline_template_assets
+from pdf_render import FONTS_READY_SCRIPT, PDF_OPTIONS, write_pdf
+from tracing import span
+
+async def print_pdf_async(page, html: str, output=None) -> bytes:
+    """Load HTML straight into a page and print it to PDF bytes, also written to output if given."""
+    with span("pdf.load", bytes_in=len(html.encode('utf-8'))):
+        await page.set_content(html, wait_until='load')
+
+        # Wait until fonts are ready instead of sleeping for a fixed time
+        await page.evaluate(FONTS_READY_SCRIPT)
+
+    with span("pdf.print") as s:
+        pdf_bytes = await page.pdf(**PDF_OPTIONS)
+        write_pdf(pdf_bytes, output)
+        s.set(bytes_out=len(pdf_bytes))
+    return pdf_bytes
+
+def print_progress(done: int, total: int, result: dict):
+    """Default progress reporter: one line per finished job."""
+    if result['error'] is None:
+        print(f"[{done}/{total}] ✓ {result['output']} ({result['seconds']:.2f}s)")
+    else:
+        print(f"[{done}/{total}] ✗ {result['output']}: {result['error']}")
+
+async def launch_browser(p):
+    """Launch a headless Chromium, timed as a browser.launch span."""
+    with span("browser.launch"):
+        return await p.chromium.launch(headless=True)
+
+async def generate_pdfs_async(jobs: list[tuple], browsers: int = 2, concurrency: int = 4,
+                              on_progress=print_progress) -> list[dict]:
+    """
+    Print many HTML documents to PDF concurrently.
+
+    Args:
+        jobs: (html, output) pairs. output is a file path, a writable binary
+              object, or None to only keep the bytes in the result.
+        browsers: Number of Chromium instances to launch.
+        concurrency: Maximum number of pages rendering at the same time.
+        on_progress: Called as on_progress(done, total, result) after each job, or None.
+
+    Returns:
+        One result dict per job, in job order, with output, pdf (bytes, or
+        None on failure), error (None on success) and seconds.
+    """
+    if browsers < 1 or concurrency < 1:
+        raise ValueError("browsers and concurrency must be at least 1")
+
+    total = len(jobs)
+    results = [None] * total
+    done = 0
+
+    async with async_playwright() as p:
+        instances = await asyncio.gather(*(launch_browser(p) for _ in range(browsers)))
+
+        # Pages are created up front, spread over the browsers, and reused between jobs.
+        # A slot is a (browser, page) pair; None in the queue means every slot was dropped.
+        pages = asyncio.Queue()
+        for i in range(concurrency):
+            await pages.put((instances[i % browsers], await instances[i % browsers].new_page()))
+        live_slots = concurrency
+
+        async def replace_slot(browser, page):
+            """A fresh slot after a failed job, or None if no browser can be started."""
+            try:
+                await page.close()
+            except Exception:
+                pass
+            try:
+                return browser, await browser.new_page()
+            except Exception:
+                pass
+            # The browser itself crashed: relaunch it for this slot
+            try:
+                browser = await launch_browser(p)
+                instances.append(browser)
+                return browser, await browser.new_page()
+            except Exception as e:
+                print(f"Warning: dropping a page slot, could not relaunch the browser: {e}")
+                return None
+
+        def release(slot):
+            nonlocal live_slots
+            if slot is None:
+                live_slots -= 1
+                if live_slots > 0:
+                    return
+            pages.put_nowait(slot)
+
+        async def run(index: int, html: str, output):
+            nonlocal done
+            slot = await pages.get()
+            start = time.perf_counter()
+            pdf_bytes = None
+            error = None
+            if slot is None:
+                # Leave the marker for the other waiting jobs
+                pages.put_nowait(None)
+                error = RuntimeError("No browser left to print with")
+            else:
+                browser, page = slot
+                try:
+                    pdf_bytes = await print_pdf_async(page, html, output)
+                except Exception as e:
+                    error = e
+                    # Replace the page in case it crashed or is stuck mid-navigation
+                    slot = await replace_slot(browser, page)
+                release(slot)
+
+            result = {
+                'output': output,
+                'pdf': pdf_bytes,
+                'error': error,
+                'seconds': time.perf_counter() - start,
+            }
+            results[index] = result
+            done += 1
+            if on_progress is not None:
+                on_progress(done, total, result)
+
+        try:
+            await asyncio.gather(*(run(i, html, output) for i, (html, output) in enumerate(jobs)))
+        finally:
+            await asyncio.gather(*(browser.close() for browser in instances), return_exceptions=True)
+
+    return results
+
+async def generate_cvs_async(cv_jobs: list[tuple], browsers: int = 2, concurrency: int = 4,
+                             on_progress=print_progress) -> list[dict]:
+    """
+    Populate templates and print them to PDF concurrently.
+
+    Args:
+        cv_jobs: (cv_data, template_path, output) triples.
+        browsers, concurrency, on_progress: See generate_pdfs_async.
+    """
+    jobs = []
+    for cv_data, template_path, output in cv_jobs:
+        html = populate_template(inline_template_assets(template_path), inline_cv_image(cv_data))
+        jobs.append((html, output))
+    return await generate_pdfs_async(jobs, browsers, concurrency, on_progress)
+
+if __name__ == "__main__":
+    # Usage: python async_pdf.py OUTPUT_DIR CV_JSON [CV_JSON ...]
+    # Prints every CV against every template.
+    if len(sys.argv) < 3:
+        print("Usage: python async_pdf.py OUTPUT_DIR CV_JSON [CV_JSON ...]")
+        sys.exit(1)
+
+    output_dir = sys.argv[1]
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    templates_dir = "templates"
+    templates = sorted(f for f in os.listdir(templates_dir) if f.endswith('.html'))
+
+    cv_jobs = []
+    for cv_path in sys.argv[2:]:
+        with open(cv_path, 'r', encoding='utf-8') as f:
+            cv_data = inline_cv_image(json.load(f))
+        cv_name = os.path.splitext(os.path.basename(cv_path))[0]
+        for template_name in templates:
+            output_name = f"{cv_name}_{template_name.replace('.html', '_cv.pdf')}"
+            cv_jobs.append((cv_data, os.path.join(templates_dir, template_name), os.path.join(output_dir, output_name)))
+
+    cpus = os.cpu_count() or 1
+    results = asyncio.run(generate_cvs_async(cv_jobs, browsers=min(4, cpus), concurrency=cpus))
+    failed = sum(1 for r in results if r['error'] is not None)
+    print(f"\nGenerated {len(results) - failed} of {len(results)} PDFs in {output_dir}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Batch rendering of CV data against HTML templates.
+
+Renders N CV dictionaries against M templates in a single call. Each CV is
+validated into a cv_model.CV once and rendered without copying, each
+template is read and compiled once, and large batches can be spread over a
+process pool.
+"""
+
+import os
+import sys
+import json
+from concurrent.futures import ProcessPoolExecutor
+from cv_model import validate_cv
+from template_engine import load_template
+
+def list_templates(templates_dir: str = "templates") -> list[str]:
+    """Return the names of all HTML templates in a folder, sorted."""
+    return sorted(f for f in os.listdir(templates_dir) if f.endswith('.html'))
+
+def render_cv(name: str, cv_data: dict, template_paths: list[str], output_dir: str = None) -> dict:
+    """
+    Render one CV against several templates.
+
+    Returns a dict mapping template name to rendered HTML, or to the written
+    file path when output_dir is given.
+    """
+    data = validate_cv(cv_data)
+    results = {}
+
+    for template_path in template_paths:
+        template_name = os.path.basename(template_path)
+        html = load_template(template_path).render(data)
+
+        if output_dir:
+            output_name = f"{name}_{template_name}"
+            output_path = os.path.join(output_dir, output_name)
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(html)
+            results[template_name] = output_path
+        else:
+            results[template_name] = html
+
+    return results
+
+def _render_cv_job(job: tuple) -> tuple[str, dict]:
+    """Process pool entry point: render a single (name, cv, templates, output_dir) job."""
+    name, cv_data, template_paths, output_dir = job
+    return name, render_cv(name, cv_data, template_paths, output_dir)
+
+def render_batch(cvs: list[dict], template_names: list[str] = None, output_dir: str = None,
+                 templates_dir: str = "templates", names: list[str] = None, workers: int = 0) -> dict:
+    """
+    Render every CV against every template.
+
+    Args:
+        cvs: CV dictionaries (as produced by main.py). They are not modified.
+        template_names: Template file names; defaults to all templates in templates_dir.
+        output_dir: If given, write each result to <name>_<template> there and return paths.
+        templates_dir: Folder containing the templates.
+        names: Output names for the CVs, all different; defaults to cv1, cv2, ...
+        workers: Number of worker processes. 0 or 1 renders in this process.
+
+    Returns:
+        Dict mapping (cv name, template name) to HTML, or to the output path.
+    """
+    if template_names is None:
+        template_names = list_templates(templates_dir)
+    if names is None:
+        names = [f"cv{i}" for i in range(1, len(cvs) + 1)]
+    if len(names) != len(cvs):
+        raise ValueError("names must have the same length as cvs")
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        # Their results and output files would overwrite each other
+        raise ValueError(f"names must be unique, duplicated: {', '.join(duplicates)}")
+
+    template_paths = [os.path.join(templates_dir, t) for t in template_names]
+    for template_path in template_paths:
+        if not os.path.exists(template_path):
+            raise FileNotFoundError(f"Template not found: {template_path}")
+
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    jobs = [(name, cv, template_paths, output_dir) for name, cv in zip(names, cvs)]
+
+    if workers and workers > 1:
+        # Each worker compiles the templates once and reuses them for all its CVs
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            rendered = list(executor.map(_render_cv_job, jobs, chunksize=chunksize))
+    else:
+        rendered = [_render_cv_job(job) for job in jobs]
+
+    results = {}
+    for name, per_template in rendered:
+        for template_name, value in per_template.items():
+            results[(name, template_name)] = value
+    return results
+
+if __name__ == "__main__":
+    # Usage: python batch_render.py OUTPUT_DIR CV_JSON [CV_JSON ...]
+    if len(sys.argv) < 3:
+        print("Usage: python batch_render.py OUTPUT_DIR CV_JSON [CV_JSON ...]")
+        sys.exit(1)
+
+    output_dir = sys.argv[1]
+    cv_paths = sys.argv[2:]
+    cvs = []
+    for path in cv_paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            cvs.append(json.load(f))
+
+    from bulk_tailor import unique_slug
+
+    # a/cv.json and b/cv.json become cv and cv-2 instead of overwriting each other
+    used = set()
+    names = [unique_slug(os.path.splitext(os.path.basename(p))[0], used) for p in cv_paths]
+    results = render_batch(cvs, output_dir=output_dir, names=names, workers=os.cpu_count() or 1)
+    print(f"Generated {len(results)} CVs in {output_dir}")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: context-stack rendering against the dict-copying renderer.
+
+Renders synthetic CVs with hundreds of experience entries and bullets
+through every template three ways:
+
+- copying:  the previous regex renderer, which merges each loop item into a
+            copy of the whole CV dict (benchmarks/copying_renderer.py)
+- stack:    main.process_template_recursive, which pushes loop items onto a
+            ContextStack
+- compiled: template_engine, as used by main.populate_template
+
+Outputs are checked to be identical before anything is timed.
+
+    python -m benchmarks.context_stack [--entries 10 100 300] [--repeat 3]
+"""
+
+import os
+import time
+import argparse
+import tracemalloc
+from main import prepare_template_data, process_template_recursive, template_context
+from template_engine import load_template
+from benchmarks import copying_renderer
+from benchmarks.fixtures import synthetic_cv
+
+TEMPLATES_DIR = "templates"
+
+def measure(render, repeat: int) -> tuple[float, int]:
+    """Best wall time over `repeat` runs, and peak traced memory of one run."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    render()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+def run(entries_list: list[int], repeat: int = 3):
+    template_names = sorted(f for f in os.listdir(TEMPLATES_DIR) if f.endswith('.html'))
+    sources = {}
+    for name in template_names:
+        with open(os.path.join(TEMPLATES_DIR, name), 'r', encoding='utf-8') as f:
+            sources[name] = f.read()
+
+    print(f"{'entries':>8} {'template':<11} {'copying':>10} {'stack':>10} {'compiled':>10} {'speedup':>8} {'peak copy':>10} {'peak stack':>10}")
+    for entries in entries_list:
+        cv = synthetic_cv(entries)
+        for name in template_names:
+            source = sources[name]
+            template_path = os.path.join(TEMPLATES_DIR, name)
+
+            def render_copying():
+                return copying_renderer.process_template_recursive(source, prepare_template_data(cv))
+
+            def render_stack():
+                return process_template_recursive(source, template_context(cv))
+
+            def render_compiled():
+                return load_template(template_path).render(template_context(cv))
+
+            expected = render_copying()
+            if render_stack() != expected or render_compiled() != expected:
+                raise AssertionError(f"Renderers disagree on {name} with {entries} entries")
+
+            copying_time, copying_peak = measure(render_copying, repeat)
+            stack_time, stack_peak = measure(render_stack, repeat)
+            compiled_time, _ = measure(render_compiled, repeat)
+            print(f"{entries:>8} {name:<11} {copying_time * 1000:>8.1f}ms {stack_time * 1000:>8.1f}ms "
+                  f"{compiled_time * 1000:>8.2f}ms {copying_time / stack_time:>7.1f}x "
+                  f"{copying_peak / 1024:>8.0f}KB {stack_peak / 1024:>8.0f}KB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare context-stack rendering with the dict-copying renderer.")
+    parser.add_argument("--entries", type=int, nargs="+", default=[10, 100, 300],
+                        help="Experience entries per synthetic CV (default: 10 100 300)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the best is reported")
+    args = parser.parse_args()
+    run(args.entries, args.repeat)
@@ -0,0 +1,160 @@
+"""
+Frozen copy of the regex renderer as it was before ContextStack.
+
+Every loop item is merged into a full copy of the data dict
+({**data, **item_data}) and dotted keys are re-split on every lookup. Kept
+only as the baseline for benchmarks.context_stack; do not use it for rendering.
+"""
+
+import re
+
+def process_template_recursive(template: str, data: dict) -> str:
+    """Recursively process template with conditionals, loops, and placeholders."""
+    result = template
+    max_iterations = 10  # Prevent infinite loops
+    iteration = 0
+    
+    while iteration < max_iterations:
+        prev_result = result
+        
+        # Process loops first (they may contain conditionals)
+        result = process_loops(result, data)
+        
+        # Process conditionals
+        result = process_conditionals(result, data)
+        
+        # Replace simple placeholders
+        result = replace_simple_placeholders(result, data)
+        
+        # If no changes, we're done
+        if result == prev_result:
+            break
+        
+        iteration += 1
+    
+    return result
+
+def process_loops(template: str, data: dict) -> str:
+    """Process list loops: {{#list}}...{{/list}}"""
+    list_pattern = r'\{\{#(\w+_list)\}\}(.*?)\{\{/\1\}\}'
+    
+    def replace_list(match):
+        list_name = match.group(1)
+        content = match.group(2)
+        
+        # Extract the base field name (e.g., 'skills_list' -> 'skills')
+        base_field = list_name.replace('_list', '')
+        field_value = get_nested_value(data, base_field)
+        
+        if not isinstance(field_value, list) or len(field_value) == 0:
+            return ''
+        
+        # Process each item in the list
+        items_html = []
+        for item in field_value:
+            item_data = {}
+            if isinstance(item, str):
+                # Simple list item (like skills, languages, certifications)
+                # Try to match the expected field name in the template
+                if 'skill' in content.lower():
+                    item_data = {'skill': item}
+                elif 'language' in content.lower():
+                    item_data = {'language': item}
+                elif 'certification' in content.lower():
+                    item_data = {'certification': item}
+                elif 'tech' in content.lower():
+                    item_data = {'tech': item}
+                else:
+                    item_data = {'item': item}
+            elif isinstance(item, dict):
+                # Complex list item (like experience, education, projects)
+                item_data = item.copy()
+                # Handle nested lists within items
+                if 'description' in item and isinstance(item['description'], list):
+                    item_data['description_list'] = [{'item': desc} for desc in item['description']]
+                if 'technologies' in item and isinstance(item['technologies'], list):
+                    item_data['technologies_list'] = [{'tech': tech} for tech in item['technologies']]
+            
+            # Merge item data with main data for nested processing
+            merged_data = {**data, **item_data}
+            # Process nested conditionals and loops in the content
+            item_template = process_template_recursive(content, merged_data)
+            items_html.append(item_template)
+        
+        return ''.join(items_html)
+    
+    return re.sub(list_pattern, replace_list, template, flags=re.DOTALL)
+
+def process_conditionals(template: str, data: dict) -> str:
+    """Process conditionals: {{#field}}...{{/field}}"""
+    conditional_pattern = r'\{\{#(\w+)\}\}(.*?)\{\{/\1\}\}'
+    
+    def replace_conditional(match):
+        field_name = match.group(1)
+        content = match.group(2)
+        
+        # Skip if it's a list pattern (handled separately)
+        if field_name.endswith('_list'):
+            return match.group(0)
+        
+        # Check if field exists and is truthy
+        field_value = get_nested_value(data, field_name)
+        
+        is_truthy = False
+        if isinstance(field_value, list):
+            is_truthy = len(field_value) > 0
+        elif isinstance(field_value, str):
+            is_truthy = bool(field_value.strip())
+        elif field_value is not None:
+            is_truthy = True
+        
+        if is_truthy:
+            # Process nested conditionals and loops in the content
+            processed_content = process_template_recursive(content, data)
+            return processed_content
+        else:
+            return ''
+    
+    return re.sub(conditional_pattern, replace_conditional, template, flags=re.DOTALL)
+
+def replace_simple_placeholders(template: str, data: dict) -> str:
+    """Replace simple placeholders like {{field}} with values."""
+    result = template
+    
+    # Find all placeholders (but not conditionals/loops)
+    placeholder_pattern = r'\{\{([^#/][^}]*)\}\}'
+    
+    def replace_placeholder(match):
+        field_name = match.group(1).strip()
+        
+        # Skip if it's a conditional or loop marker
+        if field_name.startswith('#') or field_name.startswith('/'):
+            return match.group(0)
+        
+        value = get_nested_value(data, field_name)
+        
+        if value is None:
+            return ''
+        elif isinstance(value, (list, dict)):
+            return ''
+        else:
+            return str(value)
+    
+    result = re.sub(placeholder_pattern, replace_placeholder, result)
+    
+    return result
+
+def get_nested_value(data: dict, key: str):
+    """Get value from nested dictionary or return None."""
+    if not isinstance(data, dict):
+        return None
+    
+    keys = key.split('.')
+    value = data
+    for k in keys:
+        if isinstance(value, dict) and k in value:
+            value = value[k]
+        else:
+            return None
+    return value
+
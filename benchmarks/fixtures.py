@@ -0,0 +1,122 @@
+"""
+Synthetic inputs for the benchmarks: CV data, resume files and model responses.
+
+Everything is generated on the fly, so benchmarks need no real resumes, no
+network and no API key.
+"""
+
+import json
+from docx import Document
+
+# Experience entries per synthetic CV size
+CV_SIZES = {
+    "small": 3,
+    "medium": 20,
+    "large": 100,
+    "huge": 500,
+}
+
+def synthetic_cv(entries: int, bullets: int = 6) -> dict:
+    """A CV with `entries` experience, education and project entries and long skill lists."""
+    return {
+        "name": "Jane Doe",
+        "location": "Berlin, Germany",
+        "email": "jane@example.com",
+        "phone": "+49 30 1234567",
+        "github": "https://github.com/janedoe",
+        "linkedin": "https://www.linkedin.com/in/janedoe",
+        "portfolio": "https://janedoe.dev",
+        "image": "",
+        "summary": "Engineer with a long history of shipping things. " * 4,
+        "skills": [f"Skill {i}" for i in range(entries)],
+        "languages": [f"Language {i}" for i in range(max(1, entries // 10))],
+        "certifications": [f"Certification {i}" for i in range(entries // 2)],
+        "experience": [
+            {
+                "company": f"Company {i}",
+                "position": f"Position {i}",
+                "location": "Remote",
+                "startDate": "Jan 2020",
+                "endDate": "Present",
+                "description": [f"Achievement {i}.{j} with measurable impact" for j in range(bullets)],
+            }
+            for i in range(entries)
+        ],
+        "education": [
+            {
+                "institution": f"University {i}",
+                "degree": "MSc",
+                "field": "Computer Science",
+                "location": "Munich",
+                "startDate": "2010",
+                "endDate": "2012",
+            }
+            for i in range(max(1, entries // 4))
+        ],
+        "projects": [
+            {
+                "name": f"Project {i}",
+                "description": "A project description.",
+                "technologies": [f"tech{j}" for j in range(bullets)],
+            }
+            for i in range(max(1, entries // 2))
+        ],
+    }
+
+def resume_lines(pages: int, lines_per_page: int = 40) -> list[list[str]]:
+    """Plain resume text, as a list of lines per page."""
+    return [
+        [f"Page {page + 1} line {line + 1}: Led a team delivering project {page}-{line} on time and budget."
+         for line in range(lines_per_page)]
+        for page in range(pages)
+    ]
+
+def _pdf_escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def write_pdf_resume(path: str, pages: int):
+    """Write a text PDF with the given number of A4 pages (no PDF library needed)."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_refs = []
+    for lines in resume_lines(pages):
+        text = "BT /F1 10 Tf 12 TL 50 800 Td " + " ".join(f"({_pdf_escape(line)}) '" for line in lines) + " ET"
+        stream = text.encode('latin-1')
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_ref = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref)
+        page_refs.append(len(objects))
+    kids = " ".join(f"{ref} 0 R" for ref in page_refs)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_refs)} >>".encode('ascii')
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+
+    with open(path, 'wb') as f:
+        f.write(output)
+
+def write_docx_resume(path: str, pages: int):
+    """Write a DOCX with roughly `pages` pages worth of paragraphs."""
+    doc = Document()
+    for lines in resume_lines(pages):
+        for line in lines:
+            doc.add_paragraph(line)
+    doc.save(path)
+
+def tailoring_response(cv_data: dict) -> str:
+    """A well-formed model response for cv_data, with a short cover letter."""
+    letter = "Dear Hiring Manager,\n\nI am excited to apply [Company Name].\n\nBest regards,\nJane Doe"
+    return (f"TAILORED_CV_START\n```json\n{json.dumps(cv_data, indent=2)}\n```\nTAILORED_CV_END\n\n"
+            f"COVER_LETTER_START\n{letter}\nCOVER_LETTER_END\n")
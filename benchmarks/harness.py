@@ -0,0 +1,121 @@
+"""
+Timing, memory measurement and baseline comparison for the benchmarks.
+
+Each case is timed per iteration with perf_counter and reported as
+throughput (iterations per second) and p50/p99 latency. Peak memory comes
+from one extra iteration under tracemalloc, so tracing does not slow the
+timed runs. Results are saved as JSON and compared against a saved baseline.
+"""
+
+import json
+import math
+import time
+import platform
+import tracemalloc
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def run_case(name: str, func, iterations: int = 20, warmup: int = 1) -> dict:
+    """
+    Time func() over a number of iterations.
+
+    Args:
+        name: Case name, e.g. "templates.populate_template.temp1.large".
+        func: Callable taking no arguments.
+        iterations: Timed calls.
+        warmup: Untimed calls first (fills caches, imports, compiled templates).
+
+    Returns:
+        A result dict with throughput, latency percentiles and peak memory.
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    total = sum(timings)
+    return {
+        "name": name,
+        "iterations": iterations,
+        "throughput": iterations / total if total else float('inf'),
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+        "mean_ms": total / iterations * 1000,
+        "peak_memory_kb": peak / 1024,
+    }
+
+def save_results(path: str, results: list[dict]):
+    """Write results, with the interpreter and machine they were measured on, as JSON."""
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {result["name"]: result for result in results},
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+def load_baseline(path: str) -> dict:
+    """Read a file written by save_results and return its results by case name."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)["results"]
+
+def compare(results: list[dict], baseline: dict, threshold: float = 0.10) -> list[dict]:
+    """
+    Compare results with a baseline.
+
+    A case regresses when its p50 latency or peak memory grew by more than
+    `threshold` (0.10 = 10%). Cases missing from the baseline are skipped.
+
+    Returns:
+        One dict per compared case: name, p50 and memory change ratios and a
+        `regressed` flag.
+    """
+    rows = []
+    for result in results:
+        base = baseline.get(result["name"])
+        if base is None:
+            continue
+        p50_change = result["p50_ms"] / base["p50_ms"] - 1 if base["p50_ms"] else 0.0
+        memory_change = result["peak_memory_kb"] / base["peak_memory_kb"] - 1 if base["peak_memory_kb"] else 0.0
+        rows.append({
+            "name": result["name"],
+            "p50_change": p50_change,
+            "memory_change": memory_change,
+            "regressed": p50_change > threshold or memory_change > threshold,
+        })
+    return rows
+
+def print_results(results: list[dict], comparison: list[dict] = None):
+    """Print a results table, with baseline changes when a comparison is given."""
+    changes = {row["name"]: row for row in comparison or []}
+    width = max([len(result["name"]) for result in results] + [4])
+    header = f"{'case':<{width}} {'ops/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'peak KB':>10}"
+    if comparison is not None:
+        header += f" {'p50 Δ':>8} {'mem Δ':>8}"
+    print(header)
+
+    for result in results:
+        line = (f"{result['name']:<{width}} {result['throughput']:>10.1f} {result['p50_ms']:>10.2f} "
+                f"{result['p99_ms']:>10.2f} {result['peak_memory_kb']:>10.0f}")
+        row = changes.get(result["name"])
+        if row is not None:
+            line += f" {row['p50_change']:>+7.0%} {row['memory_change']:>+7.0%}"
+            if row["regressed"]:
+                line += "  REGRESSION"
+        print(line)
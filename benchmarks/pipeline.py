@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the tailoring -> templating -> PDF pipeline.
+
+Suites:
+- resume:    read_cv_from_resume_folder on generated PDF and DOCX resumes,
+             with and without the extraction cache
+- templates: populate_template and process_template_recursive on every
+             template, for small to huge synthetic CVs
+- tailoring: tailor_cv_and_generate_cover_letter with a StubBackend, so only
+             prompt building and response parsing are measured
+- pdf:       render_cv_pdf (what generate_cv_from_template runs), with a
+             fresh browser per PDF and with a warm PdfRenderPool; skipped
+             when Chromium is not installed
+
+Run from the project root, save a baseline, and compare later runs with it:
+
+    python -m benchmarks.pipeline --save benchmarks/baseline.json
+    python -m benchmarks.pipeline --compare benchmarks/baseline.json
+
+With --compare the exit code is 1 if any case regressed.
+"""
+
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+from main import populate_template, process_template_recursive, read_cv_from_resume_folder, \
+    tailor_cv_and_generate_cover_letter, template_context
+from llm_backend import StubBackend
+from benchmarks.fixtures import CV_SIZES, synthetic_cv, tailoring_response, write_docx_resume, write_pdf_resume
+from benchmarks.harness import compare, load_baseline, print_results, run_case, save_results
+
+TEMPLATES_DIR = "templates"
+SUITES = ("resume", "templates", "tailoring", "pdf")
+
+# (fixture name, writer, pages)
+RESUME_FIXTURES = [
+    ("pdf-2p", write_pdf_resume, 2),
+    ("pdf-40p", write_pdf_resume, 40),
+    ("docx-2p", write_docx_resume, 2),
+    ("docx-20p", write_docx_resume, 20),
+]
+
+# Timed iterations per CV size; huge CVs through the regex renderer are slow
+ITERATIONS = {"small": 50, "medium": 20, "large": 10, "huge": 5}
+
+def template_paths() -> list[str]:
+    return [os.path.join(TEMPLATES_DIR, name) for name in sorted(os.listdir(TEMPLATES_DIR)) if name.endswith('.html')]
+
+def bench_resume(work_dir: str, quick: bool) -> list[dict]:
+    results = []
+    for fixture_name, writer, pages in RESUME_FIXTURES:
+        folder = os.path.join(work_dir, fixture_name)
+        os.makedirs(folder)
+        extension = 'pdf' if writer is write_pdf_resume else 'docx'
+        writer(os.path.join(folder, f"resume.{extension}"), pages)
+
+        iterations = 3 if quick else 10
+        results.append(run_case(f"resume.{fixture_name}.cold",
+                                lambda: read_cv_from_resume_folder(folder, use_cache=False), iterations))
+        results.append(run_case(f"resume.{fixture_name}.cached",
+                                lambda: read_cv_from_resume_folder(folder), iterations * 5))
+    return results
+
+def bench_templates(sizes: list[str], quick: bool) -> list[dict]:
+    results = []
+    for size in sizes:
+        cv = synthetic_cv(CV_SIZES[size])
+        iterations = max(2, ITERATIONS[size] // (5 if quick else 1))
+        for path in template_paths():
+            template_name = os.path.splitext(os.path.basename(path))[0]
+            with open(path, 'r', encoding='utf-8') as f:
+                source = f.read()
+            results.append(run_case(f"templates.populate_template.{template_name}.{size}",
+                                    lambda: populate_template(path, cv), iterations))
+            results.append(run_case(f"templates.process_template_recursive.{template_name}.{size}",
+                                    lambda: process_template_recursive(source, template_context(cv)), iterations))
+    return results
+
+def bench_tailoring(sizes: list[str], quick: bool) -> list[dict]:
+    results = []
+    job_description = "Senior Python engineer. " * 50
+    for size in sizes:
+        cv = synthetic_cv(CV_SIZES[size])
+        backend = StubBackend(tailoring_response(cv))
+        cv_text = "\n".join(f"{item['position']} at {item['company']}" for item in cv["experience"])
+        iterations = max(2, ITERATIONS[size] * 2 // (5 if quick else 1))
+        results.append(run_case(f"tailoring.parse_response.{size}",
+                                lambda: tailor_cv_and_generate_cover_letter(cv_text, job_description,
+                                                                            use_cache=False, backend=backend),
+                                iterations))
+    return results
+
+def bench_pdf(work_dir: str, quick: bool) -> list[dict]:
+    from generate_cv import render_cv_pdf
+    from pdf_render import PdfRenderPool
+
+    cv = synthetic_cv(CV_SIZES["medium"])
+    paths = template_paths()
+    try:
+        render_cv_pdf(cv, paths[0], os.path.join(work_dir, "probe.pdf"), use_cache=False)
+    except Exception as e:
+        print(f"Skipping pdf suite (browser unavailable): {e}", file=sys.stderr)
+        return []
+
+    results = []
+    iterations = 2 if quick else 5
+    with PdfRenderPool(workers=1) as pool:
+        for path in paths:
+            template_name = os.path.splitext(os.path.basename(path))[0]
+            output = os.path.join(work_dir, f"{template_name}.pdf")
+            results.append(run_case(f"pdf.render_cv_pdf.{template_name}.new_browser",
+                                    lambda: render_cv_pdf(cv, path, output, use_cache=False), iterations))
+            results.append(run_case(f"pdf.render_cv_pdf.{template_name}.pool",
+                                    lambda: render_cv_pdf(cv, path, output, pool=pool, use_cache=False),
+                                    iterations * 2))
+    return results
+
+def run_suites(suites: list[str], sizes: list[str], quick: bool = False) -> list[dict]:
+    """Run the selected suites in a scratch directory and return all results."""
+    work_dir = tempfile.mkdtemp(prefix="cv-bench-")
+    try:
+        results = []
+        if "resume" in suites:
+            results += bench_resume(work_dir, quick)
+        if "templates" in suites:
+            results += bench_templates(sizes, quick)
+        if "tailoring" in suites:
+            results += bench_tailoring(sizes, quick)
+        if "pdf" in suites:
+            results += bench_pdf(work_dir, quick)
+        return results
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the tailoring, templating and PDF pipeline.")
+    parser.add_argument("--only", nargs="+", choices=SUITES, default=list(SUITES), help="Suites to run (default: all)")
+    parser.add_argument("--sizes", nargs="+", choices=list(CV_SIZES), default=list(CV_SIZES),
+                        help="Synthetic CV sizes (default: all)")
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations, for a fast sanity check")
+    parser.add_argument("--save", metavar="PATH", help="Write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="Compare with a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative p50/memory increase that counts as a regression (default: 0.10)")
+    args = parser.parse_args()
+
+    results = run_suites(args.only, args.sizes, args.quick)
+    comparison = compare(results, load_baseline(args.compare), args.threshold) if args.compare else None
+    print_results(results, comparison)
+
+    if args.save:
+        save_results(args.save, results)
+        print(f"\nSaved {len(results)} results to {args.save}")
+
+    if comparison is not None:
+        regressions = [row["name"] for row in comparison if row["regressed"]]
+        print(f"\n{len(comparison)} cases compared, {len(regressions)} regressed")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,123 @@
+"""
+Build manifest for incremental PDF generation.
+
+Every output folder keeps a .build_manifest.json recording, for each PDF,
+content hashes of the inputs it was built from (CV JSON, template, inlined
+assets, print settings) and the size and modification time of the PDF that
+was written. A PDF is up to date when it is still there, unchanged, and all
+of its input hashes match; anything else is stale and gets rebuilt, like a
+make target whose dependencies changed.
+"""
+
+import os
+import json
+import hashlib
+
+MANIFEST_NAME = ".build_manifest.json"
+
+# Digests of files keyed by absolute path, invalidated when the file changes
+_file_digests = {}
+
+def text_digest(text: str) -> str:
+    """SHA-256 hex digest of a string."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def json_digest(data) -> str:
+    """
+    SHA-256 hex digest of JSON-serialisable data in canonical form.
+
+    Keys are sorted and separators fixed, so re-indenting or reordering a
+    JSON file does not change its digest.
+    """
+    return text_digest(json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':')))
+
+def file_digest(path: str) -> str:
+    """SHA-256 hex digest of a file's content, memoised until its size or mtime changes."""
+    abs_path = os.path.abspath(path)
+    stat = os.stat(abs_path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _file_digests.get(abs_path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    with open(abs_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    _file_digests[abs_path] = (stamp, digest.hexdigest())
+    return digest.hexdigest()
+
+def _output_stamp(path: str) -> dict:
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+class BuildManifest:
+    """
+    The build records of one output folder.
+
+    Usage:
+        manifest = BuildManifest("generated_result")
+        if force or not manifest.is_fresh(output_path, inputs):
+            build(output_path)
+            manifest.record(output_path, inputs)
+        manifest.save()
+    """
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.path = os.path.join(folder, MANIFEST_NAME)
+        self.entries = self._load()
+        self._dirty = False
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Warning: ignoring unreadable build manifest {self.path}: {e}")
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _key(self, output_path: str) -> str:
+        return os.path.relpath(output_path, self.folder).replace(os.sep, '/')
+
+    def is_fresh(self, output_path: str, inputs: dict) -> bool:
+        """Whether output_path exists unchanged since it was recorded with these input hashes."""
+        recorded = self.recorded_inputs(output_path)
+        return recorded is not None and recorded == inputs
+
+    def recorded_inputs(self, output_path: str):
+        """Input hashes output_path was recorded with, or None if it was not recorded or has changed since."""
+        entry = self.entries.get(self._key(output_path))
+        if not isinstance(entry, dict):
+            return None
+        try:
+            if entry.get('output') != _output_stamp(output_path):
+                return None
+        except FileNotFoundError:
+            return None
+        return entry.get('inputs')
+
+    def record(self, output_path: str, inputs: dict):
+        """Record that output_path was just built from inputs."""
+        self.entries[self._key(output_path)] = {'inputs': inputs, 'output': _output_stamp(output_path)}
+        self._dirty = True
+
+    def discard(self, output_path: str):
+        """Forget output_path, so it is rebuilt next time (e.g. after a failed build)."""
+        if self.entries.pop(self._key(output_path), None) is not None:
+            self._dirty = True
+
+    def save(self):
+        """Write the manifest if anything changed, atomically."""
+        if not self._dirty:
+            return
+        os.makedirs(self.folder, exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
+        self._dirty = False
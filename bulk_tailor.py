@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Tailor one CV against many job descriptions without any prompts.
+
+Job descriptions come from a folder of .txt/.md files or from a JSONL file
+(one {"id": ..., "job_description": ...} object per line). Postings are
+processed concurrently with bounded parallelism over one shared LLM
+backend, rate-limit errors are retried with exponential backoff, and each
+posting gets its own result folder with tailored_cv.json and cover_letter.md.
+
+Usage:
+    python bulk_tailor.py job_postings/ --output generated_result/bulk --workers 4
+    python bulk_tailor.py postings.jsonl --image https://example.com/me.jpg
+
+Set LLM_BACKEND=stub (or run a stub server and set LLM_BACKEND=http) to
+load-test the pipeline without calling Gemini; see llm_backend.py.
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from main import read_cv_from_resume_folder, save_tailoring_results, tailor_cv_and_generate_cover_letter
+from llm_backend import create_backend, get_backend
+
+JOB_FILE_EXTENSIONS = ('.txt', '.md')
+
+def slugify(name: str) -> str:
+    """Turn a posting name into a safe folder name."""
+    slug = re.sub(r'[^A-Za-z0-9._-]+', '-', name).strip('-.')
+    return slug or "posting"
+
+def unique_slug(name: str, used: set) -> str:
+    """
+    Slugify name into a folder name not in used, and add it to used.
+
+    Collisions get the first free numeric suffix, so "a", "a", "a-2" become
+    "a", "a-2", "a-2-2".
+    """
+    base = slugify(name)
+    slug = base
+    suffix = 1
+    while slug in used:
+        suffix += 1
+        slug = f"{base}-{suffix}"
+    used.add(slug)
+    return slug
+
+def load_job_descriptions(source: str) -> list[tuple[str, str]]:
+    """
+    Load (name, job_description) pairs from a folder or a JSONL file.
+
+    In JSONL files the name is taken from "id", "name" or "title" (falling
+    back to the line number) and the text from "job_description",
+    "description" or "text".
+    """
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"Job description source not found: {source}")
+
+    jobs = []
+    if os.path.isdir(source):
+        for file_name in sorted(os.listdir(source)):
+            path = os.path.join(source, file_name)
+            if not os.path.isfile(path) or not file_name.lower().endswith(JOB_FILE_EXTENSIONS):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read().strip()
+            if content:
+                jobs.append((os.path.splitext(file_name)[0], content))
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON on line {line_number} of {source}: {e}")
+                name = str(record.get('id') or record.get('name') or record.get('title') or f"posting-{line_number}")
+                content = (record.get('job_description') or record.get('description') or record.get('text') or '').strip()
+                if not content:
+                    raise ValueError(f"No job description on line {line_number} of {source}")
+                jobs.append((name, content))
+
+    if not jobs:
+        raise ValueError(f"No job descriptions found in {source}")
+
+    # Keep result folders distinct when names collide after slugifying
+    used = set()
+    return [(unique_slug(name, used), content) for name, content in jobs]
+
+def tailor_one(name: str, job_description: str, cv_content: str, output_dir: str,
+               image_path: str = None, backend=None) -> str:
+    """Tailor the CV for one posting and write its result folder. Returns the folder path."""
+    tailored_cv, cover_letter = tailor_cv_and_generate_cover_letter(
+        cv_content, job_description, image_path, backend=backend
+    )
+
+    result_folder = os.path.join(output_dir, name)
+    save_tailoring_results(result_folder, tailored_cv, cover_letter, job_description)
+    return result_folder
+
+def tailor_bulk(cv_content: str, jobs: list[tuple[str, str]], output_dir: str, workers: int = 4,
+                image_path: str = None, backend=None) -> list[dict]:
+    """
+    Tailor one CV against many postings concurrently.
+
+    All workers share one backend (default: llm_backend.get_backend()), which
+    retries rate limits itself. Returns one dict per posting with name,
+    folder (None on failure) and error.
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    if backend is None:
+        backend = get_backend()
+    os.makedirs(output_dir, exist_ok=True)
+
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(tailor_one, name, text, cv_content, output_dir, image_path, backend): name
+            for name, text in jobs
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            name = futures[future]
+            try:
+                folder = future.result()
+                results.append({'name': name, 'folder': folder, 'error': None})
+                print(f"[{done}/{len(jobs)}] ✓ {name} -> {folder}")
+            except Exception as e:
+                results.append({'name': name, 'folder': None, 'error': e})
+                print(f"[{done}/{len(jobs)}] ✗ {name}: {e}")
+
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tailor one CV against many job descriptions.")
+    parser.add_argument("source", help="Folder of .txt/.md job descriptions or a JSONL file")
+    parser.add_argument("--output", default=os.path.join("generated_result", "bulk"),
+                        help="Folder for per-posting results (default: generated_result/bulk)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent LLM requests (default: 4)")
+    parser.add_argument("--image", default=None, help="Portrait image URL or path to add to every CV")
+    parser.add_argument("--max-retries", type=int, default=5, help="Retries per posting on rate limits")
+    parser.add_argument("--backend", choices=["gemini", "stub", "http"], default=None,
+                        help="LLM backend (default: LLM_BACKEND or gemini)")
+    args = parser.parse_args()
+
+    try:
+        jobs = load_job_descriptions(args.source)
+        print(f"Loaded {len(jobs)} job descriptions from {args.source}")
+        cv_content = read_cv_from_resume_folder()
+        backend = create_backend(args.backend, max_retries=args.max_retries)
+        results = tailor_bulk(cv_content, jobs, args.output, args.workers, args.image, backend)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    failed = sum(1 for r in results if r['error'] is not None)
+    print(f"\n✓ Tailored {len(results) - failed} of {len(results)} postings into {args.output}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,239 @@
+"""
+Typed model for tailored CV data.
+
+Compact __slots__ dataclasses for the CV and its experience, education and
+project entries, plus a validator for the JSON Gemini returns. The model
+objects can be rendered directly by template_engine: they act as read-only
+template scopes, and the derived fields templates use (job_title,
+*_display, languages_comma_separated) are computed on lookup instead of
+being added to a copied dict.
+
+Optional fields are None when missing, so a template lookup falls back to
+the enclosing scope exactly as it does for a plain dict without that key.
+Fields that were explicitly null in the JSON are remembered in `extra`, so
+they still shadow the enclosing scope like a dict key holding None.
+"""
+
+import dataclasses
+from dataclasses import dataclass
+from template_engine import ScopeMapping
+
+def _strip_scheme(url: str) -> str:
+    return url.replace('https://', '').replace('http://', '').replace('www.', '')
+
+class _Record(ScopeMapping):
+    """Template scope over dataclass fields plus any unknown keys kept in `extra`."""
+    __slots__ = ()
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None or key in self.extra
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None and key not in self.extra:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        value = getattr(self, key) if key in self._field_names else None
+        if value is None:
+            # Unknown keys, and fields whose value had the wrong type
+            value = self.extra.get(key)
+        return default if value is None else value
+
+    def to_dict(self) -> dict:
+        """Plain dict for JSON output, omitting missing fields."""
+        data = {}
+        for name in self._field_order:
+            value = getattr(self, name)
+            if value is None:
+                continue
+            if isinstance(value, list):
+                value = [item.to_dict() if isinstance(item, _Record) else item for item in value]
+            data[name] = value
+        data.update(self.extra)
+        return data
+
+@dataclass(slots=True)
+class Experience(_Record):
+    company: str = None
+    position: str = None
+    location: str = None
+    startDate: str = None
+    endDate: str = None
+    description: list[str] = None
+    extra: dict = dataclasses.field(default_factory=dict)
+
+@dataclass(slots=True)
+class Education(_Record):
+    institution: str = None
+    degree: str = None
+    field: str = None
+    location: str = None
+    startDate: str = None
+    endDate: str = None
+    extra: dict = dataclasses.field(default_factory=dict)
+
+@dataclass(slots=True)
+class Project(_Record):
+    name: str = None
+    description: str = None
+    technologies: list[str] = None
+    extra: dict = dataclasses.field(default_factory=dict)
+
+@dataclass(slots=True)
+class CV(_Record):
+    name: str = None
+    location: str = None
+    email: str = None
+    phone: str = None
+    github: str = None
+    linkedin: str = None
+    portfolio: str = None
+    image: str = None
+    summary: str = None
+    job_title: str = None
+    skills: list[str] = None
+    experience: list[Experience] = None
+    education: list[Education] = None
+    certifications: list[str] = None
+    languages: list[str] = None
+    projects: list[Project] = None
+    extra: dict = dataclasses.field(default_factory=dict)
+
+    def get(self, key, default=None):
+        derived = _CV_DERIVED.get(key)
+        value = derived(self) if derived is not None else None
+        if value is None:
+            value = _Record.get(self, key)
+        return default if value is None else value
+
+    def display_job_title(self) -> str:
+        """The job title, defaulting to the first experience position."""
+        if self.job_title:
+            return self.job_title
+        if self.experience:
+            return self.experience[0].position or ''
+        return ''
+
+    def languages_comma_separated(self):
+        return ', '.join(self.languages) if self.languages is not None else None
+
+    def github_display(self):
+        if not self.github:
+            return None
+        return _strip_scheme(self.github) if 'github.com' in self.github else 'GitHub'
+
+    def linkedin_display(self):
+        if not self.linkedin:
+            return None
+        return _strip_scheme(self.linkedin) if 'linkedin.com' in self.linkedin else 'LinkedIn'
+
+    def portfolio_display(self):
+        if not self.portfolio:
+            return None
+        return _strip_scheme(self.portfolio) if self.portfolio.startswith('http') else 'Portfolio'
+
+_CV_DERIVED = {
+    'job_title': CV.display_job_title,
+    'languages_comma_separated': CV.languages_comma_separated,
+    'github_display': CV.github_display,
+    'linkedin_display': CV.linkedin_display,
+    'portfolio_display': CV.portfolio_display,
+}
+
+# Field names per class: a set for template lookups, a tuple for to_dict order
+for _cls in (Experience, Education, Project, CV):
+    _cls._field_order = tuple(f.name for f in dataclasses.fields(_cls) if f.name != 'extra')
+    _cls._field_names = frozenset(_cls._field_order)
+
+def _is_scalar(value) -> bool:
+    return isinstance(value, (str, int, float)) and not isinstance(value, bool)
+
+def _as_str(value, path: str):
+    if value is None or isinstance(value, str):
+        return value
+    if _is_scalar(value):
+        return str(value)
+    if isinstance(value, list) and all(_is_scalar(item) for item in value):
+        # Free text sometimes comes back split into a list of sentences
+        return ' '.join(str(item) for item in value)
+    raise ValueError(f"{path}: expected a string, got {type(value).__name__}")
+
+def _as_str_list(value, path: str):
+    if value is None:
+        return None
+    if not isinstance(value, list):
+        raise ValueError(f"{path}: expected a list of strings, got {type(value).__name__}")
+    items = []
+    for i, item in enumerate(value):
+        try:
+            item = _as_str(item, f"{path}[{i}]")
+        except ValueError as e:
+            print(f"Warning: {e}; item skipped")
+            continue
+        if item is not None:
+            items.append(item)
+    return items
+
+def _build(cls, data, path: str):
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected an object, got {type(data).__name__}")
+
+    kwargs = {}
+    extra = {}
+    for key, value in data.items():
+        if key not in cls._field_names or value is None:
+            extra[key] = value
+            continue
+        kind = _FIELD_KINDS[cls].get(key, _as_str)
+        try:
+            kwargs[key] = kind(value, f"{path}.{key}")
+        except ValueError as e:
+            # Keep the value as it came, like an unknown key, instead of failing the whole CV
+            print(f"Warning: {e}; field ignored")
+            extra[key] = value
+    return cls(**kwargs, extra=extra)
+
+def _record_list(cls):
+    def convert(value, path: str):
+        if value is None:
+            return None
+        if not isinstance(value, list):
+            raise ValueError(f"{path}: expected a list, got {type(value).__name__}")
+        records = []
+        for i, item in enumerate(value):
+            try:
+                records.append(_build(cls, item, f"{path}[{i}]"))
+            except ValueError as e:
+                print(f"Warning: {e}; item skipped")
+        return records
+    return convert
+
+_FIELD_KINDS = {
+    Experience: {'description': _as_str_list},
+    Education: {},
+    Project: {'technologies': _as_str_list},
+    CV: {
+        'skills': _as_str_list,
+        'certifications': _as_str_list,
+        'languages': _as_str_list,
+        'experience': _record_list(Experience),
+        'education': _record_list(Education),
+        'projects': _record_list(Project),
+    },
+}
+
+def validate_cv(data: dict) -> CV:
+    """
+    Validate tailored CV JSON and convert it to a CV.
+
+    Numbers in string fields are converted to strings, lists of strings in
+    free-text fields are joined, and nulls in string lists are dropped.
+    Other values of the wrong type print a warning naming the field (e.g.
+    "cv.experience[2].description") and are kept in `extra` as they came,
+    so one odd field does not fail the whole CV; list items of the wrong
+    type are skipped. Unknown keys are kept in `extra` too. Raises
+    ValueError only if data is not an object.
+    """
+    return _build(CV, data, "cv")
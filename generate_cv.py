@@ -1,35 +1,255 @@
 #!/usr/bin/env python3
 """
 Script to generate CV PDF files from JSON data and templates using headless browser.
+
+Builds are incremental: each output folder has a build manifest (see
+build_manifest.py), and a PDF is only printed again when its CV JSON,
+template, inlined assets or print settings changed. A stale PDF whose
+inputs were rendered before (for another folder, or before being deleted)
+is copied from the render cache (see render_cache.py) instead of printed.
+Use --force to print everything again.
 """
 
 import os
-import json
 import sys
-import tempfile
+import json
+import argparse
+from collections import deque
 from playwright.sync_api import sync_playwright
 from main import populate_template
+from asset_inliner import inline_cv_image, inline_template_assets
+from build_manifest import BuildManifest
+from pdf_render import PdfRenderPool, print_pdf, write_pdf
+from render_cache import get_html_cache, get_pdf_store, pdf_inputs, render_key
+from tracing import span
+
+RESULT_DIR = "generated_result"
+TEMPLATES_DIR = "templates"
+CV_JSON_NAME = "tailored_cv.json"
+
+def print_html_pdf(html: str, output=None, pool: PdfRenderPool = None) -> bytes:
+    """Print populated HTML to PDF with the pool, or with a browser launched just for this PDF."""
+    if pool is not None:
+        return pool.render(html, output)
+    
+    with sync_playwright() as p:
+        # Launch browser
+        with span("browser.launch"):
+            browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        pdf_bytes = print_pdf(page, html, output)
+        browser.close()
+    return pdf_bytes
+
+def cached_html(key: str, inlined_template: str, inlined_cv: dict) -> str:
+    """Populated HTML for a render key, from the in-memory HTML cache when possible."""
+    html_cache = get_html_cache()
+    html = html_cache.get(key)
+    if html is None:
+        html = populate_template(inlined_template, inlined_cv)
+        html_cache.put(key, html)
+    return html
+
+def render_cv_pdf(cv_data: dict, template_path: str, output=None, pool: PdfRenderPool = None,
+                  use_cache: bool = True) -> bytes:
+    """
+    Populate a template with CV data and print it to PDF, without temporary files.
+    
+    Args:
+        cv_data: Tailored CV data.
+        template_path: Path to the HTML template.
+        output: Optional file path or writable binary object for the PDF.
+        pool: Optional PdfRenderPool to reuse warm browsers. If None, a
+              browser is launched just for this PDF.
+        use_cache: Reuse a PDF rendered earlier from the same CV, template
+                   and assets (see render_cache), and store new ones.
+    
+    Returns:
+        The PDF bytes.
+    """
+    # Use the self-contained template and image so the browser needs no network
+    inlined_cv = inline_cv_image(cv_data)
+    inlined_template = inline_template_assets(template_path)
+    if not use_cache:
+        return print_html_pdf(populate_template(inlined_template, inlined_cv), output, pool)
+    
+    key = render_key(pdf_inputs(cv_data, inlined_cv, template_path, inlined_template))
+    pdf_store = get_pdf_store()
+    pdf_bytes = pdf_store.get(key)
+    if pdf_bytes is not None:
+        write_pdf(pdf_bytes, output)
+        return pdf_bytes
+    
+    pdf_bytes = print_html_pdf(cached_html(key, inlined_template, inlined_cv), output, pool)
+    pdf_store.put(key, pdf_bytes)
+    return pdf_bytes
+
+def output_pdf_path(folder: str, template_name: str) -> str:
+    """Where the PDF for a template goes: <folder>/<template>_cv.pdf."""
+    return os.path.join(folder, template_name.replace('.html', '_cv.pdf'))
+
+def find_cv_jsons(root: str) -> list[str]:
+    """All tailored_cv.json files under root (e.g. bulk_tailor.py result folders), sorted."""
+    paths = []
+    for folder, dirs, files in os.walk(root):
+        dirs.sort()
+        if CV_JSON_NAME in files:
+            paths.append(os.path.join(folder, CV_JSON_NAME))
+    return sorted(paths)
+
+def build_pdfs(json_paths: list[str], template_names: list[str] = None, workers: int = 2, force: bool = False,
+               templates_dir: str = TEMPLATES_DIR) -> dict:
+    """
+    Print every template for every CV JSON, skipping PDFs that are up to date.
+
+    Each PDF is written next to its JSON file as <template>_cv.pdf and recorded
+    in that folder's build manifest. Stale PDFs are copied from the render
+    cache when it has them, browsers are only launched if some PDF still has
+    to be printed, and only a bounded number of populated pages is held in
+    memory, so large result trees can be rebuilt incrementally.
+
+    Args:
+        json_paths: CV JSON files to render.
+        template_names: Template file names; defaults to all templates in templates_dir.
+        workers: Number of warm browsers printing in parallel.
+        force: Print every PDF again, even if it is up to date or cached.
+        templates_dir: Folder containing the templates.
 
-def generate_cv_from_template(template_name: str = None):
+    Returns:
+        Counts of built (printed), cached (copied from the render cache),
+        skipped (up to date) and failed PDFs, plus errors: a dict mapping
+        each failed PDF (or unreadable JSON) path to its error.
+    """
+    if template_names is None:
+        template_names = sorted(f for f in os.listdir(templates_dir) if f.endswith('.html'))
+
+    templates = []
+    for template_name in template_names:
+        template_path = os.path.join(templates_dir, template_name)
+        if not os.path.exists(template_path):
+            raise FileNotFoundError(f"Template not found: {template_path}")
+        templates.append((template_name, template_path, inline_template_assets(template_path)))
+
+    counts = {'built': 0, 'cached': 0, 'skipped': 0, 'failed': 0, 'errors': {}}
+    pdf_store = get_pdf_store()
+    manifests = []
+    pending = deque()
+    pool = None
+
+    def finish(output_path, manifest, inputs, key, future):
+        try:
+            pdf_store.put(key, future.result())
+        except Exception as e:
+            manifest.discard(output_path)
+            counts['failed'] += 1
+            counts['errors'][output_path] = str(e)
+            print(f"Error generating PDF for {output_path}: {e}")
+            return
+        manifest.record(output_path, inputs)
+        counts['built'] += 1
+        print(f"✓ CV PDF generated successfully: {output_path}")
+
+    try:
+        for json_path in json_paths:
+            try:
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    cv_data = json.load(f)
+            except (OSError, ValueError) as e:
+                counts['failed'] += len(templates)
+                counts['errors'][json_path] = str(e)
+                print(f"Error reading {json_path}: {e}")
+                continue
+
+            folder = os.path.dirname(json_path)
+            manifest = BuildManifest(folder)
+            manifests.append(manifest)
+            inlined_cv = inline_cv_image(cv_data)
+
+            for template_name, template_path, inlined_template in templates:
+                output_path = output_pdf_path(folder, template_name)
+                inputs = pdf_inputs(cv_data, inlined_cv, template_path, inlined_template)
+                if not force and manifest.is_fresh(output_path, inputs):
+                    counts['skipped'] += 1
+                    continue
+
+                key = render_key(inputs)
+                pdf_bytes = None if force else pdf_store.get(key)
+                if pdf_bytes is not None:
+                    write_pdf(pdf_bytes, output_path)
+                    manifest.record(output_path, inputs)
+                    counts['cached'] += 1
+                    print(f"✓ CV PDF copied from the render cache: {output_path}")
+                    continue
+
+                if pool is None:
+                    pool = PdfRenderPool(workers=workers)
+                html = cached_html(key, inlined_template, inlined_cv)
+                pending.append((output_path, manifest, inputs, key, pool.submit(html, output_path)))
+
+                # Keep a few pages per browser queued instead of the whole tree
+                while len(pending) > workers * 4:
+                    finish(*pending.popleft())
+
+        while pending:
+            finish(*pending.popleft())
+    finally:
+        if pool is not None:
+            pool.close()
+        for manifest in manifests:
+            manifest.save()
+
+    print(f"{counts['built']} built, {counts['cached']} from cache, {counts['skipped']} up to date, "
+          f"{counts['failed']} failed")
+    return counts
+
+def generate_all_templates(workers: int = 2, force: bool = False, json_path: str = None) -> dict:
+    """
+    Generate a PDF for every template that is out of date, using a pool of warm browsers.
+
+    PDFs go next to the CV JSON (default: generated_result/tailored_cv.json).
+    Returns the counts from build_pdfs, or None if the JSON file is missing.
+    """
+    json_path = json_path or os.path.join(RESULT_DIR, CV_JSON_NAME)
+    if not os.path.exists(json_path):
+        print(f"Error: JSON file not found at {json_path}")
+        print("Please run main.py first to generate the CV JSON.")
+        return None
+    
+    return build_pdfs([json_path], workers=workers, force=force)
+
+def generate_tree(root: str, template_names: list[str] = None, workers: int = 2, force: bool = False) -> dict:
+    """Bring the PDFs of every tailored_cv.json under root up to date (see build_pdfs)."""
+    json_paths = find_cv_jsons(root)
+    if not json_paths:
+        print(f"No {CV_JSON_NAME} files found under {root}")
+    return build_pdfs(json_paths, template_names, workers=workers, force=force)
+
+def generate_cv_from_template(template_name: str = None, force: bool = False, json_path: str = None) -> bool:
     """
     Generate CV HTML from JSON data using a template.
     
     Args:
         template_name: Name of template file (temp1.html, temp2.html, etc.)
                       If None, will prompt user to select.
+        force: Print the PDF even if it is up to date.
+        json_path: CV JSON file (default: generated_result/tailored_cv.json).
+                   The PDF is written next to it.
+    
+    Returns:
+        True if the PDF is up to date or was generated.
     """
     # Load JSON data
-    json_path = "generated_result/tailored_cv.json"
+    json_path = json_path or os.path.join(RESULT_DIR, CV_JSON_NAME)
     if not os.path.exists(json_path):
         print(f"Error: JSON file not found at {json_path}")
         print("Please run main.py first to generate the CV JSON.")
-        return
+        return False
     
     with open(json_path, 'r', encoding='utf-8') as f:
         cv_data = json.load(f)
     
     # Select template
-    templates_dir = "templates"
+    templates_dir = TEMPLATES_DIR
     available_templates = [f for f in os.listdir(templates_dir) if f.endswith('.html')]
     
     if not template_name:
@@ -56,71 +276,86 @@ def generate_cv_from_template(template_name: str = None):
                     break
                 else:
                     print("Invalid selection. Please try again.")
-            except (ValueError, KeyboardInterrupt):
+            except (ValueError, KeyboardInterrupt, EOFError):
                 print("\nCancelled.")
-                return
+                return False
     
     template_path = os.path.join(templates_dir, template_name)
     
     if not os.path.exists(template_path):
         print(f"Error: Template not found at {template_path}")
-        return
+        return False
     
     # Generate output filename (PDF)
-    output_name = template_name.replace('.html', '_cv.pdf')
-    output_path = os.path.join("generated_result", output_name)
+    output_folder = os.path.dirname(json_path)
+    output_path = output_pdf_path(output_folder, template_name)
+    
+    inlined_cv = inline_cv_image(cv_data)
+    inlined_template = inline_template_assets(template_path)
+    manifest = BuildManifest(output_folder)
+    inputs = pdf_inputs(cv_data, inlined_cv, template_path, inlined_template)
+    if not force and manifest.is_fresh(output_path, inputs):
+        print(f"\n✓ {output_path} is up to date (use --force to rebuild it)")
+        return True
+    
+    key = render_key(inputs)
+    pdf_store = get_pdf_store()
+    pdf_bytes = None if force else pdf_store.get(key)
+    if pdf_bytes is not None:
+        write_pdf(pdf_bytes, output_path)
+        manifest.record(output_path, inputs)
+        manifest.save()
+        print(f"\n✓ CV PDF copied from the render cache: {output_path}")
+        return True
     
-    # Generate CV HTML first (temporarily)
     print(f"\nGenerating CV from {template_name}...")
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as temp_html:
-        temp_html_path = temp_html.name
-        populate_template(template_path, cv_data, temp_html_path)
     
     # Convert HTML to PDF using headless browser
     print("Converting to PDF using headless browser...")
     try:
-        # Get absolute path for the HTML file
-        html_abs_path = os.path.abspath(temp_html_path)
-        html_url = f"file://{html_abs_path}"
-        
-        with sync_playwright() as p:
-            # Launch browser
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            
-            # Load the HTML file
-            page.goto(html_url, wait_until='networkidle')
-            
-            # Wait for any fonts or resources to load
-            page.wait_for_timeout(500)
-            
-            # Generate PDF with print settings
-            page.pdf(
-                path=output_path,
-                format='A4',
-                print_background=True,  # Preserve backgrounds and colors
-                margin={
-                    'top': '0',
-                    'right': '0',
-                    'bottom': '0',
-                    'left': '0'
-                }
-            )
-            
-            browser.close()
-        
+        pdf_bytes = print_html_pdf(cached_html(key, inlined_template, inlined_cv), output_path)
+        pdf_store.put(key, pdf_bytes)
         print(f"\n✓ CV PDF generated successfully: {output_path}")
     except Exception as e:
         print(f"Error generating PDF: {e}")
         print("Make sure Playwright is installed: pip install playwright")
         print("Then install browsers: playwright install chromium")
+        manifest.discard(output_path)
+        manifest.save()
         raise
-    finally:
-        # Clean up temporary HTML file
-        if os.path.exists(temp_html_path):
-            os.remove(temp_html_path)
+    
+    manifest.record(output_path, inputs)
+    manifest.save()
+    return True
 
 if __name__ == "__main__":
-    template_name = sys.argv[1] if len(sys.argv) > 1 else None
-    generate_cv_from_template(template_name)
+    # Exit codes: 0 when every PDF is up to date or was generated, 1 when
+    # something failed, 2 for invalid arguments
+    parser = argparse.ArgumentParser(description="Generate CV PDFs from tailored CV JSON and HTML templates.")
+    parser.add_argument("template", nargs="?",
+                        help="Template file name, or 'all' for every template (default: choose interactively)")
+    parser.add_argument("--cv", metavar="JSON", default=None,
+                        help="CV JSON file; PDFs are written next to it (default: generated_result/tailored_cv.json)")
+    parser.add_argument("--tree", metavar="DIR",
+                        help="Build the PDFs of every tailored_cv.json under DIR (e.g. generated_result/bulk)")
+    parser.add_argument("--force", action="store_true", help="Rebuild PDFs even if they are up to date")
+    parser.add_argument("--workers", type=int, default=2, help="Browsers printing in parallel (default: 2)")
+    args = parser.parse_args()
 
+    if not args.template and not args.tree and not sys.stdin.isatty():
+        parser.error("a template name (or 'all') is required when not running in a terminal")
+
+    try:
+        if args.tree:
+            template_names = [args.template] if args.template and args.template != "all" else None
+            counts = generate_tree(args.tree, template_names, workers=args.workers, force=args.force)
+            ok = not counts['failed']
+        elif args.template == "all":
+            counts = generate_all_templates(workers=args.workers, force=args.force, json_path=args.cv)
+            ok = counts is not None and not counts['failed']
+        else:
+            ok = generate_cv_from_template(args.template, force=args.force, json_path=args.cv)
+    except Exception as e:
+        print(f"Error: {e}")
+        ok = False
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Pluggable LLM backends for the tailoring step.
+
+A backend turns a prompt into response text. All backends share one
+client/connection across calls and threads, apply a request timeout and
+retry transient failures with exponential backoff:
+
+- GeminiBackend: google.generativeai, configured once per process
+- StubBackend: returns a canned response in-process after a configurable delay
+- HttpStubBackend: talks to a local stub server (StubServer below) over
+  keep-alive HTTP, to exercise real network round trips
+
+The default backend is chosen with environment variables:
+
+    LLM_BACKEND=gemini|stub|http     (default: gemini)
+    LLM_TIMEOUT_SECONDS=120          request timeout
+    LLM_MAX_RETRIES=3                retries on rate limits and transient errors
+    LLM_STUB_LATENCY=0               stub/http: seconds to wait before answering
+    LLM_STUB_RESPONSE_FILE=...       stub/http: file with the canned response
+    LLM_STUB_URL=http://127.0.0.1:8808
+
+The stub backends make it possible to load-test the pipeline offline, e.g.
+
+    python llm_backend.py serve --latency 3 &
+    LLM_BACKEND=http python bulk_tailor.py job_postings/ --workers 16
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import http.client
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from google.api_core import exceptions as google_exceptions
+
+MODEL_NAME = "gemini-2.5-flash"
+
+DEFAULT_TIMEOUT = 120.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_STUB_URL = "http://127.0.0.1:8808"
+
+# Errors worth retrying: rate limits and transient server problems
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+)
+
+# Network errors worth retrying for the HTTP stub (ConnectionError covers 429/5xx below)
+RETRYABLE_HTTP_ERRORS = (ConnectionError, TimeoutError, http.client.HTTPException)
+
+SAMPLE_CV = {
+    "name": "Jane Doe",
+    "location": "Berlin, Germany",
+    "email": "jane@example.com",
+    "phone": "+49 30 1234567",
+    "github": "https://github.com/janedoe",
+    "linkedin": "https://www.linkedin.com/in/janedoe",
+    "portfolio": "",
+    "image": "",
+    "summary": "Backend engineer with eight years of Python experience.",
+    "skills": ["Python", "PostgreSQL", "Kubernetes"],
+    "experience": [
+        {
+            "company": "Acme GmbH",
+            "position": "Senior Backend Engineer",
+            "location": "Berlin, Germany",
+            "startDate": "Jan 2020",
+            "endDate": "Present",
+            "description": ["Cut API latency by 40%", "Led a team of four engineers"],
+        }
+    ],
+    "education": [
+        {
+            "institution": "TU Berlin",
+            "degree": "MSc",
+            "field": "Computer Science",
+            "location": "Berlin, Germany",
+            "startDate": "2014",
+            "endDate": "2016",
+        }
+    ],
+    "certifications": [],
+    "languages": ["English", "German"],
+    "projects": [],
+}
+
+SAMPLE_RESPONSE = f"""TAILORED_CV_START
+```json
+{json.dumps(SAMPLE_CV, indent=2)}
+```
+TAILORED_CV_END
+
+COVER_LETTER_START
+Dear Hiring Manager,
+
+I am excited to apply for this role. At Acme GmbH I cut API latency by 40%
+and led a team of four engineers.
+
+Best regards,
+Jane Doe
+COVER_LETTER_END
+"""
+
+class RetryPolicy:
+    """Retry transient errors with exponential backoff and jitter."""
+
+    def __init__(self, max_retries: int = DEFAULT_MAX_RETRIES, base_delay: float = 2.0, max_delay: float = 60.0,
+                 retry_on: tuple = RETRYABLE_ERRORS):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = retry_on
+
+    def call(self, func):
+        """Call func(), retrying errors in retry_on up to max_retries times."""
+        attempt = 0
+        while True:
+            try:
+                return func()
+            except self.retry_on:
+                if attempt >= self.max_retries:
+                    raise
+                delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+                time.sleep(delay * random.uniform(0.5, 1.0))
+                attempt += 1
+
+class LLMBackend:
+    """
+    Base class for backends.
+
+    Subclasses implement generate(); stream() defaults to yielding the whole
+    response at once. system_instruction carries static instructions that
+    are the same for every request, kept apart from the per-request prompt.
+    model_name identifies the backend in cache keys, so stub responses
+    never mix with real model results.
+    """
+    model_name = None
+
+    def generate(self, prompt: str, system_instruction: str = None) -> str:
+        """Return the full response text for a prompt."""
+        raise NotImplementedError
+
+    def stream(self, prompt: str, system_instruction: str = None):
+        """Yield the response text in chunks as it arrives."""
+        yield self.generate(prompt, system_instruction)
+
+    def generate_batch(self, prompts: list[str], workers: int = 4, system_instruction: str = None) -> list[str]:
+        """
+        Run several prompts concurrently over the shared client.
+
+        Returns the responses in prompt order; the first failure is raised
+        once the other requests have finished.
+        """
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            return list(executor.map(lambda prompt: self.generate(prompt, system_instruction), prompts))
+
+    def close(self):
+        """Release connections. The backend must not be used afterwards."""
+
+class GeminiBackend(LLMBackend):
+    """
+    Gemini via google.generativeai, with one configured model shared by all calls.
+
+    The client is configured once; one GenerativeModel is kept per system
+    instruction, so the static instructions are not resent in every prompt.
+    """
+
+    def __init__(self, model_name: str = MODEL_NAME, api_key: str = None, timeout: float = DEFAULT_TIMEOUT,
+                 retry: RetryPolicy = None):
+        self.model_name = model_name
+        self.api_key = api_key
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self._models = {}
+        self._configured = False
+        self._lock = threading.Lock()
+
+    def get_model(self, system_instruction: str = None):
+        """Configure the client on first use and return the shared GenerativeModel for an instruction."""
+        with self._lock:
+            model = self._models.get(system_instruction)
+            if model is None:
+                import google.generativeai as genai
+
+                if not self._configured:
+                    api_key = self.api_key or os.getenv("GOOGLE_API_KEY")
+                    if not api_key:
+                        raise ValueError("GOOGLE_API_KEY not found in environment variables")
+                    genai.configure(api_key=api_key)
+                    self._configured = True
+
+                model = genai.GenerativeModel(self.model_name, system_instruction=system_instruction)
+                self._models[system_instruction] = model
+            return model
+
+    def generate(self, prompt: str, system_instruction: str = None) -> str:
+        model = self.get_model(system_instruction)
+        response = self.retry.call(
+            lambda: model.generate_content(prompt, request_options={'timeout': self.timeout})
+        )
+        return response.text
+
+    def stream(self, prompt: str, system_instruction: str = None):
+        model = self.get_model(system_instruction)
+        # Only opening the stream is retried; a failure mid-stream is raised
+        response = self.retry.call(
+            lambda: model.generate_content(prompt, stream=True, request_options={'timeout': self.timeout})
+        )
+        for chunk in response:
+            yield chunk.text
+
+class StubBackend(LLMBackend):
+    """
+    In-process stand-in for a model: returns a canned response after `latency` seconds.
+
+    Args:
+        response: Response text (default: SAMPLE_RESPONSE).
+        latency: Seconds to wait before answering.
+        responder: Optional callable prompt -> response text, used instead of response.
+        chunk_size: Characters per chunk when streaming.
+    """
+    model_name = "stub"
+
+    def __init__(self, response: str = None, latency: float = 0.0, responder=None, chunk_size: int = 200):
+        self.response = response if response is not None else SAMPLE_RESPONSE
+        self.latency = latency
+        self.responder = responder
+        self.chunk_size = chunk_size
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _respond(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self.responder(prompt) if self.responder is not None else self.response
+
+    def generate(self, prompt: str, system_instruction: str = None) -> str:
+        return self._respond(prompt)
+
+    def stream(self, prompt: str, system_instruction: str = None):
+        text = self._respond(prompt)
+        for start in range(0, len(text), self.chunk_size):
+            yield text[start:start + self.chunk_size]
+
+class HttpStubBackend(LLMBackend):
+    """
+    Client for StubServer: POSTs {"prompt": ..., "system_instruction": ...} and reads {"text": ...}.
+
+    Each thread keeps one keep-alive connection, reopened after an error.
+    """
+
+    def __init__(self, url: str = DEFAULT_STUB_URL, timeout: float = DEFAULT_TIMEOUT, retry: RetryPolicy = None):
+        parts = urlsplit(url)
+        self.url = url
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = (parts.path.rstrip('/') or '') + '/generate'
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy(retry_on=RETRYABLE_HTTP_ERRORS, base_delay=0.5)
+        self.model_name = f"stub@{url}"
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+    def _post(self, prompt: str, system_instruction: str = None) -> str:
+        connection = self._connection()
+        body = json.dumps({'prompt': prompt, 'system_instruction': system_instruction}).encode('utf-8')
+        try:
+            connection.request('POST', self.path, body, {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            payload = response.read()
+        except Exception:
+            connection.close()
+            self._local.connection = None
+            raise
+
+        if response.status == 429 or response.status >= 500:
+            raise ConnectionError(f"Stub server returned HTTP {response.status}")
+        if response.status != 200:
+            raise ValueError(f"Stub server returned HTTP {response.status}: {payload[:200]!r}")
+        return json.loads(payload)['text']
+
+    def generate(self, prompt: str, system_instruction: str = None) -> str:
+        return self.retry.call(lambda: self._post(prompt, system_instruction))
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+class StubServer:
+    """
+    Local HTTP server answering POST /generate with a canned response.
+
+    Args:
+        response: Response text (default: SAMPLE_RESPONSE).
+        latency: Seconds each request waits before answering.
+        host, port: Address to bind; port 0 picks a free port.
+    """
+
+    def __init__(self, response: str = None, latency: float = 0.0, host: str = "127.0.0.1", port: int = 8808):
+        stub = StubBackend(response, latency)
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                try:
+                    prompt = json.loads(self.rfile.read(length))['prompt']
+                except (ValueError, KeyError):
+                    self.send_error(400, "Expected a JSON body with a prompt")
+                    return
+                body = json.dumps({'text': stub.generate(prompt)}).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.stub = stub
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def _stub_response_from_env() -> str:
+    path = os.getenv("LLM_STUB_RESPONSE_FILE")
+    if not path:
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def create_backend(kind: str = None, timeout: float = None, max_retries: int = None) -> LLMBackend:
+    """
+    Create a backend. Arguments left as None come from the environment (see
+    module docstring), which is read here so values from .env are picked up.
+
+    Args:
+        kind: "gemini", "stub" or "http".
+        timeout: Request timeout in seconds.
+        max_retries: Retries on transient errors.
+    """
+    kind = (kind or os.getenv("LLM_BACKEND", "gemini")).lower()
+    if timeout is None:
+        timeout = float(os.getenv("LLM_TIMEOUT_SECONDS", DEFAULT_TIMEOUT))
+    if max_retries is None:
+        max_retries = int(os.getenv("LLM_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+
+    if kind == "gemini":
+        return GeminiBackend(timeout=timeout, retry=RetryPolicy(max_retries))
+    if kind == "stub":
+        return StubBackend(_stub_response_from_env(), float(os.getenv("LLM_STUB_LATENCY", 0)))
+    if kind == "http":
+        retry = RetryPolicy(max_retries, base_delay=0.5, retry_on=RETRYABLE_HTTP_ERRORS)
+        return HttpStubBackend(os.getenv("LLM_STUB_URL", DEFAULT_STUB_URL), timeout, retry)
+    raise ValueError(f"Unknown LLM backend: {kind} (expected gemini, stub or http)")
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_backend() -> LLMBackend:
+    """Return the shared default backend, creating it on first use."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend()
+        return _backend
+
+def set_backend(backend: LLMBackend):
+    """Replace the shared default backend, e.g. with a StubBackend in load tests."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stub LLM server for offline load tests.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve = subparsers.add_parser("serve", help="Answer POST /generate with a canned response")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8808)
+    serve.add_argument("--latency", type=float, default=0.0, help="Seconds to wait per request")
+    serve.add_argument("--response-file", default=None, help="File with the canned response (default: a sample)")
+    args = parser.parse_args()
+
+    response = None
+    if args.response_file:
+        with open(args.response_file, 'r', encoding='utf-8') as f:
+            response = f.read()
+
+    server = StubServer(response, args.latency, args.host, args.port)
+    print(f"Stub LLM server on {server.url}/generate (latency {args.latency}s). Ctrl+C to stop.")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+    sys.exit(0)
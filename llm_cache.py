@@ -0,0 +1,118 @@
+"""
+Persistent cache for Gemini tailoring results.
+
+Results are keyed on a hash of the model name, prompt version, CV text and job
+description, and stored in a local SQLite database so they survive restarts.
+Entries expire after a TTL, and the least recently used entries are evicted
+once the cache holds more than max_entries results.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite3")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL_SECONDS", 30 * 24 * 3600))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1000))
+
+def make_cache_key(model_name: str, prompt_version, cv_content: str, job_description: str) -> str:
+    """Content-addressed key for one tailoring request."""
+    payload = json.dumps([model_name, str(prompt_version), cv_content, job_description], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class TailoringCache:
+    """SQLite-backed cache of (cv_data, cover_letter) results with TTL and LRU eviction."""
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: float = LLM_CACHE_TTL,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        """
+        Args:
+            path: SQLite database file (created if missing).
+            ttl: Seconds an entry stays valid. 0 or less disables expiry.
+            max_entries: Maximum number of entries kept.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS tailoring_cache (
+                    key TEXT PRIMARY KEY,
+                    cv_data TEXT NOT NULL,
+                    cover_letter TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_tailoring_cache_accessed ON tailoring_cache (accessed_at)"
+            )
+
+    def get(self, key: str):
+        """Return (cv_data, cover_letter) for a key, or None if missing or expired."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT cv_data, cover_letter, created_at FROM tailoring_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            cv_data, cover_letter, created_at = row
+            if self.ttl > 0 and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM tailoring_cache WHERE key = ?", (key,))
+                return None
+
+            self._conn.execute("UPDATE tailoring_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(cv_data), cover_letter
+
+    def put(self, key: str, cv_data: dict, cover_letter: str):
+        """Store a result, evicting expired and least recently used entries as needed."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tailoring_cache (key, cv_data, cover_letter, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(cv_data, ensure_ascii=False), cover_letter, now, now),
+            )
+            if self.ttl > 0:
+                self._conn.execute("DELETE FROM tailoring_cache WHERE created_at < ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM tailoring_cache WHERE key IN ("
+                "SELECT key FROM tailoring_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tailoring_cache")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tailoring_cache").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_default_cache() -> TailoringCache:
+    """Shared cache at LLM_CACHE_PATH, opened on first use."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = TailoringCache()
+        return _default_cache
@@ -1,18 +1,25 @@
 import os
 import re
+import sys
 import json
 import dotenv
-import google.generativeai as genai
-import PyPDF2
-from docx import Document
+import argparse
+from template_engine import ContextStack, guess_item_alias, key_path, load_template
+from cv_model import CV, validate_cv
+from resume_reader import read_resume
+from postprocess import clean_cover_letter, strip_code_fences
+from llm_cache import get_default_cache, make_cache_key
+from llm_backend import create_backend, get_backend
+from prompt_compaction import compact_prompt_inputs, estimate_tokens, format_stats
+from tracing import span
 
 dotenv.load_dotenv()
 
-MODEL_NAME = "gemini-2.5-flash"
+# Bump when the prompt or response parsing changes, so cached results are not reused
+PROMPT_VERSION = 2
 
-def read_job_description() -> str:
-    """Read job description from job_description.txt file."""
-    job_desc_file = "job_description.txt"
+def read_job_description(job_desc_file: str = "job_description.txt") -> str:
+    """Read job description from job_description.txt (or another text file)."""
     if not os.path.exists(job_desc_file):
         raise FileNotFoundError(f"Job description file not found: {job_desc_file}")
     
@@ -22,166 +29,126 @@ def read_job_description() -> str:
             raise ValueError("Job description file is empty")
         return content
 
-def read_cv_from_resume_folder() -> str:
-    """Read CV from resume folder. Supports .pdf, .doc, and .docx files."""
-    resume_folder = "resume"
+def read_cv_from_resume_folder(resume_folder: str = "resume", use_cache: bool = True, pdf_workers: int = None) -> str:
+    """
+    Read CV from resume folder. Supports .pdf, .doc, and .docx files.
+    
+    pdf_workers is passed to the PDF extractor (None picks automatically,
+    0 extracts in-process).
+    """
     if not os.path.exists(resume_folder):
         raise FileNotFoundError(f"Resume folder not found: {resume_folder}")
     
     if not os.path.isdir(resume_folder):
         raise ValueError(f"{resume_folder} is not a directory")
     
-    # Get all files in the resume folder
-    files = [f for f in os.listdir(resume_folder) if os.path.isfile(os.path.join(resume_folder, f))]
+    # Get all files in the resume folder, in a stable order
+    files = sorted(f for f in os.listdir(resume_folder) if os.path.isfile(os.path.join(resume_folder, f)))
     
     if not files:
         raise FileNotFoundError(f"No files found in {resume_folder} folder")
     
-    # If multiple files, use the first one (or you could make it more specific)
+    # If multiple files, use the first one (see resume_reader.ingest_resumes for bulk ingestion)
     if len(files) > 1:
         print(f"Multiple files found in resume folder. Using: {files[0]}")
     
     cv_path = os.path.join(resume_folder, files[0])
-    file_ext = os.path.splitext(cv_path)[1].lower()
-    
-    # Handle PDF files
-    if file_ext == '.pdf':
-        try:
-            with open(cv_path, 'rb') as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                if not text.strip():
-                    raise ValueError("Could not extract text from PDF. The PDF might be image-based or corrupted.")
-                return text.strip()
-        except Exception as e:
-            raise ValueError(f"Error reading PDF file: {e}")
-    
-    # Handle DOCX files (modern Word format)
-    elif file_ext == '.docx':
-        try:
-            doc = Document(cv_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            if not text.strip():
-                raise ValueError("Could not extract text from DOCX file. The file might be empty or corrupted.")
-            return text.strip()
-        except Exception as e:
-            raise ValueError(f"Error reading DOCX file: {e}")
-    
-    # Handle DOC files (older Word format)
-    elif file_ext == '.doc':
-        try:
-            # Try using textract if available, otherwise suggest conversion
-            try:
-                import textract
-                text = textract.process(cv_path).decode('utf-8')
-                if not text.strip():
-                    raise ValueError("Could not extract text from DOC file.")
-                return text.strip()
-            except ImportError:
-                raise ValueError(
-                    "Reading .doc files requires the 'textract' library. "
-                    "Please install it with: pip install textract\n"
-                    "Alternatively, convert your .doc file to .docx format."
-                )
-        except Exception as e:
-            raise ValueError(f"Error reading DOC file: {e}")
-    
-    # Handle text files as fallback
-    else:
-        try:
-            with open(cv_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except Exception as e:
-            raise ValueError(f"Error reading text file: {e}. Supported formats: .pdf, .doc, .docx, .txt")
-
-def tailor_cv_and_generate_cover_letter(cv_content: str, job_description: str, image_path: str = None) -> tuple[dict, str]:
-    """
-    Use Gemini API to tailor CV and generate cover letter."""
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        raise ValueError("GOOGLE_API_KEY not found in environment variables")
-    
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel(MODEL_NAME)
     
-    prompt = f"""You are a professional career coach. Based on the following job description and the user's CV, please:
+    # Extracted text is cached next to the resume, keyed by its content hash
+    return read_resume(cv_path, use_cache, pdf_workers)
 
-    1. Create a tailored version of the CV in JSON format that highlights relevant skills and experiences for this specific job.
-    2. Generate a compelling cover letter that connects the candidate's experience to the job requirements.
+# Static part of the tailoring prompt, sent as the model's system instruction so
+# it is identical (and cacheable) across requests
+TAILORING_SYSTEM_INSTRUCTION = """You are a professional career coach. Based on the job description and the user's CV you are given, please:
 
-    IMPORTANT REQUIREMENTS:
-    - Use ONLY real information from the provided CV. Do NOT use placeholders, brackets, or generic text.
-    - Do NOT include placeholders like [Your Name], [Company Name], [Date], [Address], etc.
-    - Use actual names, dates, companies, and details from the CV provided.
-    - If information is missing from the CV, use empty strings for strings, empty arrays for arrays, or omit the field.
-    - For the cover letter: Start directly with the salutation (e.g., "Dear Hiring Manager,") and proceed with the body. Do NOT include addresses, dates, or headers at the top.
+1. Create a tailored version of the CV in JSON format that highlights relevant skills and experiences for this specific job.
+2. Generate a compelling cover letter that connects the candidate's experience to the job requirements.
 
-    Job Description:
-    {job_description}
+IMPORTANT REQUIREMENTS:
+- Use ONLY real information from the provided CV. Do NOT use placeholders, brackets, or generic text.
+- Do NOT include placeholders like [Your Name], [Company Name], [Date], [Address], etc.
+- Use actual names, dates, companies, and details from the CV provided.
+- If information is missing from the CV, use empty strings for strings, empty arrays for arrays, or omit the field.
+- For the cover letter: Start directly with the salutation (e.g., "Dear Hiring Manager,") and proceed with the body. Do NOT include addresses, dates, or headers at the top.
 
-    Original CV:
-    {cv_content}
+For the tailored CV, provide a valid JSON object with the following structure:
+{
+    "name": "Full Name",
+    "location": "City, Country",
+    "email": "email@example.com",
+    "phone": "phone number",
+    "github": "https://github.com/username",
+    "linkedin": "https://linkedin.com/in/username",
+    "portfolio": "https://portfolio-url.com",
+    "image": "image URL or file path (empty string if no image)",
+    "summary": "Professional summary tailored to the job",
+    "skills": ["skill1", "skill2", "skill3"],
+    "experience": [
+        {
+            "company": "Company Name",
+            "position": "Job Title",
+            "location": "City, Country",
+            "startDate": "Month Year",
+            "endDate": "Month Year or Present",
+            "description": ["Achievement 1", "Achievement 2"]
+        }
+    ],
+    "education": [
+        {
+            "institution": "University Name",
+            "degree": "Degree Name",
+            "field": "Field of Study",
+            "location": "City, Country",
+            "startDate": "Year",
+            "endDate": "Year"
+        }
+    ],
+    "certifications": ["Certification 1", "Certification 2"],
+    "languages": ["Language 1", "Language 2"],
+    "projects": [
+        {
+            "name": "Project Name",
+            "description": "Project description",
+            "technologies": ["tech1", "tech2"]
+        }
+    ]
+}
 
-    For the tailored CV, provide a valid JSON object with the following structure:
-    {{
-        "name": "Full Name",
-        "location": "City, Country",
-        "email": "email@example.com",
-        "phone": "phone number",
-        "github": "https://github.com/username",
-        "linkedin": "https://linkedin.com/in/username",
-        "portfolio": "https://portfolio-url.com",
-        "image": "image URL or file path (empty string if no image)",
-        "summary": "Professional summary tailored to the job",
-        "skills": ["skill1", "skill2", "skill3"],
-        "experience": [
-            {{
-                "company": "Company Name",
-                "position": "Job Title",
-                "location": "City, Country",
-                "startDate": "Month Year",
-                "endDate": "Month Year or Present",
-                "description": ["Achievement 1", "Achievement 2"]
-            }}
-        ],
-        "education": [
-            {{
-                "institution": "University Name",
-                "degree": "Degree Name",
-                "field": "Field of Study",
-                "location": "City, Country",
-                "startDate": "Year",
-                "endDate": "Year"
-            }}
-        ],
-        "certifications": ["Certification 1", "Certification 2"],
-        "languages": ["Language 1", "Language 2"],
-        "projects": [
-            {{
-                "name": "Project Name",
-                "description": "Project description",
-                "technologies": ["tech1", "tech2"]
-            }}
-        ]
-    }}
+Please provide your response in the following format:
+TAILORED_CV_START
+[valid JSON object here - use only real information from the CV, no placeholders]
+TAILORED_CV_END
 
-    Please provide your response in the following format:
-    TAILORED_CV_START
-    [valid JSON object here - use only real information from the CV, no placeholders]
-    TAILORED_CV_END
+COVER_LETTER_START
+[cover letter content here - start with salutation, no address/header, use only real information from the CV, no placeholders]
+COVER_LETTER_END
+"""
 
-    COVER_LETTER_START
-    [cover letter content here - start with salutation, no address/header, use only real information from the CV, no placeholders]
-    COVER_LETTER_END
-    """
+def build_tailoring_prompt(cv_content: str, job_description: str) -> str:
+    """Build the per-request part of the Gemini prompt; the instructions are in TAILORING_SYSTEM_INSTRUCTION."""
+    return f"""Job Description:
+{job_description}
+
+Original CV:
+{cv_content}
+"""
+
+def parse_tailored_cv_json(tailored_cv_json: str) -> dict:
+    """Parse the JSON between the TAILORED_CV markers, tolerating markdown code fences."""
+    # Clean up the JSON - remove markdown code blocks if present
+    tailored_cv_json = strip_code_fences(tailored_cv_json)
     
-    response = model.generate_content(prompt)
-    response_text = response.text
+    # Parse and validate JSON
+    try:
+        cv_data = json.loads(tailored_cv_json)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON format in tailored CV: {e}")
     
+    # Check field types against the CV schema (raises ValueError naming the bad field)
+    return validate_cv(cv_data).to_dict()
+
+def parse_tailoring_response(response_text: str) -> tuple[dict, str]:
+    """Extract the tailored CV JSON and the cleaned cover letter from a Gemini response."""
     # Parse the response
     cv_start = response_text.find("TAILORED_CV_START")
     cv_end = response_text.find("TAILORED_CV_END")
@@ -193,112 +160,208 @@ def tailor_cv_and_generate_cover_letter(cv_content: str, job_description: str, i
     if letter_start == -1 or letter_end == -1:
         raise ValueError("Could not parse cover letter from response")
     
-    tailored_cv_json = response_text[cv_start + len("TAILORED_CV_START"):cv_end].strip()
+    tailored_cv_json = response_text[cv_start + len("TAILORED_CV_START"):cv_end]
     cover_letter = response_text[letter_start + len("COVER_LETTER_START"):letter_end].strip()
     
-    # Clean up the JSON - remove markdown code blocks if present
-    tailored_cv_json = re.sub(r'^```json\s*', '', tailored_cv_json, flags=re.MULTILINE)
-    tailored_cv_json = re.sub(r'^```\s*', '', tailored_cv_json, flags=re.MULTILINE)
-    tailored_cv_json = tailored_cv_json.strip()
-    
-    # Parse and validate JSON
-    try:
-        cv_data = json.loads(tailored_cv_json)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Invalid JSON format in tailored CV: {e}")
-    
+    cv_data = parse_tailored_cv_json(tailored_cv_json)
+    with span("cover_letter.scrub", bytes_in=len(cover_letter.encode('utf-8'))) as s:
+        cover_letter = clean_cover_letter(cover_letter)
+        s.set(bytes_out=len(cover_letter.encode('utf-8')))
+    return cv_data, cover_letter
+
+def apply_image(cv_data: dict, image_path: str = None) -> dict:
+    """Set the CV image field from image_path, or default it to an empty string."""
     # Add image field if provided
     if image_path:
         cv_data["image"] = image_path
     elif "image" not in cv_data:
         cv_data["image"] = ""
+    return cv_data
+
+def tailor_cv_and_generate_cover_letter(cv_content: str, job_description: str, image_path: str = None,
+                                        use_cache: bool = True, backend=None, compact: bool = True,
+                                        verbose: bool = False) -> tuple[dict, str]:
+    """
+    Use Gemini API to tailor CV and generate cover letter.
+    
+    Results are cached on disk (see llm_cache), so repeating a run with the
+    same CV and job description does not call the API again. Pass
+    use_cache=False to always ask the model. The shared backend from
+    llm_backend.get_backend() (Gemini unless LLM_BACKEND says otherwise) is
+    used unless another backend is given.
+    
+    With compact=True the CV text and job description are compacted first
+    (see prompt_compaction), and the static instructions go in the system
+    instruction rather than the prompt. verbose=True prints the token
+    savings of the compaction.
+    """
+    if backend is None:
+        backend = get_backend()
+    with span("prompt.build", bytes_in=len(cv_content.encode('utf-8')) + len(job_description.encode('utf-8'))) as s:
+        if compact:
+            cv_content, job_description, stats = compact_prompt_inputs(cv_content, job_description)
+            if verbose:
+                print(f"Prompt size: {format_stats(stats)}")
+        prompt = build_tailoring_prompt(cv_content, job_description)
+        s.set(bytes_out=len(prompt.encode('utf-8')), tokens_out=estimate_tokens(prompt))
+    
+    cache = get_default_cache() if use_cache else None
+    cache_key = make_cache_key(backend.model_name, PROMPT_VERSION, cv_content, job_description)
+    
+    cached = cache.get(cache_key) if cache is not None else None
+    if cached is not None:
+        cv_data, cover_letter = cached
+    else:
+        with span("llm.generate", model=backend.model_name,
+                  tokens_in=estimate_tokens(prompt) + estimate_tokens(TAILORING_SYSTEM_INSTRUCTION)) as s:
+            response_text = backend.generate(prompt, TAILORING_SYSTEM_INSTRUCTION)
+            s.set(bytes_out=len(response_text.encode('utf-8')), tokens_out=estimate_tokens(response_text))
+        with span("response.parse", bytes_in=len(response_text.encode('utf-8'))):
+            cv_data, cover_letter = parse_tailoring_response(response_text)
+        
+        if cache is not None:
+            cache.put(cache_key, cv_data, cover_letter)
     
-    # Remove placeholder patterns from cover letter
-    placeholder_patterns = [
-        r'\[Your Name\]', r'\[your name\]', r'\[YOUR NAME\]',
-        r'\[Company Name\]', r'\[company name\]', r'\[COMPANY NAME\]',
-        r'\[Company\]', r'\[company\]',
-        r'\[Date\]', r'\[date\]', r'\[DATE\]',
-        r'\[Address\]', r'\[address\]', r'\[ADDRESS\]',
-        r'\[Phone\]', r'\[phone\]', r'\[PHONE\]',
-        r'\[Email\]', r'\[email\]', r'\[EMAIL\]',
-        r'\[Job Title\]', r'\[job title\]', r'\[JOB TITLE\]',
-        r'\[Years\]', r'\[years\]', r'\[YEARS\]',
-        r'\[Skill\]', r'\[skill\]', r'\[SKILL\]',
-        r'\[.*?placeholder.*?\]',  # Any text with "placeholder" in brackets
-        r'\{.*?placeholder.*?\}',  # Any text with "placeholder" in braces
-    ]
-    
-    for pattern in placeholder_patterns:
-        cover_letter = re.sub(pattern, '', cover_letter, flags=re.IGNORECASE)
-    
-    # Clean up cover letter
-    lines_letter = [line.strip() for line in cover_letter.split('\n') if line.strip()]
-    cover_letter = '\n'.join(lines_letter)
-    
-    return cv_data, cover_letter
+    return apply_image(cv_data, image_path), cover_letter
 
-def populate_template(template_path: str, json_data: dict, output_path: str):
+def save_tailoring_results(output_folder: str, tailored_cv: dict, cover_letter: str,
+                           job_description: str = None) -> str:
     """
-    Populate an HTML template with data from JSON.
+    Write tailored_cv.json and cover_letter.md (and job_description.txt if given) to a folder.
+
+    Returns the path of the CV JSON.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    
+    cv_path = os.path.join(output_folder, "tailored_cv.json")
+    with open(cv_path, 'w', encoding='utf-8') as f:
+        json.dump(tailored_cv, f, indent=2, ensure_ascii=False)
+    with open(os.path.join(output_folder, "cover_letter.md"), 'w', encoding='utf-8') as f:
+        f.write(cover_letter)
+    if job_description is not None:
+        with open(os.path.join(output_folder, "job_description.txt"), 'w', encoding='utf-8') as f:
+            f.write(job_description)
+    return cv_path
+
+def derived_template_fields(json_data: dict, fields=None) -> dict:
+    """
+    Return only the derived fields templates expect for this CV data.
     
-    Supports:
-    - Simple placeholders: {{field}}
-    - Conditionals: {{#field}}...{{/field}}
-    - Loops: {{#list}}...{{/list}}
-    - Nested structures
+    Covers job_title (when missing or empty), languages_comma_separated and
+    the *_display values. Rendering pushes this small dict as a scope on top
+    of the CV data, so the CV data itself is never copied.
+    
+    Args:
+        json_data: CV data dictionary.
+        fields: Names the template uses (its index.fields); derived fields
+            outside it are not built. None builds all of them.
     """
-    # Read template
-    with open(template_path, 'r', encoding='utf-8') as f:
-        template = f.read()
+    data = {}
+    
+    def wanted(name):
+        return fields is None or name in fields
     
     # Add job_title if not present (use first experience position or empty)
-    if 'job_title' not in json_data or not json_data['job_title']:
-        if json_data.get('experience') and len(json_data['experience']) > 0:
-            json_data['job_title'] = json_data['experience'][0].get('position', '')
+    if wanted('job_title') and ('job_title' not in json_data or not json_data['job_title']):
+        experience = json_data.get('experience')
+        # Odd shapes the validator kept as they came (see cv_model.validate_cv) give no title
+        if isinstance(experience, list) and experience and isinstance(experience[0], dict):
+            data['job_title'] = experience[0].get('position', '')
         else:
-            json_data['job_title'] = ''
+            data['job_title'] = ''
     
     # Add comma-separated languages for templates that need it
-    if 'languages' in json_data and isinstance(json_data['languages'], list):
-        json_data['languages_comma_separated'] = ', '.join(json_data['languages'])
+    if wanted('languages_comma_separated') and 'languages' in json_data and isinstance(json_data['languages'], list):
+        data['languages_comma_separated'] = ', '.join(json_data['languages'])
     
     # Add display text for GitHub, LinkedIn, and Portfolio URLs
-    if 'github' in json_data and json_data['github']:
+    if wanted('github_display') and 'github' in json_data and json_data['github']:
         github_url = json_data['github']
         # Extract clean display text (e.g., "github.com/username" or just "GitHub")
         if 'github.com' in github_url:
-            json_data['github_display'] = github_url.replace('https://', '').replace('http://', '').replace('www.', '')
+            data['github_display'] = github_url.replace('https://', '').replace('http://', '').replace('www.', '')
         else:
-            json_data['github_display'] = 'GitHub'
+            data['github_display'] = 'GitHub'
     
-    if 'linkedin' in json_data and json_data['linkedin']:
+    if wanted('linkedin_display') and 'linkedin' in json_data and json_data['linkedin']:
         linkedin_url = json_data['linkedin']
         # Extract clean display text
         if 'linkedin.com' in linkedin_url:
-            json_data['linkedin_display'] = linkedin_url.replace('https://', '').replace('http://', '').replace('www.', '')
+            data['linkedin_display'] = linkedin_url.replace('https://', '').replace('http://', '').replace('www.', '')
         else:
-            json_data['linkedin_display'] = 'LinkedIn'
+            data['linkedin_display'] = 'LinkedIn'
     
-    if 'portfolio' in json_data and json_data['portfolio']:
+    if wanted('portfolio_display') and 'portfolio' in json_data and json_data['portfolio']:
         portfolio_url = json_data['portfolio']
         # Extract clean display text
         if portfolio_url.startswith('http'):
-            json_data['portfolio_display'] = portfolio_url.replace('https://', '').replace('http://', '').replace('www.', '')
+            data['portfolio_display'] = portfolio_url.replace('https://', '').replace('http://', '').replace('www.', '')
         else:
-            json_data['portfolio_display'] = 'Portfolio'
+            data['portfolio_display'] = 'Portfolio'
+    
+    return data
+
+def prepare_template_data(json_data: dict) -> dict:
+    """
+    Return a copy of the CV data with the derived fields templates expect.
+    
+    The caller's dictionary is not modified. Rendering uses a ContextStack of
+    the CV data and derived_template_fields() instead, which avoids the copy.
+    """
+    return {**json_data, **derived_template_fields(json_data)}
+
+def template_context(json_data, fields=None) -> ContextStack:
+    """
+    Scope stack for rendering: the CV data with its derived fields on top.
+    
+    fields limits the derived fields to those a template uses (see
+    derived_template_fields).
+    """
+    if isinstance(json_data, CV):
+        # Derived fields are computed on lookup by the model itself
+        return ContextStack([json_data])
+    return ContextStack([json_data, derived_template_fields(json_data, fields)])
+
+def populate_template(template_path: str, json_data, output_path: str = None) -> str:
+    """
+    Populate an HTML template with data from JSON.
+    
+    json_data is a CV dictionary or a cv_model.CV. A CV is rendered as-is,
+    with derived fields computed on lookup instead of on a copied dict.
+    
+    Supports:
+    - Simple placeholders: {{field}}
+    - Conditionals: {{#field}}...{{/field}}
+    - Loops: {{#list}}...{{/list}}
+    - Nested structures
     
-    # Process template recursively
-    template = process_template_recursive(template, json_data)
+    Returns the rendered HTML. It is also written to output_path if given.
+    """
+    with span("template.render", template=os.path.basename(template_path)) as s:
+        # Load the compiled template (parsed once and cached per file)
+        compiled = load_template(template_path)
+        
+        # Render the template in a single walk over its node tree, deriving
+        # only the fields its index says it uses
+        template = compiled.render(template_context(json_data, compiled.index.fields))
+        s.set(bytes_out=len(template.encode('utf-8')))
     
     # Write output
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(template)
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(template)
+        
+        print(f"Generated CV: {output_path}")
     
-    print(f"Generated CV: {output_path}")
+    return template
 
-def process_template_recursive(template: str, data: dict) -> str:
-    """Recursively process template with conditionals, loops, and placeholders."""
+def process_template_recursive(template: str, data) -> str:
+    """
+    Recursively process template with conditionals, loops, and placeholders.
+    
+    data is a dictionary or a ContextStack; loops push each item onto the
+    stack rather than merging it into a copy of data.
+    """
     result = template
     max_iterations = 10  # Prevent infinite loops
     iteration = 0
@@ -323,8 +386,9 @@ def process_template_recursive(template: str, data: dict) -> str:
     
     return result
 
-def process_loops(template: str, data: dict) -> str:
+def process_loops(template: str, data) -> str:
     """Process list loops: {{#list}}...{{/list}}"""
+    context = data if isinstance(data, ContextStack) else ContextStack([data])
     list_pattern = r'\{\{#(\w+_list)\}\}(.*?)\{\{/\1\}\}'
     
     def replace_list(match):
@@ -333,41 +397,43 @@ def process_loops(template: str, data: dict) -> str:
         
         # Extract the base field name (e.g., 'skills_list' -> 'skills')
         base_field = list_name.replace('_list', '')
-        field_value = get_nested_value(data, base_field)
+        field_value = context.get(base_field)
         
         if not isinstance(field_value, list) or len(field_value) == 0:
             return ''
         
+        # Key for string items, picked from the loop body once per loop
+        item_alias = guess_item_alias(content)
+        
         # Process each item in the list
         items_html = []
         for item in field_value:
-            item_data = {}
+            # Scopes pushed for this item, innermost last
+            item_scopes = [{}]
             if isinstance(item, str):
                 # Simple list item (like skills, languages, certifications)
-                # Try to match the expected field name in the template
-                if 'skill' in content.lower():
-                    item_data = {'skill': item}
-                elif 'language' in content.lower():
-                    item_data = {'language': item}
-                elif 'certification' in content.lower():
-                    item_data = {'certification': item}
-                elif 'tech' in content.lower():
-                    item_data = {'tech': item}
-                else:
-                    item_data = {'item': item}
+                item_scopes = [{item_alias: item}]
             elif isinstance(item, dict):
                 # Complex list item (like experience, education, projects)
-                item_data = item.copy()
-                # Handle nested lists within items
+                item_scopes = [item]
+                # Handle nested lists within items, in a scope above the item itself
+                nested_lists = {}
                 if 'description' in item and isinstance(item['description'], list):
-                    item_data['description_list'] = [{'item': desc} for desc in item['description']]
+                    nested_lists['description_list'] = [{'item': desc} for desc in item['description']]
                 if 'technologies' in item and isinstance(item['technologies'], list):
-                    item_data['technologies_list'] = [{'tech': tech} for tech in item['technologies']]
-            
-            # Merge item data with main data for nested processing
-            merged_data = {**data, **item_data}
-            # Process nested conditionals and loops in the content
-            item_template = process_template_recursive(content, merged_data)
+                    nested_lists['technologies_list'] = [{'tech': tech} for tech in item['technologies']]
+                if nested_lists:
+                    item_scopes.append(nested_lists)
+
+            # Push the item over the main data for nested processing
+            for scope in item_scopes:
+                context.push(scope)
+            try:
+                # Process nested conditionals and loops in the content
+                item_template = process_template_recursive(content, context)
+            finally:
+                for _ in item_scopes:
+                    context.pop()
             items_html.append(item_template)
         
         return ''.join(items_html)
@@ -376,16 +442,13 @@ def process_loops(template: str, data: dict) -> str:
 
 def process_conditionals(template: str, data: dict) -> str:
     """Process conditionals: {{#field}}...{{/field}}"""
-    conditional_pattern = r'\{\{#(\w+)\}\}(.*?)\{\{/\1\}\}'
+    # List sections are handled by process_loops, so the pattern skips them
+    conditional_pattern = r'\{\{#(?!\w*_list\}\})(\w+)\}\}(.*?)\{\{/\1\}\}'
     
     def replace_conditional(match):
         field_name = match.group(1)
         content = match.group(2)
         
-        # Skip if it's a list pattern (handled separately)
-        if field_name.endswith('_list'):
-            return match.group(0)
-        
         # Check if field exists and is truthy
         field_value = get_nested_value(data, field_name)
         
@@ -433,14 +496,15 @@ def replace_simple_placeholders(template: str, data: dict) -> str:
     
     return result
 
-def get_nested_value(data: dict, key: str):
-    """Get value from nested dictionary or return None."""
+def get_nested_value(data, key: str):
+    """Get value from nested dictionary or context stack, or return None."""
+    if isinstance(data, ContextStack):
+        return data.get(key)
     if not isinstance(data, dict):
         return None
     
-    keys = key.split('.')
     value = data
-    for k in keys:
+    for k in key_path(key):
         if isinstance(value, dict) and k in value:
             value = value[k]
         else:
@@ -452,61 +516,79 @@ if __name__ == "__main__":
     # based the read the user cv
     # and use google gemini api to taylor the cv and generate a cover letter
     # then save the cover letter and tailored cv as markdown files
+    #
+    # Without a terminal (or with --yes) nothing is asked, so the script can
+    # run in schedulers; --jobs runs a whole job file (see run_jobs.py).
+    parser = argparse.ArgumentParser(description="Tailor your CV and write a cover letter for a job description.")
+    parser.add_argument("--job-description", metavar="FILE", default="job_description.txt",
+                        help="Job description text file (default: job_description.txt)")
+    parser.add_argument("--resume", metavar="DIR", default="resume", help="Resume folder (default: resume)")
+    parser.add_argument("--image", default=None, help="Portrait image URL or path to add to the CV")
+    parser.add_argument("--output", metavar="DIR", default="generated_result",
+                        help="Folder for tailored_cv.json and cover_letter.md (default: generated_result)")
+    parser.add_argument("--backend", choices=["gemini", "stub", "http"], default=None,
+                        help="LLM backend (default: LLM_BACKEND or gemini)")
+    parser.add_argument("-y", "--yes", action="store_true", help="Do not ask anything; use the files as they are")
+    parser.add_argument("--jobs", metavar="FILE",
+                        help="Run tailoring and PDF generation for every row of a YAML or JSONL job file")
+    parser.add_argument("--workers", type=int, default=4, help="Rows tailored concurrently with --jobs (default: 4)")
+    args = parser.parse_args()
+    
+    if args.jobs:
+        from run_jobs import run_job_file
+        sys.exit(run_job_file(args.jobs, workers=args.workers, backend_kind=args.backend))
+    
+    interactive = not args.yes and sys.stdin.isatty()
     
     try:
-        # Prompt user to paste job description in file
-        print("Please paste the job description in 'job_description.txt' file.")
-        print("Once done, enter 'Y' to proceed: ", end="")
-        
-        while True:
-            user_input = input().strip().upper()
-            if user_input == 'Y':
-                break
-            print("Please enter 'Y' when you're done pasting the job description: ", end="")
+        image_path = args.image
+        if interactive:
+            # Prompt user to paste job description in file
+            print(f"Please paste the job description in '{args.job_description}' file.")
+            print("Once done, enter 'Y' to proceed: ", end="")
+            
+            while True:
+                user_input = input().strip().upper()
+                if user_input == 'Y':
+                    break
+                print("Please enter 'Y' when you're done pasting the job description: ", end="")
         
         # Read job description from file
         print("\nReading job description from file...")
-        job_description = read_job_description()
+        job_description = read_job_description(args.job_description)
         
         # Read CV from resume folder
         print("Reading CV from resume folder...")
-        cv_content = read_cv_from_resume_folder()
+        cv_content = read_cv_from_resume_folder(args.resume)
         
         # Ask if user wants to add an image
-        image_path = None
-        print("\nDo you want to add a portrait image to your CV? (Y/N): ", end="")
-        add_image = input().strip().upper()
+        if interactive and image_path is None:
+            print("\nDo you want to add a portrait image to your CV? (Y/N): ", end="")
+            add_image = input().strip().upper()
+            
+            if add_image == 'Y':
+                print("Enter the image link (URL) or local file path (must be a portrait image): ", end="")
+                image_path = input().strip()
+                if not image_path:
+                    print("No image path provided. Continuing without image.")
+                    image_path = None
         
-        if add_image == 'Y':
-            print("Enter the image link (URL) or local file path (must be a portrait image): ", end="")
-            image_path = input().strip()
-            if not image_path:
-                print("No image path provided. Continuing without image.")
-                image_path = None
+        backend = create_backend(args.backend) if args.backend else None
         
         print("\nProcessing with Gemini API...")
-        tailored_cv, cover_letter = tailor_cv_and_generate_cover_letter(cv_content, job_description, image_path)
-        
-        # Create generated_result folder if it doesn't exist
-        output_folder = "generated_result"
-        if not os.path.exists(output_folder):
-            os.makedirs(output_folder)
-        
-        # Save tailored CV to JSON file
-        print("\nSaving tailored CV to JSON file...")
-        cv_path = os.path.join(output_folder, "tailored_cv.json")
-        with open(cv_path, 'w', encoding='utf-8') as f:
-            json.dump(tailored_cv, f, indent=2, ensure_ascii=False)
-        print(f"Saved to {cv_path}")
+        tailored_cv, cover_letter = tailor_cv_and_generate_cover_letter(cv_content, job_description, image_path,
+                                                                        backend=backend, verbose=True)
         
-        # Save cover letter to markdown file
-        print("Saving cover letter to markdown file...")
-        letter_path = os.path.join(output_folder, "cover_letter.md")
-        with open(letter_path, 'w', encoding='utf-8') as f:
-            f.write(cover_letter)
-        print(f"Saved to {letter_path}")
+        # Save tailored CV to JSON file and cover letter to markdown file
+        print("\nSaving tailored CV and cover letter...")
+        cv_path = save_tailoring_results(args.output, tailored_cv, cover_letter)
+        print(f"Saved to {cv_path} and {os.path.join(args.output, 'cover_letter.md')}")
         
         print("\n✓ Successfully generated tailored CV and cover letter!")
         
+    except (KeyboardInterrupt, EOFError):
+        print("\nCancelled.")
+        sys.exit(130)
     except Exception as e:
-        print(f"Error: {e}")
\ No newline at end of file
+        print(f"Error: {e}")
+        sys.exit(1)
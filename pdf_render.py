@@ -0,0 +1,263 @@
+"""
+HTML to PDF rendering with headless Chromium.
+
+Provides the shared print settings and a long-lived worker pool that keeps
+browsers and pages warm between jobs, so each PDF only pays for loading and
+printing the page instead of launching a new browser.
+"""
+
+import os
+import queue
+import threading
+import contextvars
+from concurrent.futures import Future
+from playwright.sync_api import sync_playwright
+from tracing import span
+
+# Print settings shared by every PDF we generate
+PDF_OPTIONS = {
+    'format': 'A4',
+    'print_background': True,  # Preserve backgrounds and colors
+    'margin': {
+        'top': '0',
+        'right': '0',
+        'bottom': '0',
+        'left': '0'
+    }
+}
+
+# Resolves once every font the page uses has loaded (or failed)
+FONTS_READY_SCRIPT = "document.fonts.ready.then(() => document.fonts.status)"
+
+def write_pdf(pdf_bytes: bytes, output=None):
+    """
+    Send PDF bytes to an output.
+
+    output may be None (nothing is written), a file path, or any writable
+    binary object with a write() method such as an open file or HTTP response.
+    """
+    if output is None:
+        return
+    if isinstance(output, (str, os.PathLike)):
+        with open(output, 'wb') as f:
+            f.write(pdf_bytes)
+    else:
+        output.write(pdf_bytes)
+
+def print_pdf(page, html: str, output=None) -> bytes:
+    """
+    Load HTML straight into a page and print it to PDF.
+
+    Returns the PDF bytes, and also writes them to output (see write_pdf).
+    """
+    with span("pdf.load", bytes_in=len(html.encode('utf-8'))):
+        # Load the HTML without a temporary file. With assets inlined (see
+        # asset_inliner) the load event covers stylesheets and images.
+        page.set_content(html, wait_until='load')
+
+        # Wait until fonts are ready instead of sleeping for a fixed time
+        page.evaluate(FONTS_READY_SCRIPT)
+
+    with span("pdf.print") as s:
+        # Generate PDF with print settings
+        pdf_bytes = page.pdf(**PDF_OPTIONS)
+        write_pdf(pdf_bytes, output)
+        s.set(bytes_out=len(pdf_bytes))
+    return pdf_bytes
+
+def _allow_inline_only(route):
+    """Route handler letting through data: and about: URLs and aborting every other request."""
+    if route.request.url.startswith(('data:', 'about:')):
+        route.continue_()
+    else:
+        route.abort()
+
+class PdfRenderPool:
+    """
+    Pool of worker threads, each owning a headless Chromium and a reusable page.
+
+    Playwright's sync API is bound to the thread that started it, so every
+    worker runs its own browser and pulls jobs from a shared queue. Pages that
+    crash, fail a health check or reach max_jobs_per_page are recycled, and
+    page_timeout (ms) bounds every page operation so a hung page cannot stall
+    a worker forever. If every worker stops (e.g. Playwright cannot start),
+    queued and later jobs fail with RuntimeError instead of waiting forever.
+
+    For HTML built from untrusted input, block_network=True aborts every
+    request a page makes except data: and about: URLs (so pages must have
+    their assets inlined, see asset_inliner), and javascript=False stops
+    injected scripts from running.
+
+    Usage:
+        with PdfRenderPool(workers=4) as pool:
+            futures = [pool.submit(html, output_path) for html, output_path in jobs]
+            for future in futures:
+                future.result()
+    """
+
+    def __init__(self, workers: int = 2, max_jobs_per_page: int = 100, queue_size: int = 0,
+                 page_timeout: float = 30000, block_network: bool = False, javascript: bool = True):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.workers = workers
+        self.max_jobs_per_page = max_jobs_per_page
+        self.page_timeout = page_timeout
+        self.block_network = block_network
+        self.javascript = javascript
+        self._jobs = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._closed = False
+        self._lock = threading.Lock()
+        self._alive = 0
+        # Set to the error that stopped the last live worker
+        self._broken = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        """Launch the worker threads (and their browsers)."""
+        with self._lock:
+            if self._threads:
+                return
+            if self._closed:
+                raise RuntimeError("PdfRenderPool is closed")
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"pdf-worker-{i + 1}", daemon=True)
+                self._alive += 1
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, html: str, output=None) -> Future:
+        """
+        Queue HTML to be printed to PDF.
+
+        Returns a Future resolving to the PDF bytes, which are also written to
+        output (a file path or writable object) if given.
+        """
+        if self._closed:
+            raise RuntimeError("PdfRenderPool is closed")
+        self._check_broken()
+        if not self._threads:
+            self.start()
+        future = Future()
+        # Run the job in the caller's context, so its spans nest under the caller's
+        self._jobs.put((html, output, future, contextvars.copy_context()))
+        if self._broken is not None:
+            # The last worker died while this job was being queued
+            self._fail_pending()
+        return future
+
+    def render(self, html: str, output=None) -> bytes:
+        """Print HTML to PDF and wait for the bytes."""
+        return self.submit(html, output).result()
+
+    def close(self):
+        """Finish queued jobs, then shut down the workers and their browsers."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for _ in self._threads:
+                self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _check_broken(self):
+        if self._broken is not None:
+            raise RuntimeError(f"PdfRenderPool is broken, all workers failed: {self._broken}") from self._broken
+
+    def _fail_pending(self):
+        """Fail every queued job, once no worker is left to run them."""
+        while True:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                return
+            if job is None:
+                continue
+            future = job[2]
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError(f"PdfRenderPool is broken, all workers failed: {self._broken}"))
+
+    def _worker(self):
+        # A failure outside a job (starting Playwright, closing the browser)
+        # stops this worker; when it was the last one, queued jobs would never
+        # run, so they are failed and the pool refuses new ones
+        try:
+            self._serve()
+        except Exception as e:
+            print(f"Warning: {threading.current_thread().name} stopped: {e}")
+            with self._lock:
+                self._alive -= 1
+                last = self._alive == 0
+                if last:
+                    self._broken = e
+            if last:
+                self._fail_pending()
+        else:
+            with self._lock:
+                self._alive -= 1
+
+    def _serve(self):
+        with sync_playwright() as p:
+            browser = None
+            page = None
+            crashed = threading.Event()
+            jobs_on_page = 0
+
+            def new_page():
+                nonlocal browser, page, jobs_on_page
+                if page is not None and not page.is_closed():
+                    try:
+                        page.close()
+                    except Exception:
+                        pass
+                if browser is None or not browser.is_connected():
+                    with span("browser.launch"):
+                        browser = p.chromium.launch(headless=True)
+                crashed.clear()
+                page = browser.new_page(java_script_enabled=self.javascript)
+                page.set_default_timeout(self.page_timeout)
+                if self.block_network:
+                    page.route("**/*", _allow_inline_only)
+                page.on('crash', lambda _: crashed.set())
+                jobs_on_page = 0
+
+            def is_healthy() -> bool:
+                if page is None or page.is_closed() or crashed.is_set() or not browser.is_connected():
+                    return False
+                try:
+                    page.evaluate('1')
+                except Exception:
+                    return False
+                return True
+
+            try:
+                while True:
+                    job = self._jobs.get()
+                    if job is None:
+                        break
+
+                    html, output, future, context = job
+                    if not future.set_running_or_notify_cancel():
+                        continue
+
+                    try:
+                        if jobs_on_page >= self.max_jobs_per_page or not is_healthy():
+                            new_page()
+                        pdf_bytes = context.run(print_pdf, page, html, output)
+                        jobs_on_page += 1
+                        future.set_result(pdf_bytes)
+                    except Exception as e:
+                        future.set_exception(e)
+                        # Start the next job on a fresh page
+                        crashed.set()
+            finally:
+                if browser is not None and browser.is_connected():
+                    browser.close()
@@ -0,0 +1,81 @@
+"""
+Post-processing of Gemini output: code fence stripping and cover letter cleanup.
+
+All patterns are compiled once at import. Placeholder patterns are combined
+into a single case-insensitive alternation, so each cover letter is scrubbed
+in one pass instead of one re.sub per pattern. The "placeholder" patterns
+stay within a single pair of brackets or braces, so they cannot swallow
+ordinary bracketed text between two placeholders.
+
+Deployments can add their own placeholder patterns, either in code with
+DEFAULT_SCRUBBER.extend([...]) or by pointing PLACEHOLDER_PATTERNS_FILE at a
+file with one regular expression per line (blank lines and lines starting
+with # are ignored).
+"""
+
+import os
+import re
+
+# Markdown code fences around the tailored CV JSON
+JSON_FENCE_PATTERN = re.compile(r'^```json\s*', re.MULTILINE)
+FENCE_PATTERN = re.compile(r'^```\s*', re.MULTILINE)
+
+# Bracketed placeholders the model sometimes leaves in, matched in any case
+PLACEHOLDER_NAMES = [
+    'your name', 'company name', 'company', 'date', 'address', 'phone',
+    'email', 'job title', 'years', 'skill',
+]
+
+DEFAULT_PLACEHOLDER_PATTERNS = [
+    r'\[(?:' + '|'.join(re.escape(name) for name in PLACEHOLDER_NAMES) + r')\]',
+    r'\[[^\[\]\n]*placeholder[^\[\]\n]*\]',  # Any text with "placeholder" in brackets
+    r'\{[^{}\n]*placeholder[^{}\n]*\}',  # Any text with "placeholder" in braces
+]
+
+def build_placeholder_regex(patterns: list[str]) -> re.Pattern:
+    """Combine placeholder patterns into one case-insensitive regex."""
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), re.IGNORECASE)
+
+def load_patterns_file(path: str) -> list[str]:
+    """Read one regex per line, skipping blank lines and # comments."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+class PlaceholderScrubber:
+    """Removes placeholder text using a single combined regex."""
+
+    def __init__(self, patterns: list[str] = None):
+        self.patterns = list(DEFAULT_PLACEHOLDER_PATTERNS if patterns is None else patterns)
+        self._regex = build_placeholder_regex(self.patterns)
+
+    def extend(self, patterns: list[str]):
+        """Add patterns and recompile the combined regex."""
+        self.patterns.extend(patterns)
+        self._regex = build_placeholder_regex(self.patterns)
+
+    def scrub(self, text: str) -> str:
+        """Remove every placeholder match from text."""
+        return self._regex.sub('', text)
+
+def _default_patterns() -> list[str]:
+    patterns = list(DEFAULT_PLACEHOLDER_PATTERNS)
+    patterns_file = os.getenv("PLACEHOLDER_PATTERNS_FILE")
+    if patterns_file:
+        patterns.extend(load_patterns_file(patterns_file))
+    return patterns
+
+DEFAULT_SCRUBBER = PlaceholderScrubber(_default_patterns())
+
+def strip_code_fences(text: str) -> str:
+    """Remove markdown code fences (```json / ```) from model output."""
+    text = JSON_FENCE_PATTERN.sub('', text.strip())
+    text = FENCE_PATTERN.sub('', text)
+    return text.strip()
+
+def clean_cover_letter(cover_letter: str, scrubber: PlaceholderScrubber = None) -> str:
+    """Remove placeholder text and blank lines from a generated cover letter."""
+    cover_letter = (scrubber or DEFAULT_SCRUBBER).scrub(cover_letter)
+
+    # Clean up cover letter
+    lines_letter = [line.strip() for line in cover_letter.split('\n') if line.strip()]
+    return '\n'.join(lines_letter)
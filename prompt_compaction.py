@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Shrink the CV text and job description before they go into the Gemini prompt.
+
+- Whitespace is normalized: runs of spaces and tabs become one space, lines
+  are stripped and runs of blank lines become a single blank line.
+- Page numbers are dropped, and page headers and footers that repeat
+  across the pages of an extracted PDF (pages are separated by PAGE_BREAK)
+  are kept on the first page only.
+- Repeated paragraphs in job postings are dropped, together with common
+  job-board boilerplate such as "Apply now" or "Share this job".
+
+Token counts are estimated at about four characters per token. To see what
+compaction does for the current resume and job_description.txt:
+
+    python prompt_compaction.py
+"""
+
+import re
+from collections import Counter, namedtuple
+from pdf_extract import PAGE_BREAK
+
+# Average characters per token, for estimates only
+CHARS_PER_TOKEN = 4
+
+# Lines checked for headers/footers at the top and bottom of each page
+EDGE_LINES = 3
+
+HORIZONTAL_SPACE_PATTERN = re.compile(r'[ \t\u00a0\u2000-\u200b\u202f\u205f\u3000]+')
+BLANK_LINES_PATTERN = re.compile(r'\n{3,}')
+PAGE_NUMBER_PATTERN = re.compile(r'^[-–—\s]*(?:page\s*)?\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?[-–—\s]*$', re.IGNORECASE)
+PARAGRAPH_SPLIT_PATTERN = re.compile(r'\n\s*\n')
+
+# Whole lines of job-board chrome that carry nothing about the job itself
+BOILERPLATE_LINE_PATTERN = re.compile(
+    r'^(?:apply(?: now| for this job)?|easy apply|save(?: job)?|share(?: this job)?|report(?: this)? job'
+    r'|show more|show less|see more|back to (?:jobs|search)|sign in|\d+ applicants?'
+    r'|posted \d+ \w+ ago|.*\buses cookies\b.*)[.!]?$',
+    re.IGNORECASE,
+)
+
+CompactionStats = namedtuple('CompactionStats', ['cv_before', 'cv_after', 'job_before', 'job_after'])
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of text (about four characters per token)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def normalize_whitespace(text: str) -> str:
+    """Collapse horizontal whitespace, strip lines and keep at most one blank line in a row."""
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    lines = [HORIZONTAL_SPACE_PATTERN.sub(' ', line).strip() for line in text.split('\n')]
+    return BLANK_LINES_PATTERN.sub('\n\n', '\n'.join(lines)).strip()
+
+def strip_page_furniture(pages: list[str], edge_lines: int = EDGE_LINES) -> list[str]:
+    """
+    Remove page numbers, and headers and footers repeated across pages.
+
+    Page number lines ("3", "Page 3 of 5", "- 3 -"; at most three digits, so
+    years are kept) at the top or bottom of a page are always removed. Any other line that appears among the first
+    or last `edge_lines` non-blank lines of at least half of the pages (and
+    of at least two) is kept on the first page only.
+    """
+    page_lines = [page.split('\n') for page in pages]
+    edge_indexes = []
+    for lines in page_lines:
+        filled = [i for i, line in enumerate(lines) if line.strip()]
+        edge_indexes.append(set(filled[:edge_lines] + filled[-edge_lines:]))
+
+    counts = Counter()
+    for lines, edges in zip(page_lines, edge_indexes):
+        counts.update({lines[i].strip() for i in edges})
+    threshold = max(2, (len(pages) + 1) // 2)
+    repeated = {line for line, count in counts.items() if count >= threshold} if len(pages) > 1 else set()
+
+    stripped = []
+    for page_number, (lines, edges) in enumerate(zip(page_lines, edge_indexes)):
+        kept = []
+        for i, line in enumerate(lines):
+            if i in edges:
+                if PAGE_NUMBER_PATTERN.match(line.strip()):
+                    continue
+                if page_number > 0 and line.strip() in repeated:
+                    continue
+            kept.append(line)
+        stripped.append('\n'.join(kept))
+    return stripped
+
+def compact_cv_text(text: str) -> str:
+    """Compact extracted CV text: drop repeated page headers/footers and normalize whitespace."""
+    pages = strip_page_furniture([normalize_whitespace(page) for page in text.split(PAGE_BREAK)])
+    return normalize_whitespace('\n\n'.join(page for page in pages if page.strip()))
+
+def compact_job_description(text: str) -> str:
+    """Compact a job posting: normalize whitespace, drop boilerplate lines and repeated paragraphs."""
+    seen = set()
+    paragraphs = []
+    for paragraph in PARAGRAPH_SPLIT_PATTERN.split(normalize_whitespace(text)):
+        lines = [line for line in paragraph.split('\n') if not BOILERPLATE_LINE_PATTERN.match(line)]
+        if not lines:
+            continue
+        key = ' '.join(' '.join(lines).lower().split())
+        if key in seen:
+            continue
+        seen.add(key)
+        paragraphs.append('\n'.join(lines))
+    return '\n\n'.join(paragraphs)
+
+def compact_prompt_inputs(cv_content: str, job_description: str) -> tuple[str, str, CompactionStats]:
+    """Compact both prompt inputs and return them with before/after token estimates."""
+    compact_cv = compact_cv_text(cv_content)
+    compact_job = compact_job_description(job_description)
+    stats = CompactionStats(
+        estimate_tokens(cv_content), estimate_tokens(compact_cv),
+        estimate_tokens(job_description), estimate_tokens(compact_job),
+    )
+    return compact_cv, compact_job, stats
+
+def format_stats(stats: CompactionStats) -> str:
+    """One-line summary such as 'CV ~1200 -> ~800 tokens, job description ~600 -> ~450 tokens'."""
+    return (f"CV ~{stats.cv_before} -> ~{stats.cv_after} tokens, "
+            f"job description ~{stats.job_before} -> ~{stats.job_after} tokens")
+
+if __name__ == "__main__":
+    from main import TAILORING_SYSTEM_INSTRUCTION, build_tailoring_prompt, read_cv_from_resume_folder, \
+        read_job_description
+
+    cv_content = read_cv_from_resume_folder()
+    job_description = read_job_description()
+    compact_cv, compact_job, stats = compact_prompt_inputs(cv_content, job_description)
+
+    print(format_stats(stats))
+    print(f"Prompt: ~{estimate_tokens(build_tailoring_prompt(compact_cv, compact_job))} tokens "
+          f"(without compaction ~{estimate_tokens(build_tailoring_prompt(cv_content, job_description))}), "
+          f"plus ~{estimate_tokens(TAILORING_SYSTEM_INSTRUCTION)} tokens of system instruction")
@@ -0,0 +1,217 @@
+"""
+Cache of rendered CVs: HTML in memory, PDFs on disk.
+
+Entries are keyed on the content hashes of everything a render depends on
+(see pdf_inputs): the canonical CV JSON, the template source, the inlined
+assets and the print settings. Editing a template or the CV changes the key,
+so outdated renders are never served; they are evicted as the least recently
+used entries once the caches are full.
+
+- HtmlCache keeps populated HTML in an in-process LRU, capped in bytes.
+- PdfStore keeps PDF files in a folder, capped in total bytes, and can be
+  shared by several processes on one machine.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from build_manifest import file_digest, json_digest, text_digest
+from pdf_render import PDF_OPTIONS
+
+RENDER_CACHE_DIR = os.getenv("CV_RENDER_CACHE", ".render_cache")
+RENDER_CACHE_MAX_BYTES = int(os.getenv("CV_RENDER_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+HTML_CACHE_MAX_BYTES = int(os.getenv("CV_HTML_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+# Bump when rendering changes in a way the input hashes cannot see, e.g. a
+# template engine fix, to make every cached render and built PDF stale
+RENDER_VERSION = 1
+
+def pdf_inputs(cv_data: dict, inlined_cv: dict, template_path: str, inlined_template: str) -> dict:
+    """
+    Content hashes of everything a rendered CV is built from.
+
+    Recorded per PDF in the build manifest, and hashed into the render cache key.
+
+    Args:
+        cv_data: CV data as loaded from the JSON file.
+        inlined_cv: The same data with the portrait image embedded (inline_cv_image).
+        template_path: Path to the HTML template.
+        inlined_template: Path of its self-contained copy (inline_template_assets).
+    """
+    image = inlined_cv.get('image') or ''
+    return {
+        'cv': json_digest(cv_data),
+        'template': file_digest(template_path),
+        # Stylesheets and fonts live in the inlined template, the image in the inlined CV
+        'assets': text_digest(file_digest(inlined_template) + text_digest(image)),
+        'settings': json_digest({'pdf': PDF_OPTIONS, 'version': RENDER_VERSION}),
+    }
+
+def render_key(inputs: dict) -> str:
+    """Cache key for the render described by pdf_inputs()."""
+    return json_digest(inputs)
+
+class HtmlCache:
+    """Thread-safe LRU of rendered HTML, capped by the total size of the cached strings."""
+
+    def __init__(self, max_bytes: int = HTML_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Return the cached HTML, or None."""
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def put(self, key: str, html: str):
+        # Strings are counted at one byte per character, which is close for HTML
+        size = len(html)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = html
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+class PdfStore:
+    """
+    Folder of cached PDFs (<key>.pdf), capped at max_bytes in total.
+
+    Reads refresh a file's modification time, and the least recently used
+    files are deleted when a write takes the folder over its cap. Writes are
+    atomic, so processes sharing the folder never see partial files.
+    """
+
+    def __init__(self, folder: str = RENDER_CACHE_DIR, max_bytes: int = RENDER_CACHE_MAX_BYTES):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.folder, f"{key}.pdf")
+
+    def _scan(self) -> list[tuple[float, int, str]]:
+        """(mtime, size, path) of every cached PDF, oldest first."""
+        files = []
+        try:
+            names = os.listdir(self.folder)
+        except FileNotFoundError:
+            return files
+        for name in names:
+            if not name.endswith('.pdf'):
+                continue
+            path = os.path.join(self.folder, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        return files
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def get(self, key: str):
+        """Return the cached PDF bytes, or None."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                pdf_bytes = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pdf_bytes
+
+    def put(self, key: str, pdf_bytes: bytes):
+        if len(pdf_bytes) > self.max_bytes:
+            return
+        os.makedirs(self.folder, exist_ok=True)
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(pdf_bytes)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._scan())
+            else:
+                self._size += len(pdf_bytes)
+            if self._size <= self.max_bytes:
+                return
+
+            # Over the cap: rescan (other processes may share the folder) and drop the oldest
+            files = self._scan()
+            self._size = sum(size for _, size, _ in files)
+            for _, size, old_path in files:
+                if self._size <= self.max_bytes:
+                    break
+                if old_path == path:
+                    continue
+                try:
+                    os.remove(old_path)
+                except FileNotFoundError:
+                    pass
+                self._size -= size
+
+    def clear(self):
+        with self._lock:
+            for _, _, path in self._scan():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._size = 0
+
+    def __len__(self):
+        return len(self._scan())
+
+_html_cache = None
+_pdf_store = None
+_default_lock = threading.Lock()
+
+def get_html_cache() -> HtmlCache:
+    """Process-wide HTML cache."""
+    global _html_cache
+    with _default_lock:
+        if _html_cache is None:
+            _html_cache = HtmlCache()
+        return _html_cache
+
+def get_pdf_store() -> PdfStore:
+    """Process-wide PDF store in CV_RENDER_CACHE (default: .render_cache)."""
+    global _pdf_store
+    with _default_lock:
+        if _pdf_store is None:
+            _pdf_store = PdfStore()
+        return _pdf_store
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Long-running HTTP service that renders CV JSON to HTML or PDF.
+
+Built on asyncio streams from the standard library. Templates are inlined
+and compiled once at startup, and PDFs are printed by a PdfRenderPool whose
+browsers are launched before the first request.
+
+Endpoints:
+    POST /render/pdf?template=temp1.html    body: CV JSON -> application/pdf
+    POST /render/html?template=temp1.html   body: CV JSON -> text/html (self-contained)
+    GET  /templates                         -> JSON list of template names
+    GET  /health                            -> JSON status and queue depth
+    GET  /metrics                           -> Prometheus metrics (see tracing.py)
+
+Identical concurrent requests (same template, format and CV JSON) are
+coalesced into one render. Finished renders are kept in the render cache
+(HTML in memory, PDFs on disk; see render_cache.py), so repeated previews
+and downloads of the same CV skip the browser entirely. Templates edited on
+disk are picked up on the next request. When max_pending distinct renders
+are already queued, new ones get 503 with a Retry-After header instead of
+piling up.
+
+The CV's "image" must be a data:image/... URI, or, with --image-dir, the
+path of an image file inside that folder. Anything else (other local
+paths, URLs) is refused with 400, so requests cannot read server files or
+make the server fetch URLs. CV fields are inserted into the template as
+HTML, so the browsers printing PDFs run without JavaScript and abort every
+request other than data: URLs: markup such as <img src="http://..."> in a
+field cannot make the server fetch anything either.
+
+    python render_service.py --port 8080 --browsers 4
+    curl -X POST --data @generated_result/tailored_cv.json \\
+        "http://127.0.0.1:8080/render/pdf?template=temp1.html" -o cv.pdf
+"""
+
+import os
+import sys
+import json
+import signal
+import asyncio
+import argparse
+import functools
+import contextvars
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from main import populate_template
+from cv_model import validate_cv
+from template_engine import load_template
+from template_lint import lint_template
+from asset_inliner import guess_type, inline_cv_image, inline_template_assets, is_remote
+from build_manifest import json_digest
+from pdf_render import PdfRenderPool
+from render_cache import get_html_cache, get_pdf_store, pdf_inputs, render_key
+from tracing import METRICS, span
+
+TEMPLATES_DIR = "templates"
+MAX_BODY_BYTES = 5 * 1024 * 1024
+MAX_HEADERS = 100
+KEEP_ALIVE_TIMEOUT = 15.0
+WRITE_CHUNK_SIZE = 64 * 1024
+
+FORMATS = {
+    'pdf': 'application/pdf',
+    'html': 'text/html; charset=utf-8',
+}
+
+class HttpError(Exception):
+    """An error answered with the given HTTP status and a JSON {"error": message} body."""
+
+    def __init__(self, status: int, message: str, headers: dict = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+class Request:
+    __slots__ = ('method', 'path', 'query', 'headers', 'body', 'keep_alive')
+
+    def __init__(self, method: str, target: str, version: str, headers: dict, body: bytes):
+        url = urllib.parse.urlsplit(target)
+        self.method = method
+        self.path = url.path
+        self.query = {key: values[-1] for key, values in urllib.parse.parse_qs(url.query).items()}
+        self.headers = headers
+        self.body = body
+        connection = headers.get('connection', '').lower()
+        self.keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+async def read_request(reader: asyncio.StreamReader, max_body: int = MAX_BODY_BYTES):
+    """Read one HTTP/1.x request, or return None when the client closed the connection."""
+    try:
+        line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+    except asyncio.TimeoutError:
+        return None
+    except ValueError:
+        raise HttpError(HTTPStatus.REQUEST_URI_TOO_LONG, "Request line too long")
+    if not line:
+        return None
+
+    try:
+        method, target, version = line.decode('latin-1').rstrip('\r\n').split(' ')
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+    if version not in ('HTTP/1.0', 'HTTP/1.1'):
+        raise HttpError(HTTPStatus.HTTP_VERSION_NOT_SUPPORTED, f"Unsupported version {version}")
+
+    headers = {}
+    while True:
+        try:
+            line = await reader.readline()
+        except ValueError:
+            raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Header line too long")
+        if line in (b'\r\n', b'\n', b''):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many headers")
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        raise HttpError(HTTPStatus.LENGTH_REQUIRED, "Chunked request bodies are not supported; send Content-Length")
+    try:
+        length = int(headers.get('content-length', '0'))
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if length < 0 or length > max_body:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Request body is larger than {max_body} bytes")
+
+    body = await reader.readexactly(length) if length else b''
+    return Request(method, target, version, headers, body)
+
+async def write_response(writer: asyncio.StreamWriter, status: int, body: bytes, content_type: str,
+                         keep_alive: bool, headers: dict = None):
+    """Write a response, streaming the body in chunks so large PDFs respect flow control."""
+    status = HTTPStatus(status)
+    lines = [
+        f"HTTP/1.1 {status.value} {status.phrase}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1'))
+
+    view = memoryview(body)
+    for offset in range(0, len(body), WRITE_CHUNK_SIZE):
+        writer.write(view[offset:offset + WRITE_CHUNK_SIZE])
+        await writer.drain()
+    await writer.drain()
+
+def json_body(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+class RenderService:
+    """
+    Renders CVs for HTTP clients with preloaded templates and a warm browser pool.
+
+    Args:
+        templates_dir: Folder with the HTML templates.
+        browsers: Browsers (and pages) printing PDFs in parallel.
+        max_pending: Distinct renders allowed in flight before answering 503.
+        render_workers: Threads populating templates, so the event loop stays free.
+        cors_origin: Value for Access-Control-Allow-Origin, or None to send no CORS headers.
+        html_cache, pdf_store: Render caches; default to the process-wide ones.
+    """
+
+    def __init__(self, templates_dir: str = TEMPLATES_DIR, browsers: int = 2, max_pending: int = 16,
+                 render_workers: int = 4, cors_origin: str = None, html_cache=None, pdf_store=None,
+                 image_dir: str = None):
+        if browsers < 1 or max_pending < 1 or render_workers < 1:
+            raise ValueError("browsers, max_pending and render_workers must be at least 1")
+        self.templates_dir = templates_dir
+        self.browsers = browsers
+        self.max_pending = max_pending
+        self.cors_origin = cors_origin
+        self.image_dir = os.path.realpath(image_dir) if image_dir else None
+        self.html_cache = html_cache if html_cache is not None else get_html_cache()
+        self.pdf_store = pdf_store if pdf_store is not None else get_pdf_store()
+        self.templates = {}
+        self.pool = None
+        self.coalesced = 0
+        self._executor = ThreadPoolExecutor(max_workers=render_workers, thread_name_prefix="render")
+        self._inflight = {}
+
+    async def _run_in_thread(self, func, *args):
+        # Keep the caller's span context, so spans in the thread nest under it
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(context.run, func, *args))
+
+    async def start(self):
+        """Inline, compile and lint every template, then launch and warm up the browsers."""
+        names = sorted(f for f in os.listdir(self.templates_dir) if f.endswith('.html'))
+        if not names:
+            raise FileNotFoundError(f"No templates found in {self.templates_dir}")
+        for name in names:
+            template_path = os.path.join(self.templates_dir, name)
+            inlined = await self._run_in_thread(inline_template_assets, template_path)
+            await self._run_in_thread(load_template, inlined)
+            for message in lint_template(template_path):
+                print(f"Warning: {message}")
+            self.templates[name] = template_path
+
+        # CV fields are inserted into the page as HTML, so keep injected markup off the network
+        self.pool = PdfRenderPool(workers=self.browsers, block_network=True, javascript=False)
+        warm_up = [self.pool.submit("<html><body></body></html>") for _ in range(self.browsers)]
+        await asyncio.gather(*(asyncio.wrap_future(future) for future in warm_up))
+
+    async def close(self):
+        if self.pool is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.pool.close)
+        self._executor.shutdown(wait=False)
+
+    def resolve_template(self, name: str) -> str:
+        """Template path for a name such as "temp1.html" or "temp1"."""
+        if name and not name.endswith('.html'):
+            name += '.html'
+        if name not in self.templates:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"Unknown template: {name}")
+        return self.templates[name]
+
+    def _check_image(self, cv_data: dict) -> dict:
+        """
+        Refuse portrait images the service must not load: only data:image URIs
+        and files inside image_dir are accepted. Returns the CV data with an
+        accepted file name resolved to its full path.
+        """
+        image = cv_data.get('image')
+        if image is None or image == '':
+            return cv_data
+        if not isinstance(image, str):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "image must be a string")
+        if image.startswith('data:'):
+            if not image.startswith('data:image/'):
+                raise HttpError(HTTPStatus.BAD_REQUEST, "image data URI must have an image/ type")
+            return cv_data
+
+        allowed = "image must be a data:image/... URI"
+        if self.image_dir is None:
+            raise HttpError(HTTPStatus.BAD_REQUEST, allowed)
+        allowed += " or the name of a file in the image folder"
+        if is_remote(image) or '://' in image:
+            raise HttpError(HTTPStatus.BAD_REQUEST, allowed)
+        # realpath resolves "..", and symlinks pointing out of the folder
+        path = os.path.realpath(os.path.join(self.image_dir, image))
+        if os.path.commonpath([path, self.image_dir]) != self.image_dir or not os.path.isfile(path):
+            raise HttpError(HTTPStatus.BAD_REQUEST, allowed)
+        if not guess_type(path).startswith('image/'):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "image file must be an image")
+        return {**cv_data, 'image': path}
+
+    def _prepare(self, template_path: str, cv_data: dict) -> tuple:
+        """Validate the CV and return (render cache key, inlined template path, CV)."""
+        cv_data = self._check_image(cv_data)
+        inlined_cv = inline_cv_image(cv_data)
+        try:
+            cv = validate_cv(inlined_cv)
+        except ValueError as e:
+            raise HttpError(HTTPStatus.BAD_REQUEST, str(e))
+        # Re-inlining is a stat() unless the template changed on disk
+        inlined_template = inline_template_assets(template_path)
+        key = render_key(pdf_inputs(cv_data, inlined_cv, template_path, inlined_template))
+        return key, inlined_template, cv
+
+    def _populate(self, key: str, inlined_template: str, cv) -> str:
+        html = self.html_cache.get(key)
+        if html is None:
+            html = populate_template(inlined_template, cv)
+            self.html_cache.put(key, html)
+        return html
+
+    async def _render(self, template_path: str, fmt: str, cv_data: dict) -> bytes:
+        key, inlined_template, cv = await self._run_in_thread(self._prepare, template_path, cv_data)
+        if fmt == 'pdf':
+            pdf_bytes = await self._run_in_thread(self.pdf_store.get, key)
+            if pdf_bytes is not None:
+                return pdf_bytes
+
+        html = await self._run_in_thread(self._populate, key, inlined_template, cv)
+        if fmt == 'html':
+            return html.encode('utf-8')
+
+        pdf_bytes = await asyncio.wrap_future(self.pool.submit(html))
+        await self._run_in_thread(self.pdf_store.put, key, pdf_bytes)
+        return pdf_bytes
+
+    def _finished(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        # Mark the error as seen even if every waiting client has gone away
+        if not task.cancelled():
+            task.exception()
+
+    async def render(self, template_name: str, fmt: str, cv_data: dict) -> bytes:
+        """
+        Render a CV, sharing the work with any identical request already in flight.
+
+        Raises HttpError 503 when max_pending distinct renders are in flight.
+        """
+        template_path = self.resolve_template(template_name)
+        key = json_digest({'template': template_path, 'format': fmt, 'cv': cv_data})
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            if len(self._inflight) >= self.max_pending:
+                raise HttpError(HTTPStatus.SERVICE_UNAVAILABLE, "Render queue is full, retry later",
+                                {'Retry-After': '1'})
+            task = asyncio.ensure_future(self._render(template_path, fmt, cv_data))
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._finished, key))
+        # A client that disconnects must not cancel the render others are waiting for
+        return await asyncio.shield(task)
+
+    async def handle(self, request: Request) -> tuple[int, bytes, str, dict]:
+        """Route a request; returns (status, body, content type, extra headers)."""
+        if request.method == 'OPTIONS' and self.cors_origin:
+            return HTTPStatus.NO_CONTENT, b'', 'text/plain', {
+                'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+                'Access-Control-Allow-Headers': 'Content-Type, Authorization',
+            }
+
+        if request.path.startswith('/render/'):
+            fmt = request.path[len('/render/'):]
+            if fmt not in FORMATS:
+                raise HttpError(HTTPStatus.NOT_FOUND, f"Unknown format: {fmt} (use pdf or html)")
+            if request.method != 'POST':
+                raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, "Use POST with the CV JSON as the body",
+                                {'Allow': 'POST'})
+            try:
+                cv_data = json.loads(request.body)
+            except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                raise HttpError(HTTPStatus.BAD_REQUEST, f"Invalid JSON body: {e}")
+            if not isinstance(cv_data, dict):
+                raise HttpError(HTTPStatus.BAD_REQUEST, "The body must be a CV JSON object")
+
+            template_name = request.query.get('template', '')
+            with span("service.render", format=fmt, template=template_name,
+                      bytes_in=len(request.body)) as s:
+                body = await self.render(template_name, fmt, cv_data)
+                s.set(bytes_out=len(body))
+            file_name = template_name.replace('.html', '') + '_cv.' + fmt
+            return HTTPStatus.OK, body, FORMATS[fmt], {'Content-Disposition': f'inline; filename="{file_name}"'}
+
+        if request.method != 'GET':
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, "Use GET", {'Allow': 'GET'})
+        if request.path == '/templates':
+            return HTTPStatus.OK, json_body(sorted(self.templates)), 'application/json', {}
+        if request.path == '/health':
+            status = {'status': 'ok', 'pending': len(self._inflight), 'max_pending': self.max_pending,
+                      'coalesced': self.coalesced, 'browsers': self.browsers,
+                      'html_cache': {'entries': len(self.html_cache), 'hits': self.html_cache.hits,
+                                     'misses': self.html_cache.misses},
+                      'pdf_cache': {'hits': self.pdf_store.hits, 'misses': self.pdf_store.misses}}
+            return HTTPStatus.OK, json_body(status), 'application/json', {}
+        if request.path == '/metrics':
+            return HTTPStatus.OK, METRICS.render().encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8', {}
+        raise HttpError(HTTPStatus.NOT_FOUND, f"Not found: {request.path}")
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one keep-alive connection until it closes."""
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    keep_alive = request.keep_alive
+                    status, body, content_type, headers = await self.handle(request)
+                except HttpError as e:
+                    status, body, content_type, headers = e.status, json_body({'error': e.message}), \
+                        'application/json', e.headers
+                    # The rest of a rejected request may still be unread
+                    keep_alive = keep_alive and e.status < 500 and e.status != HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    break
+                except Exception as e:
+                    status, body, content_type, headers = HTTPStatus.INTERNAL_SERVER_ERROR, \
+                        json_body({'error': f"Rendering failed: {e}"}), 'application/json', {}
+
+                if self.cors_origin:
+                    headers = {**headers, 'Access-Control-Allow-Origin': self.cors_origin}
+                await write_response(writer, status, body, content_type, keep_alive, headers)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(host: str = "127.0.0.1", port: int = 8080, **options):
+    """Run the service until SIGINT or SIGTERM."""
+    service = RenderService(**options)
+    print("Loading templates and starting browsers...")
+    await service.start()
+
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass
+
+    print(f"Serving {len(service.templates)} templates on http://{host}:{port} "
+          f"({service.browsers} browsers, up to {service.max_pending} pending renders)")
+    try:
+        await stop.wait()
+    finally:
+        print("Shutting down...")
+        server.close()
+        await server.wait_closed()
+        await service.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve CV rendering (HTML and PDF) over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080)")
+    parser.add_argument("--browsers", type=int, default=2, help="Browsers printing PDFs in parallel (default: 2)")
+    parser.add_argument("--max-pending", type=int, default=16,
+                        help="Distinct renders in flight before answering 503 (default: 16)")
+    parser.add_argument("--render-workers", type=int, default=4,
+                        help="Threads populating templates (default: 4)")
+    parser.add_argument("--templates", default=TEMPLATES_DIR, help="Templates folder (default: templates)")
+    parser.add_argument("--cors-origin", default=None,
+                        help="Allow browser requests from this origin (e.g. http://localhost:5173)")
+    parser.add_argument("--image-dir", default=None,
+                        help="Folder of portrait images requests may name (default: only data: URIs are accepted)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, templates_dir=args.templates, browsers=args.browsers,
+                          max_pending=args.max_pending, render_workers=args.render_workers,
+                          cors_origin=args.cors_origin, image_dir=args.image_dir))
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
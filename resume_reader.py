@@ -0,0 +1,253 @@
+"""
+Text extraction for resume files (.pdf, .docx, .doc and plain text).
+
+Extracted text is cached next to the resume, in a .extracted folder, keyed
+by the file's content hash. A cache hit skips PyPDF2, python-docx and
+textract entirely; the file's size and mtime are checked first so unchanged
+files are not even re-hashed.
+
+ingest_resumes() extracts every supported file in a folder concurrently and
+yields one ResumeRecord per file:
+
+    python resume_reader.py resume/ --recursive
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import tempfile
+import argparse
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from docx import Document
+from pdf_extract import extract_pdf_pages_text
+from prompt_compaction import estimate_tokens
+from tracing import span
+
+CACHE_FOLDER = ".extracted"
+# One small <file name>.json per resume, so concurrent readers never share a file
+STAMPS_FOLDER = "stamps"
+# Bump when extraction output changes, so older cached text is not reused
+EXTRACTION_VERSION = 2
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.doc', '.txt')
+
+ResumeRecord = namedtuple('ResumeRecord', ['path', 'text', 'metadata', 'error'])
+
+def extract_pdf_text(path: str, workers: int = None) -> str:
+    """Extract text from every page of a PDF, using a process pool for long documents."""
+    try:
+        text = extract_pdf_pages_text(path, workers)
+        if not text.strip():
+            raise ValueError("Could not extract text from PDF. The PDF might be image-based or corrupted.")
+        return text.strip()
+    except Exception as e:
+        raise ValueError(f"Error reading PDF file: {e}")
+
+def extract_docx_text(path: str) -> str:
+    """Extract paragraph text from a DOCX file."""
+    try:
+        doc = Document(path)
+        text = "\n".join(paragraph.text for paragraph in doc.paragraphs)
+        if not text.strip():
+            raise ValueError("Could not extract text from DOCX file. The file might be empty or corrupted.")
+        return text.strip()
+    except Exception as e:
+        raise ValueError(f"Error reading DOCX file: {e}")
+
+def extract_doc_text(path: str) -> str:
+    """Extract text from a legacy DOC file using textract."""
+    try:
+        # Try using textract if available, otherwise suggest conversion
+        try:
+            import textract
+            text = textract.process(path).decode('utf-8')
+            if not text.strip():
+                raise ValueError("Could not extract text from DOC file.")
+            return text.strip()
+        except ImportError:
+            raise ValueError(
+                "Reading .doc files requires the 'textract' library. "
+                "Please install it with: pip install textract\n"
+                "Alternatively, convert your .doc file to .docx format."
+            )
+    except Exception as e:
+        raise ValueError(f"Error reading DOC file: {e}")
+
+def extract_plain_text(path: str) -> str:
+    """Read a plain text resume."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except Exception as e:
+        raise ValueError(f"Error reading text file: {e}. Supported formats: .pdf, .doc, .docx, .txt")
+
+EXTRACTORS = {
+    '.pdf': extract_pdf_text,
+    '.docx': extract_docx_text,
+    '.doc': extract_doc_text,
+}
+
+def extract_text(path: str, pdf_workers: int = None) -> str:
+    """
+    Extract text from a resume file, choosing the extractor by extension.
+
+    pdf_workers is passed to the PDF extractor (None picks automatically).
+    """
+    file_ext = os.path.splitext(path)[1].lower()
+    with span("resume.extract", format=file_ext.lstrip('.'), bytes_in=os.path.getsize(path)) as s:
+        if file_ext == '.pdf':
+            text = extract_pdf_text(path, pdf_workers)
+        else:
+            text = EXTRACTORS.get(file_ext, extract_plain_text)(path)
+        s.set(bytes_out=len(text.encode('utf-8')), tokens_out=estimate_tokens(text))
+    return text
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a file's contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _load_stamp(stamp_path: str) -> dict:
+    try:
+        with open(stamp_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_atomic(path: str, content: str):
+    # mkstemp gives every writer its own temp file, threads of one process included
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def read_resume(path: str, use_cache: bool = True, pdf_workers: int = None) -> str:
+    """
+    Return the text of a resume file, using the extraction cache when possible.
+
+    The cache lives in <resume folder>/.extracted: one <sha256>-v<version>.txt
+    per distinct file content, plus a stamps/<file name>.json per resume recording
+    its size, mtime and hash.
+    """
+    if not use_cache:
+        return extract_text(path, pdf_workers)
+
+    folder, file_name = os.path.split(os.path.abspath(path))
+    cache_dir = os.path.join(folder, CACHE_FOLDER)
+    stat = os.stat(path)
+    stamp = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    stamp_path = os.path.join(cache_dir, STAMPS_FOLDER, f"{file_name}.json")
+    entry = _load_stamp(stamp_path)
+
+    # Unchanged size and mtime: trust the recorded hash; otherwise re-hash
+    if isinstance(entry, dict) and entry.get('size') == stamp['size'] and entry.get('mtime_ns') == stamp['mtime_ns']:
+        content_hash = entry['sha256']
+    else:
+        content_hash = file_hash(path)
+
+    text_path = os.path.join(cache_dir, f"{content_hash}-v{EXTRACTION_VERSION}.txt")
+    if os.path.exists(text_path):
+        with open(text_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    else:
+        text = extract_text(path, pdf_workers)
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_atomic(text_path, text)
+
+    if entry != {**stamp, 'sha256': content_hash}:
+        os.makedirs(os.path.dirname(stamp_path), exist_ok=True)
+        _write_atomic(stamp_path, json.dumps({**stamp, 'sha256': content_hash}))
+
+    return text
+
+def iter_resume_files(folder: str, recursive: bool = False):
+    """Yield supported resume files in a folder, sorted by path. Hidden files and folders are skipped."""
+    if not os.path.exists(folder):
+        raise FileNotFoundError(f"Resume folder not found: {folder}")
+    if not os.path.isdir(folder):
+        raise ValueError(f"{folder} is not a directory")
+
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.')) if recursive else []
+        for file_name in sorted(files):
+            if file_name.startswith('.') or not file_name.lower().endswith(SUPPORTED_EXTENSIONS):
+                continue
+            yield os.path.join(root, file_name)
+
+def ingest_resume(path: str, use_cache: bool = True) -> ResumeRecord:
+    """Extract one resume into a ResumeRecord, capturing errors instead of raising."""
+    start = time.perf_counter()
+    metadata = {'extension': os.path.splitext(path)[1].lower()}
+    try:
+        stat = os.stat(path)
+        metadata['size'] = stat.st_size
+        metadata['modified'] = stat.st_mtime
+        # Files are already spread over workers, so extract each PDF in-process
+        text = read_resume(path, use_cache, pdf_workers=0)
+        metadata['characters'] = len(text)
+        error = None
+    except Exception as e:
+        text = None
+        error = e
+    metadata['seconds'] = time.perf_counter() - start
+    return ResumeRecord(path, text, metadata, error)
+
+def ingest_resumes(folder: str, recursive: bool = False, workers: int = None, use_cache: bool = True,
+                   use_processes: bool = True):
+    """
+    Extract every supported resume in a folder concurrently.
+
+    Yields ResumeRecord(path, text, metadata, error) in path order. At most
+    about 2 * workers files are in flight at once, so a folder of hundreds
+    of resumes is never held in memory in full. Failed files have text None
+    and the exception in error.
+
+    Args:
+        folder: Folder to scan.
+        recursive: Also scan sub-folders.
+        workers: Worker count (default: CPU count).
+        use_cache: Use the extraction cache (see read_resume).
+        use_processes: Use a process pool (PDF/DOCX parsing is CPU-bound);
+                       False uses threads.
+    """
+    paths = iter_resume_files(folder, recursive)
+    workers = workers or os.cpu_count() or 1
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+
+    with executor_class(max_workers=workers) as executor:
+        pending = []
+        for path in paths:
+            pending.append(executor.submit(ingest_resume, path, use_cache))
+            if len(pending) >= workers * 2:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract text from every resume in a folder.")
+    parser.add_argument("folder", nargs="?", default="resume", help="Resume folder (default: resume)")
+    parser.add_argument("--recursive", action="store_true", help="Also scan sub-folders")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    failed = 0
+    for record in ingest_resumes(args.folder, args.recursive, args.workers):
+        if record.error is None:
+            print(f"✓ {record.path}: {record.metadata['characters']} chars ({record.metadata['seconds']:.2f}s)")
+        else:
+            failed += 1
+            print(f"✗ {record.path}: {record.error}")
+    sys.exit(1 if failed else 0)
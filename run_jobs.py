@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Run the whole tailor -> render -> PDF pipeline for every row of a job file.
+
+Job files are YAML (a list of rows, or a mapping with a "jobs" list; needs
+PyYAML) or JSONL (one row object per line). Each row may have:
+
+    id                    Name of the result folder (default: job-<row number>)
+    candidate             Resume folder or file (default: --resume, i.e. resume/)
+    job_description       Job description text, or
+    job_description_file  a file containing it
+    image                 Portrait image URL or path
+    templates             Template names, or "all" (default: --templates)
+    output                Result folder (default: <--output>/<id>)
+
+For example:
+
+    - id: acme-backend
+      candidate: candidates/jane
+      job_description_file: postings/acme.txt
+      templates: [temp1.html, temp3.html]
+
+Rows are tailored concurrently (--workers), then all PDFs are printed with
+one pool of warm browsers (--browsers). With --pipeline the stages overlap
+instead: rows flow through resume extraction, tailoring, rendering and
+printing at the same time (see scheduler.py). PDFs that are already up to
+date are skipped (see build_manifest.py). Nothing is asked interactively.
+
+Exit codes, for schedulers:
+    0  every row succeeded
+    1  at least one row failed (the others are still written)
+    2  the job file or the arguments are invalid; nothing was run
+
+Usage:
+    python run_jobs.py jobs.yaml --workers 8 --browsers 4
+    python run_jobs.py jobs.jsonl --report report.jsonl
+    python run_jobs.py jobs.yaml --pipeline --processes 4 --workers 16
+    python main.py --jobs jobs.yaml
+"""
+
+import os
+import sys
+import json
+import argparse
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from main import read_cv_from_resume_folder, save_tailoring_results, tailor_cv_and_generate_cover_letter
+from resume_reader import read_resume
+from bulk_tailor import unique_slug
+from llm_backend import create_backend
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+TEMPLATES_DIR = "templates"
+YAML_EXTENSIONS = ('.yaml', '.yml')
+JOB_FIELDS = {'id', 'candidate', 'job_description', 'job_description_file', 'image', 'templates', 'output'}
+
+Job = namedtuple('Job', ['id', 'candidate', 'job_description', 'image', 'templates', 'output'])
+
+def _read_rows(path: str) -> list[dict]:
+    """Raw rows of a YAML or JSONL job file."""
+    if path.lower().endswith(YAML_EXTENSIONS):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("Reading YAML job files needs PyYAML: pip install pyyaml")
+        with open(path, 'r', encoding='utf-8') as f:
+            try:
+                data = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(f"Invalid YAML in {path}: {e}")
+        if isinstance(data, dict):
+            data = data.get('jobs')
+        if not isinstance(data, list):
+            raise ValueError(f"{path} must contain a list of jobs (or a mapping with a 'jobs' list)")
+        return data
+
+    rows = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_number} of {path}: {e}")
+    return rows
+
+def _template_list(value, row_label: str, templates_dir: str) -> list[str]:
+    """Template names for a row; "all" (or nothing) means every template."""
+    available = sorted(f for f in os.listdir(templates_dir) if f.endswith('.html'))
+    if value is None or value in ("all", ["all"]):
+        return available
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or not all(isinstance(name, str) for name in value):
+        raise ValueError(f"{row_label}: templates must be a list of template names or 'all'")
+    for name in value:
+        if name not in available:
+            raise ValueError(f"{row_label}: template not found: {os.path.join(templates_dir, name)}")
+    return value
+
+def load_job_file(path: str, resume: str = "resume", templates=None, output_dir: str = "generated_result",
+                  templates_dir: str = TEMPLATES_DIR) -> list[Job]:
+    """
+    Load and check every row of a job file.
+
+    The remaining arguments are defaults for rows that do not set them.
+    Raises FileNotFoundError or ValueError (naming the row) before anything
+    is run, so a bad job file fails as a whole.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Job file not found: {path}")
+
+    jobs = []
+    used_ids = set()
+    for number, row in enumerate(_read_rows(path), 1):
+        row_label = f"{path} row {number}"
+        if not isinstance(row, dict):
+            raise ValueError(f"{row_label}: expected a mapping of job fields")
+        unknown = set(row) - JOB_FIELDS
+        if unknown:
+            raise ValueError(f"{row_label}: unknown fields: {', '.join(sorted(unknown))}")
+
+        job_description = row.get('job_description')
+        if job_description is None and row.get('job_description_file'):
+            description_path = row['job_description_file']
+            if not os.path.exists(description_path):
+                raise FileNotFoundError(f"{row_label}: job description file not found: {description_path}")
+            with open(description_path, 'r', encoding='utf-8') as f:
+                job_description = f.read()
+        if not isinstance(job_description, str) or not job_description.strip():
+            raise ValueError(f"{row_label}: job_description or job_description_file is required")
+
+        candidate = row.get('candidate') or resume
+        if not os.path.exists(candidate):
+            raise FileNotFoundError(f"{row_label}: candidate resume not found: {candidate}")
+
+        # Keep result folders distinct when ids collide after slugifying
+        job_id = unique_slug(str(row.get('id') or f"job-{number}"), used_ids)
+
+        jobs.append(Job(
+            id=job_id,
+            candidate=candidate,
+            job_description=job_description.strip(),
+            image=row.get('image') or None,
+            templates=_template_list(row.get('templates', templates), row_label, templates_dir),
+            output=row.get('output') or os.path.join(output_dir, job_id),
+        ))
+
+    if not jobs:
+        raise ValueError(f"No jobs found in {path}")
+    return jobs
+
+def read_candidate(path: str, pdf_workers: int = None) -> str:
+    """Resume text from a resume folder (first file, as main.py does) or a single resume file."""
+    if os.path.isdir(path):
+        return read_cv_from_resume_folder(path, pdf_workers=pdf_workers)
+    return read_resume(path, pdf_workers=pdf_workers)
+
+def run_jobs(jobs: list[Job], workers: int = 4, browsers: int = 2, backend=None, force: bool = False,
+             render: bool = True) -> list[dict]:
+    """
+    Tailor every job concurrently, then print the PDFs of the successful ones.
+
+    Each job's folder gets tailored_cv.json, cover_letter.md,
+    job_description.txt and one <template>_cv.pdf per template. A failing
+    job does not stop the others.
+
+    Returns one dict per job, in job order, with id, folder, error (None on
+    success) and pdfs (the PDF paths).
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    results = {job.id: {'id': job.id, 'folder': job.output, 'error': None, 'pdfs': []} for job in jobs}
+
+    # Read each candidate's resume once, however many jobs use it
+    resumes = {}
+    for candidate in dict.fromkeys(job.candidate for job in jobs):
+        try:
+            resumes[candidate] = read_candidate(candidate)
+        except Exception as e:
+            resumes[candidate] = e
+
+    def tailor(job: Job) -> str:
+        cv_content = resumes[job.candidate]
+        if isinstance(cv_content, Exception):
+            raise cv_content
+        tailored_cv, cover_letter = tailor_cv_and_generate_cover_letter(
+            cv_content, job.job_description, job.image, backend=backend
+        )
+        return save_tailoring_results(job.output, tailored_cv, cover_letter, job.job_description)
+
+    tailored = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(tailor, job): job for job in jobs}
+        for done, future in enumerate(as_completed(futures), 1):
+            job = futures[future]
+            try:
+                tailored.append((job, future.result()))
+                print(f"[{done}/{len(jobs)}] ✓ tailored {job.id} -> {job.output}")
+            except Exception as e:
+                results[job.id]['error'] = f"tailoring failed: {e}"
+                print(f"[{done}/{len(jobs)}] ✗ {job.id}: {e}")
+
+    if render and tailored:
+        from generate_cv import build_pdfs, output_pdf_path
+
+        # One browser pool per distinct template list; usually there is only one
+        groups = {}
+        for job, json_path in tailored:
+            groups.setdefault(tuple(job.templates), []).append((job, json_path))
+
+        for template_names, group in groups.items():
+            counts = build_pdfs([json_path for _, json_path in group], list(template_names),
+                                workers=browsers, force=force)
+            for job, json_path in group:
+                pdfs = [output_pdf_path(os.path.dirname(json_path), name) for name in template_names]
+                errors = [f"{path}: {counts['errors'][path]}" for path in [json_path] + pdfs
+                          if path in counts['errors']]
+                results[job.id]['pdfs'] = pdfs
+                if errors:
+                    results[job.id]['error'] = "PDF generation failed: " + "; ".join(errors)
+
+    return [results[job.id] for job in jobs]
+
+def write_report(path: str, results: list[dict]):
+    """Write one JSON line per job result."""
+    with open(path, 'w', encoding='utf-8') as f:
+        for result in results:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+def run_job_file(path: str, workers: int = 4, browsers: int = 2, backend_kind: str = None, force: bool = False,
+                 render: bool = True, report: str = None, pipeline: bool = False, processes: int = None,
+                 **defaults) -> int:
+    """
+    Load a job file, run it and return the exit code (see the module docstring).
+
+    With pipeline=True the stages overlap (scheduler.run_pipeline), using
+    workers as the number of LLM calls in flight and processes for resume
+    extraction and rendering.
+    """
+    try:
+        jobs = load_job_file(path, **defaults)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return EXIT_USAGE
+    print(f"Loaded {len(jobs)} jobs from {path}")
+
+    try:
+        backend = create_backend(backend_kind) if backend_kind else None
+        if pipeline:
+            from scheduler import run_pipeline
+            results = run_pipeline(jobs, processes, workers, browsers, backend, force, render)
+        else:
+            results = run_jobs(jobs, workers, browsers, backend, force, render)
+    except Exception as e:
+        print(f"Error: {e}")
+        return EXIT_FAILED
+
+    if report:
+        write_report(report, results)
+
+    failed = [result for result in results if result['error'] is not None]
+    for result in failed:
+        print(f"✗ {result['id']}: {result['error']}")
+    print(f"\n✓ {len(results) - len(failed)} of {len(results)} jobs succeeded")
+    return EXIT_FAILED if failed else EXIT_OK
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tailor CVs and print PDFs for every row of a job file.")
+    parser.add_argument("job_file", help="YAML or JSONL job file")
+    parser.add_argument("--workers", type=int, default=4, help="Rows tailored concurrently (default: 4)")
+    parser.add_argument("--browsers", type=int, default=2, help="Browsers printing PDFs in parallel (default: 2)")
+    parser.add_argument("--backend", choices=["gemini", "stub", "http"], default=None,
+                        help="LLM backend (default: LLM_BACKEND or gemini)")
+    parser.add_argument("--resume", default="resume", help="Default candidate resume folder or file (default: resume)")
+    parser.add_argument("--templates", nargs="+", default=None,
+                        help="Default templates for rows without a template list (default: all)")
+    parser.add_argument("--output", default="generated_result",
+                        help="Folder for per-row result folders (default: generated_result)")
+    parser.add_argument("--force", action="store_true", help="Rebuild PDFs even if they are up to date")
+    parser.add_argument("--no-pdf", action="store_true", help="Only tailor; do not print PDFs")
+    parser.add_argument("--report", metavar="PATH", help="Write one JSON line per row with its outcome")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Overlap extraction, tailoring, rendering and printing across rows")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Worker processes for extraction and rendering with --pipeline (default: CPU count)")
+    args = parser.parse_args()
+
+    if args.workers < 1 or args.browsers < 1 or (args.processes is not None and args.processes < 1):
+        parser.error("--workers, --browsers and --processes must be at least 1")
+
+    sys.exit(run_job_file(args.job_file, args.workers, args.browsers, args.backend, args.force,
+                          not args.no_pdf, args.report, args.pipeline, args.processes,
+                          resume=args.resume, templates=args.templates, output_dir=args.output))
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Pipelined scheduler for the extract -> tailor -> render -> print flow.
+
+run_jobs.run_jobs() runs the stages one after another: every row is
+tailored before the first PDF is printed. run_pipeline() runs them as a
+pipeline instead, so different rows are in different stages at once:
+
+    extract  Resume text extraction, on a process pool (PDF parsing is CPU-bound)
+    tailor   LLM calls, scheduled by asyncio; the backends are blocking
+             clients, so each call runs on a thread of a pool of that size
+    render   Input hashing and template population, on the same process pool
+    print    PDF printing, on a PdfRenderPool of warm browsers
+
+Stages are connected by bounded queues holding a few items per worker of
+the next stage, so a fast stage waits for a slow one instead of piling up
+work in memory, and throughput is set by the slowest stage rather than by
+the sum of all of them. The utilisation printed per stage at the end shows
+which stage that is.
+
+Outputs are the same as with run_jobs.py: result folders, build manifests
+(up-to-date PDFs are skipped) and the render cache.
+
+Usage:
+    python run_jobs.py jobs.yaml --pipeline --processes 4 --workers 16 --browsers 4
+"""
+
+import os
+import time
+import asyncio
+import functools
+import contextvars
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from main import save_tailoring_results, tailor_cv_and_generate_cover_letter
+from asset_inliner import inline_cv_image, inline_template_assets
+from build_manifest import BuildManifest
+from generate_cv import TEMPLATES_DIR, cached_html, output_pdf_path
+from pdf_render import PdfRenderPool, write_pdf
+from render_cache import get_pdf_store, pdf_inputs, render_key
+from run_jobs import read_candidate
+
+# Queue capacity per worker of the stage reading the queue
+QUEUE_DEPTH = 2
+
+# Put in a stage's queue after its last item
+_DONE = None
+
+# One PDF to bring up to date, and one populated page to print
+Page = namedtuple('Page', ['job', 'template_path', 'inlined_template', 'cv_data', 'output_path'])
+Printout = namedtuple('Printout', ['job', 'output_path', 'inputs', 'key', 'html'])
+
+def extract_resume(path: str) -> str:
+    """Process-pool task: resume text of a candidate, parsing PDFs in this process."""
+    return read_candidate(path, pdf_workers=0)
+
+def tailor_and_save(job, cv_content: str, backend) -> tuple[dict, str]:
+    """Thread-pool task: tailor a row and write its result folder. Returns (CV data, CV JSON path)."""
+    tailored_cv, cover_letter = tailor_cv_and_generate_cover_letter(
+        cv_content, job.job_description, job.image, backend=backend
+    )
+    return tailored_cv, save_tailoring_results(job.output, tailored_cv, cover_letter, job.job_description)
+
+def render_page(cv_data: dict, template_path: str, inlined_template: str, recorded_inputs,
+                use_cache: bool) -> tuple:
+    """
+    Process-pool task: hash a page's inputs and populate its HTML.
+
+    Returns (inputs, key, html). key is None when the inputs equal
+    recorded_inputs, i.e. the PDF is up to date. html is None when use_cache
+    is set and the render cache already has the PDF.
+    """
+    inlined_cv = inline_cv_image(cv_data)
+    inputs = pdf_inputs(cv_data, inlined_cv, template_path, inlined_template)
+    if inputs == recorded_inputs:
+        return inputs, None, None
+    key = render_key(inputs)
+    if use_cache and key in get_pdf_store():
+        return inputs, key, None
+    return inputs, key, cached_html(key, inlined_template, inlined_cv)
+
+class Stage:
+    """Workers taking items from a bounded queue, with counters for the final summary."""
+
+    def __init__(self, name: str, workers: int, handle):
+        self.name = name
+        self.workers = workers
+        # Coroutine function: item -> list of items for the next stage
+        self.handle = handle
+        self.queue = asyncio.Queue(maxsize=workers * QUEUE_DEPTH)
+        self.items = 0
+        self.failed = 0
+        self.busy = 0.0
+
+class Pipeline:
+    """
+    One run of jobs through the stages.
+
+    Usage:
+        results = asyncio.run(Pipeline(jobs, processes=4, llm_workers=16, browsers=4).run())
+    """
+
+    def __init__(self, jobs: list, processes: int = None, llm_workers: int = 8, browsers: int = 2,
+                 backend=None, force: bool = False, render: bool = True, templates_dir: str = TEMPLATES_DIR):
+        if llm_workers < 1 or browsers < 1 or (processes is not None and processes < 1):
+            raise ValueError("processes, llm_workers and browsers must be at least 1")
+        self.jobs = jobs
+        self.processes = processes or os.cpu_count() or 1
+        self.llm_workers = llm_workers
+        self.browsers = browsers
+        self.backend = backend
+        self.force = force
+        self.render = render
+        self.templates_dir = templates_dir
+
+        self.results = {job.id: {'id': job.id, 'folder': job.output, 'error': None, 'pdfs': []} for job in jobs}
+        self.counts = {'built': 0, 'cached': 0, 'skipped': 0, 'failed': 0}
+        self._pdf_errors = {job.id: [] for job in jobs}
+        self._resumes = {}
+        self._inlined = {}
+        self._manifests = {}
+        self._pdf_store = get_pdf_store()
+        self._process_pool = None
+        self._thread_pool = None
+        self._pdf_pool = None
+
+    async def _in_process(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._process_pool, func, *args)
+
+    async def _in_thread(self, func, *args):
+        # Keep the caller's span context, so spans in the thread nest under it
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._thread_pool, functools.partial(context.run, func, *args))
+
+    def _manifest(self, folder: str) -> BuildManifest:
+        manifest = self._manifests.get(folder)
+        if manifest is None:
+            manifest = self._manifests[folder] = BuildManifest(folder)
+        return manifest
+
+    async def _extract(self, job) -> list:
+        # Each candidate's resume is read once, however many rows use it
+        resume = self._resumes.get(job.candidate)
+        if resume is None:
+            resume = self._resumes[job.candidate] = asyncio.ensure_future(
+                self._in_process(extract_resume, job.candidate))
+        return [(job, await resume)]
+
+    async def _tailor(self, item) -> list:
+        job, cv_content = item
+        cv_data, json_path = await self._in_thread(tailor_and_save, job, cv_content, self.backend)
+        print(f"✓ tailored {job.id} -> {job.output}")
+        if not self.render:
+            return []
+
+        folder = os.path.dirname(json_path)
+        pages = []
+        for template_name in job.templates:
+            template_path = os.path.join(self.templates_dir, template_name)
+            output_path = output_pdf_path(folder, template_name)
+            self.results[job.id]['pdfs'].append(output_path)
+            pages.append(Page(job, template_path, self._inlined[template_name], cv_data, output_path))
+        return pages
+
+    async def _render(self, page: Page) -> list:
+        manifest = self._manifest(os.path.dirname(page.output_path))
+        recorded = None if self.force else manifest.recorded_inputs(page.output_path)
+        inputs, key, html = await self._in_process(render_page, page.cv_data, page.template_path,
+                                                   page.inlined_template, recorded, not self.force)
+        if key is None:
+            self.counts['skipped'] += 1
+            return []
+
+        if html is None:
+            pdf_bytes = self._pdf_store.get(key)
+            if pdf_bytes is not None:
+                write_pdf(pdf_bytes, page.output_path)
+                manifest.record(page.output_path, inputs)
+                self.counts['cached'] += 1
+                print(f"✓ CV PDF copied from the render cache: {page.output_path}")
+                return []
+            # Evicted since the worker looked: populate the page after all
+            inputs, key, html = await self._in_process(render_page, page.cv_data, page.template_path,
+                                                       page.inlined_template, None, False)
+        return [Printout(page.job, page.output_path, inputs, key, html)]
+
+    async def _print(self, printout: Printout) -> list:
+        if self._pdf_pool is None:
+            self._pdf_pool = PdfRenderPool(workers=self.browsers)
+        pdf_bytes = await asyncio.wrap_future(self._pdf_pool.submit(printout.html, printout.output_path))
+        self._pdf_store.put(printout.key, pdf_bytes)
+        self._manifest(os.path.dirname(printout.output_path)).record(printout.output_path, printout.inputs)
+        self.counts['built'] += 1
+        print(f"✓ CV PDF generated successfully: {printout.output_path}")
+        return []
+
+    def _fail(self, stage: Stage, item, error: Exception):
+        stage.failed += 1
+        if stage.name == 'extract':
+            self.results[item.id]['error'] = f"resume extraction failed: {error}"
+            print(f"✗ {item.id}: {error}")
+        elif stage.name == 'tailor':
+            self.results[item[0].id]['error'] = f"tailoring failed: {error}"
+            print(f"✗ {item[0].id}: {error}")
+        else:
+            if stage.name == 'print':
+                self._manifest(os.path.dirname(item.output_path)).discard(item.output_path)
+            self.counts['failed'] += 1
+            self._pdf_errors[item.job.id].append(f"{item.output_path}: {error}")
+            print(f"Error generating PDF for {item.output_path}: {error}")
+
+    async def _work(self, stage: Stage, next_stage: Stage):
+        while True:
+            item = await stage.queue.get()
+            if item is _DONE:
+                # Leave it for the stage's other workers
+                stage.queue.put_nowait(_DONE)
+                return
+
+            start = time.perf_counter()
+            try:
+                outputs = await stage.handle(item)
+            except Exception as e:
+                self._fail(stage, item, e)
+                outputs = []
+            stage.busy += time.perf_counter() - start
+            stage.items += 1
+
+            # Blocks while the next stage is behind, which holds this one back
+            for output in outputs:
+                await next_stage.queue.put(output)
+
+    async def _run_stage(self, stage: Stage, next_stage: Stage):
+        await asyncio.gather(*(self._work(stage, next_stage) for _ in range(stage.workers)))
+        if next_stage is not None:
+            await next_stage.queue.put(_DONE)
+
+    async def run(self) -> list[dict]:
+        """Run every job through the stages and return one result dict per job, in job order."""
+        # Fork the worker processes now, before any thread is started
+        self._process_pool = ProcessPoolExecutor(max_workers=self.processes)
+        self._process_pool.submit(os.getpid).result()
+        self._thread_pool = ThreadPoolExecutor(max_workers=self.llm_workers, thread_name_prefix="llm")
+
+        stages = [Stage('extract', self.processes, self._extract), Stage('tailor', self.llm_workers, self._tailor)]
+        if self.render:
+            for template_name in dict.fromkeys(name for job in self.jobs for name in job.templates):
+                self._inlined[template_name] = inline_template_assets(
+                    os.path.join(self.templates_dir, template_name))
+            # Keep every browser busy with one page queued behind the one it prints
+            stages += [Stage('render', self.processes, self._render), Stage('print', self.browsers * 2, self._print)]
+
+        start = time.perf_counter()
+        try:
+            runners = [asyncio.ensure_future(self._run_stage(stage, next_stage))
+                       for stage, next_stage in zip(stages, stages[1:] + [None])]
+            for job in self.jobs:
+                await stages[0].queue.put(job)
+            await stages[0].queue.put(_DONE)
+            await asyncio.gather(*runners)
+        finally:
+            if self._pdf_pool is not None:
+                await asyncio.get_running_loop().run_in_executor(None, self._pdf_pool.close)
+            self._thread_pool.shutdown()
+            self._process_pool.shutdown()
+            for manifest in self._manifests.values():
+                manifest.save()
+        elapsed = time.perf_counter() - start
+
+        for job_id, errors in self._pdf_errors.items():
+            if errors and self.results[job_id]['error'] is None:
+                self.results[job_id]['error'] = "PDF generation failed: " + "; ".join(errors)
+
+        if self.render:
+            print(f"{self.counts['built']} built, {self.counts['cached']} from cache, "
+                  f"{self.counts['skipped']} up to date, {self.counts['failed']} failed")
+        print(f"\n{'stage':<8} {'workers':>7} {'items':>6} {'failed':>6} {'busy s':>8} {'utilisation':>11}")
+        for stage in stages:
+            utilisation = stage.busy / (stage.workers * elapsed) if elapsed > 0 else 0.0
+            print(f"{stage.name:<8} {stage.workers:>7} {stage.items:>6} {stage.failed:>6} "
+                  f"{stage.busy:>8.2f} {utilisation:>11.0%}")
+        print(f"Finished {len(self.jobs)} jobs in {elapsed:.1f}s")
+
+        return [self.results[job.id] for job in self.jobs]
+
+def run_pipeline(jobs: list, processes: int = None, llm_workers: int = 8, browsers: int = 2, backend=None,
+                 force: bool = False, render: bool = True) -> list[dict]:
+    """
+    Run jobs (see run_jobs.load_job_file) through the pipelined stages.
+
+    Args:
+        jobs: Jobs to run.
+        processes: Worker processes for resume extraction and template rendering (default: CPU count).
+        llm_workers: LLM calls in flight at once.
+        browsers: Browsers printing PDFs in parallel.
+        backend: LLM backend (default: llm_backend.get_backend()).
+        force: Print every PDF again, even if it is up to date or cached.
+        render: Also render and print the PDFs; False only tailors.
+
+    Returns:
+        One dict per job, in job order, with id, folder, error (None on
+        success) and pdfs, as run_jobs.run_jobs() returns.
+    """
+    return asyncio.run(Pipeline(jobs, processes, llm_workers, browsers, backend, force, render).run())
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Streaming variant of the Gemini tailoring step.
+
+Uses Gemini's streaming generation and parses the response as it arrives:
+the tailored CV is emitted as soon as TAILORED_CV_END is received, and the
+cover letter is passed on chunk by chunk. Template rendering and PDF
+generation can then start while the model is still writing the cover letter.
+
+Run it like main.py, but without prompts:
+    python stream_tailor.py [TEMPLATE] [IMAGE]
+"""
+
+import os
+import sys
+import json
+from concurrent.futures import ThreadPoolExecutor
+from main import (
+    PROMPT_VERSION, TAILORING_SYSTEM_INSTRUCTION, apply_image, build_tailoring_prompt,
+    parse_tailored_cv_json, parse_tailoring_response, read_cv_from_resume_folder,
+    read_job_description,
+)
+from llm_backend import get_backend
+from tracing import span
+from prompt_compaction import compact_prompt_inputs, estimate_tokens
+from llm_cache import get_default_cache, make_cache_key
+
+CV_START = "TAILORED_CV_START"
+CV_END = "TAILORED_CV_END"
+LETTER_START = "COVER_LETTER_START"
+LETTER_END = "COVER_LETTER_END"
+
+class TailoringStreamParser:
+    """
+    Incremental parser for the TAILORED_CV / COVER_LETTER response format.
+
+    Feed it response chunks in order. on_cv(cv_data) is called once, as soon
+    as the CV section is complete. on_cover_letter_chunk(text) receives the
+    raw cover letter text as it streams; markers split across chunks are
+    handled by holding back a few characters until they can be ruled out.
+    """
+
+    def __init__(self, on_cv=None, on_cover_letter_chunk=None):
+        self.on_cv = on_cv
+        self.on_cover_letter_chunk = on_cover_letter_chunk
+        self.cv_data = None
+        self._parts = []
+        self._buffer = ''
+        self._state = 'before_cv'
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return ''.join(self._parts)
+
+    def feed(self, chunk: str):
+        """Process the next piece of the response."""
+        if not chunk:
+            return
+        self._parts.append(chunk)
+        self._buffer += chunk
+
+        while True:
+            if self._state == 'before_cv':
+                if not self._skip_to(CV_START):
+                    return
+                self._state = 'cv'
+            elif self._state == 'cv':
+                end = self._buffer.find(CV_END)
+                if end == -1:
+                    return
+                self.cv_data = parse_tailored_cv_json(self._buffer[:end])
+                self._buffer = self._buffer[end + len(CV_END):]
+                self._state = 'before_letter'
+                if self.on_cv is not None:
+                    self.on_cv(self.cv_data)
+            elif self._state == 'before_letter':
+                if not self._skip_to(LETTER_START):
+                    return
+                self._state = 'letter_start'
+            elif self._state == 'letter_start':
+                # The cover letter starts after the whitespace following the marker
+                self._buffer = self._buffer.lstrip()
+                if not self._buffer:
+                    return
+                self._state = 'letter'
+            elif self._state == 'letter':
+                end = self._buffer.find(LETTER_END)
+                if end != -1:
+                    self._emit_letter(self._buffer[:end])
+                    self._buffer = ''
+                    self._state = 'done'
+                else:
+                    # Keep enough text to recognise an end marker split across chunks
+                    keep = len(LETTER_END) - 1
+                    if len(self._buffer) > keep:
+                        self._emit_letter(self._buffer[:-keep])
+                        self._buffer = self._buffer[-keep:]
+                return
+            else:
+                self._buffer = ''
+                return
+
+    def close(self) -> tuple[dict, str]:
+        """
+        Finish parsing and return (cv_data, cover_letter).
+
+        The final result is parsed from the complete response, so it is
+        identical to main.parse_tailoring_response.
+        """
+        cv_data, cover_letter = parse_tailoring_response(self.text)
+        if self.cv_data is None:
+            self.cv_data = cv_data
+            if self.on_cv is not None:
+                self.on_cv(cv_data)
+        return self.cv_data, cover_letter
+
+    def _skip_to(self, marker: str) -> bool:
+        """Drop text up to and including marker. Returns False if it has not arrived yet."""
+        index = self._buffer.find(marker)
+        if index == -1:
+            # Keep a possible partial marker at the end of the buffer
+            self._buffer = self._buffer[-(len(marker) - 1):]
+            return False
+        self._buffer = self._buffer[index + len(marker):]
+        return True
+
+    def _emit_letter(self, text: str):
+        if text and self.on_cover_letter_chunk is not None:
+            self.on_cover_letter_chunk(text)
+
+def tailor_cv_streaming(cv_content: str, job_description: str, image_path: str = None,
+                        on_cv=None, on_cover_letter_chunk=None, use_cache: bool = True,
+                        backend=None, compact: bool = True) -> tuple[dict, str]:
+    """
+    Streaming version of main.tailor_cv_and_generate_cover_letter.
+
+    Args:
+        on_cv: Called with the tailored CV (image field applied) as soon as it is complete.
+        on_cover_letter_chunk: Called with raw cover letter text as it streams.
+        use_cache, backend, compact: As for tailor_cv_and_generate_cover_letter.
+
+    Returns:
+        (cv_data, cover_letter), the same as the non-streaming call.
+    """
+    if backend is None:
+        backend = get_backend()
+    with span("prompt.build", bytes_in=len(cv_content.encode('utf-8')) + len(job_description.encode('utf-8'))) as s:
+        if compact:
+            cv_content, job_description, _ = compact_prompt_inputs(cv_content, job_description)
+        prompt = build_tailoring_prompt(cv_content, job_description)
+        s.set(bytes_out=len(prompt.encode('utf-8')), tokens_out=estimate_tokens(prompt))
+
+    cache = get_default_cache() if use_cache else None
+    cache_key = make_cache_key(backend.model_name, PROMPT_VERSION, cv_content, job_description)
+
+    cached = cache.get(cache_key) if cache is not None else None
+    if cached is not None:
+        cv_data, cover_letter = cached
+        apply_image(cv_data, image_path)
+        if on_cv is not None:
+            on_cv(cv_data)
+        if on_cover_letter_chunk is not None:
+            on_cover_letter_chunk(cover_letter)
+        return cv_data, cover_letter
+
+    def emit_cv(cv_data):
+        if on_cv is not None:
+            on_cv(apply_image(dict(cv_data), image_path))
+
+    parser = TailoringStreamParser(emit_cv, on_cover_letter_chunk)
+    with span("llm.stream", model=backend.model_name,
+              tokens_in=estimate_tokens(prompt) + estimate_tokens(TAILORING_SYSTEM_INSTRUCTION)) as s:
+        received = []
+        for text in backend.stream(prompt, TAILORING_SYSTEM_INSTRUCTION):
+            received.append(text)
+            parser.feed(text)
+        response_text = ''.join(received)
+        s.set(bytes_out=len(response_text.encode('utf-8')), tokens_out=estimate_tokens(response_text))
+
+    cv_data, cover_letter = parser.close()
+    if cache is not None:
+        cache.put(cache_key, cv_data, cover_letter)
+    return apply_image(dict(cv_data), image_path), cover_letter
+
+if __name__ == "__main__":
+    # Tailor with streaming and start the PDF as soon as the CV section arrives
+    from generate_cv import render_cv_pdf
+
+    template_name = sys.argv[1] if len(sys.argv) > 1 else "temp1.html"
+    image_path = sys.argv[2] if len(sys.argv) > 2 else None
+    output_folder = "generated_result"
+
+    try:
+        job_description = read_job_description()
+        cv_content = read_cv_from_resume_folder()
+
+        if not os.path.exists(output_folder):
+            os.makedirs(output_folder)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pdf_future = None
+
+            def start_pdf(cv_data):
+                global pdf_future
+                cv_path = os.path.join(output_folder, "tailored_cv.json")
+                with open(cv_path, 'w', encoding='utf-8') as f:
+                    json.dump(cv_data, f, indent=2, ensure_ascii=False)
+                print(f"\n[Saved {cv_path}; generating PDF in the background]\n")
+                template_path = os.path.join("templates", template_name)
+                output_path = os.path.join(output_folder, template_name.replace('.html', '_cv.pdf'))
+                pdf_future = executor.submit(render_cv_pdf, cv_data, template_path, output_path)
+
+            print("Processing with Gemini API (streaming)...\n")
+            tailored_cv, cover_letter = tailor_cv_streaming(
+                cv_content, job_description, image_path,
+                on_cv=start_pdf,
+                on_cover_letter_chunk=lambda text: print(text, end='', flush=True),
+            )
+            print()
+
+            letter_path = os.path.join(output_folder, "cover_letter.md")
+            with open(letter_path, 'w', encoding='utf-8') as f:
+                f.write(cover_letter)
+            print(f"Saved to {letter_path}")
+
+            if pdf_future is not None:
+                pdf_future.result()
+                print(f"✓ CV PDF generated: {os.path.join(output_folder, template_name.replace('.html', '_cv.pdf'))}")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
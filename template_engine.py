@@ -0,0 +1,373 @@
+"""
+Compiled template engine for the HTML CV templates.
+
+Templates are parsed once into a node tree (text, variable, section, list)
+and rendered in a single linear walk, instead of re-running regex passes over
+the whole HTML string for every loop item and conditional.
+
+The syntax and output are the same as main.process_template_recursive:
+- Simple placeholders: {{field}} or {{nested.field}}
+- Conditionals: {{#field}}...{{/field}}
+- Loops: {{#name_list}}...{{/name_list}} over the list stored in `name`
+
+Names are resolved against a ContextStack: loop items are pushed as scopes
+on top of the CV data instead of being merged into a copy of it.
+
+Compiling also indexes the template (TemplateIndex): the names, sections
+and list item aliases it uses, and any malformed or unbalanced tags.
+"""
+
+import os
+import re
+from functools import lru_cache
+
+# One tag per match: section open, section close, or placeholder
+TAG_PATTERN = re.compile(r'\{\{(?:#(\w+)|/(\w+)|([^#/][^}]*))\}\}')
+
+# What a placeholder may contain: a name or a dotted path
+FIELD_NAME_PATTERN = re.compile(r'\w+(?:\.\w+)*')
+
+
+class ScopeMapping:
+    """
+    Base for non-dict objects that templates can look names up in.
+
+    Subclasses implement `key in obj` and `obj[key]`. List items that are
+    ScopeMappings are pushed as scopes just like dict items.
+    """
+    __slots__ = ()
+
+    def __contains__(self, key) -> bool:
+        raise NotImplementedError
+
+    def __getitem__(self, key):
+        raise NotImplementedError
+
+
+@lru_cache(maxsize=4096)
+def key_path(key: str) -> tuple:
+    """Split a dotted key into its parts, caching the result ('contact.email' -> ('contact', 'email'))."""
+    return tuple(key.split('.'))
+
+
+class ContextStack:
+    """
+    Chain of scopes that names are looked up in, innermost last.
+
+    Entering a loop item pushes the item as a new scope and leaving it pops
+    the scope, so nested sections see the item's keys first and everything
+    else from the enclosing scopes, without copying any of them.
+    """
+    __slots__ = ('scopes',)
+
+    def __init__(self, scopes: list = None):
+        self.scopes = list(scopes) if scopes else []
+
+    def push(self, scope):
+        self.scopes.append(scope)
+
+    def pop(self):
+        return self.scopes.pop()
+
+    def lookup(self, path: tuple):
+        """Resolve a key path tuple, or None if it is not defined."""
+        return resolve(self.scopes, path)
+
+    def get(self, key: str):
+        """Resolve a dotted key string, or None if it is not defined."""
+        return resolve(self.scopes, key_path(key))
+
+
+class TextNode:
+    """Literal template text."""
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def render(self, context: ContextStack, out: list):
+        out.append(self.text)
+
+
+class VariableNode:
+    """Placeholder such as {{name}} or {{contact.email}}."""
+    __slots__ = ('name', 'path')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.path = key_path(name)
+
+    def render(self, context: ContextStack, out: list):
+        value = context.lookup(self.path)
+        if value is None or isinstance(value, (list, dict, ScopeMapping)):
+            return
+        out.append(str(value))
+
+
+class SectionNode:
+    """Conditional block rendered once when its field is truthy."""
+    __slots__ = ('name', 'path', 'children')
+
+    def __init__(self, name: str, children: list):
+        self.name = name
+        self.path = (name,)
+        self.children = children
+
+    def render(self, context: ContextStack, out: list):
+        if not is_truthy(context.lookup(self.path)):
+            return
+        for child in self.children:
+            child.render(context, out)
+
+
+class ListNode:
+    """Loop block rendered once per item of the list it refers to."""
+    __slots__ = ('name', 'path', 'item_alias', 'children')
+
+    def __init__(self, name: str, body: str, children: list):
+        self.name = name
+        # 'skills_list' -> 'skills'
+        self.path = (name.replace('_list', ''),)
+        self.item_alias = guess_item_alias(body)
+        self.children = children
+
+    def render(self, context: ContextStack, out: list):
+        items = context.lookup(self.path)
+        if not isinstance(items, list):
+            return
+
+        children = self.children
+        for item in items:
+            if isinstance(item, (dict, ScopeMapping)):
+                context.push(item)
+            elif isinstance(item, str):
+                context.push({self.item_alias: item})
+            else:
+                context.push({})
+            for child in children:
+                child.render(context, out)
+            context.pop()
+
+
+class TemplateIndex:
+    """
+    What a compiled template uses, collected once when it is parsed.
+
+    - fields: every name the template looks up, i.e. the first part of each
+      placeholder path, section names and list fields ('skills' for
+      {{#skills_list}}), at any depth
+    - sections: names of the conditional sections
+    - lists: list field -> key its string items are exposed under
+    - problems: (line, message) for tags that are kept as literal text
+      because they are unbalanced or malformed
+    """
+    __slots__ = ('fields', 'sections', 'lists', 'problems')
+
+    def __init__(self, nodes: list, problems: list):
+        fields = set()
+        sections = set()
+        lists = {}
+
+        def visit(nodes):
+            for node in nodes:
+                if isinstance(node, VariableNode):
+                    fields.add(node.path[0])
+                elif isinstance(node, SectionNode):
+                    fields.add(node.name)
+                    sections.add(node.name)
+                    visit(node.children)
+                elif isinstance(node, ListNode):
+                    fields.add(node.path[0])
+                    lists.setdefault(node.path[0], node.item_alias)
+                    visit(node.children)
+
+        visit(nodes)
+        self.fields = frozenset(fields)
+        self.sections = frozenset(sections)
+        self.lists = lists
+        self.problems = sorted(problems)
+
+    def uses(self, name: str) -> bool:
+        """Whether the template looks up name anywhere."""
+        return name in self.fields
+
+
+class CompiledTemplate:
+    """A parsed template that can be rendered many times."""
+    __slots__ = ('nodes', 'index')
+
+    def __init__(self, nodes: list, problems: list = None):
+        self.nodes = nodes
+        self.index = TemplateIndex(nodes, problems or [])
+
+    def render(self, data) -> str:
+        """
+        Render the template against CV data.
+
+        data is a dictionary, a ScopeMapping (e.g. cv_model.CV) or a
+        ContextStack, e.g. the CV data with a scope of derived fields on top.
+        """
+        context = data if isinstance(data, ContextStack) else ContextStack([data])
+        out = []
+        for node in self.nodes:
+            node.render(context, out)
+        return ''.join(out)
+
+
+def guess_item_alias(body: str) -> str:
+    """Pick the key string list items are exposed under, based on the loop body."""
+    lowered = body.lower()
+    if 'skill' in lowered:
+        return 'skill'
+    elif 'language' in lowered:
+        return 'language'
+    elif 'certification' in lowered:
+        return 'certification'
+    elif 'tech' in lowered:
+        return 'tech'
+    return 'item'
+
+
+def is_truthy(value) -> bool:
+    """Truthiness used by conditionals: non-empty lists, non-blank strings, anything else not None."""
+    if isinstance(value, list):
+        return len(value) > 0
+    elif isinstance(value, str):
+        return bool(value.strip())
+    return value is not None
+
+
+def resolve(scopes: list, path: tuple):
+    """Look up a dotted key path, starting from the innermost scope that defines its first key."""
+    first = path[0]
+    for scope in reversed(scopes):
+        if first in scope:
+            value = scope[first]
+            break
+    else:
+        return None
+
+    for key in path[1:]:
+        if isinstance(value, (dict, ScopeMapping)) and key in value:
+            value = value[key]
+        else:
+            return None
+    return value
+
+
+def compile_template(source: str) -> CompiledTemplate:
+    """
+    Parse template source into a CompiledTemplate.
+
+    Unclosed section tags and stray closing tags are kept as literal text,
+    matching how the regex-based renderer leaves them in the output. They
+    are reported in the template's index.problems, as are malformed
+    placeholders.
+    """
+    root = []
+    # Each open section: (name, children, open_tag_text, body_start)
+    stack = []
+    children = root
+    pos = 0
+    problems = []
+
+    def problem(offset, message):
+        problems.append((source.count('\n', 0, offset) + 1, message))
+
+    def unwind(entry):
+        # Turn an unclosed section back into literal text in its parent
+        name, section_children, open_text, body_start = entry
+        problem(body_start - len(open_text), f"{open_text} is never closed")
+        parent = stack[-1][1] if stack else root
+        parent.append(TextNode(open_text))
+        parent.extend(section_children)
+
+    def text(start, end):
+        # Braces the tag pattern did not match, e.g. {{# name}} or {{my-field}}
+        brace = source.find('{{', start, end)
+        if brace != -1:
+            close = source.find('}}', brace, end)
+            tag = source[brace:close + 2] if close != -1 else source[brace:brace + 20] + '...'
+            problem(brace, f"unrecognised tag {tag}")
+        children.append(TextNode(source[start:end]))
+
+    for match in TAG_PATTERN.finditer(source):
+        if match.start() > pos:
+            text(pos, match.start())
+        pos = match.end()
+
+        open_name, close_name, placeholder = match.groups()
+
+        if open_name is not None:
+            stack.append((open_name, [], match.group(0), match.end()))
+            children = stack[-1][1]
+        elif close_name is not None:
+            if not any(entry[0] == close_name for entry in stack):
+                problem(match.start(), f"{match.group(0)} has no matching {{{{#{close_name}}}}}")
+                children.append(TextNode(match.group(0)))
+                continue
+            while stack[-1][0] != close_name:
+                unwind(stack.pop())
+            name, section_children, _, body_start = stack.pop()
+            if name.endswith('_list'):
+                node = ListNode(name, source[body_start:match.start()], section_children)
+            else:
+                node = SectionNode(name, section_children)
+            children = stack[-1][1] if stack else root
+            children.append(node)
+        else:
+            field_name = placeholder.strip()
+            if field_name.startswith('#') or field_name.startswith('/'):
+                problem(match.start(), f"malformed section tag {match.group(0)}")
+                children.append(TextNode(match.group(0)))
+            else:
+                if not FIELD_NAME_PATTERN.fullmatch(field_name):
+                    problem(match.start(), f"malformed placeholder {match.group(0)}")
+                children.append(VariableNode(field_name))
+
+    if pos < len(source):
+        text(pos, len(source))
+
+    while stack:
+        unwind(stack.pop())
+
+    return CompiledTemplate(_merge_text(root), problems)
+
+
+def _merge_text(nodes: list) -> list:
+    """Join adjacent text nodes so rendering appends fewer strings."""
+    merged = []
+    for node in nodes:
+        if isinstance(node, (SectionNode, ListNode)):
+            node.children = _merge_text(node.children)
+        if isinstance(node, TextNode) and merged and isinstance(merged[-1], TextNode):
+            merged[-1] = TextNode(merged[-1].text + node.text)
+        else:
+            merged.append(node)
+    return merged
+
+
+# Compiled templates keyed by absolute path, invalidated when the file changes
+_template_cache = {}
+
+
+def load_template(template_path: str) -> CompiledTemplate:
+    """Read and compile a template file, reusing the cached tree while the file is unchanged."""
+    abs_path = os.path.abspath(template_path)
+    stat = os.stat(abs_path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _template_cache.get(abs_path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    with open(abs_path, 'r', encoding='utf-8') as f:
+        compiled = compile_template(f.read())
+
+    _template_cache[abs_path] = (stamp, compiled)
+    return compiled
+
+
+def clear_template_cache():
+    """Drop all compiled templates, e.g. after editing templates in place."""
+    _template_cache.clear()
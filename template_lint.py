@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Lint HTML CV templates.
+
+Reports what the template engine finds while compiling a template
+(unbalanced section tags, malformed placeholders), plus names the CV data
+can never provide: placeholders, sections and lists that are neither CV
+fields (cv_model), derived fields (job_title, *_display,
+languages_comma_separated) nor, inside a loop, fields of the loop item.
+
+Usage:
+    python template_lint.py                      # every template in templates/
+    python template_lint.py templates/temp1.html
+
+Exits with 1 if any template has problems.
+"""
+
+import os
+import sys
+import typing
+import dataclasses
+from cv_model import CV, _CV_DERIVED
+from template_engine import ListNode, SectionNode, VariableNode, load_template
+
+TEMPLATES_DIR = "templates"
+
+def _fields(cls) -> dict:
+    """Field name -> item type for the list fields of a cv_model class, None for the others."""
+    fields = {}
+    for field in dataclasses.fields(cls):
+        if field.name == 'extra':
+            continue
+        args = typing.get_args(field.type) if typing.get_origin(field.type) is list else ()
+        fields[field.name] = args[0] if args else None
+    return fields
+
+def lint_compiled(compiled) -> list[tuple[int, str]]:
+    """(line, message) for every problem in a compiled template, in line order where known."""
+    problems = list(compiled.index.problems)
+    unknown = []
+
+    def check(nodes, scopes):
+        # scopes: known name -> list item type (or None), innermost last
+        def known(name):
+            return any(name in scope for scope in scopes)
+
+        for node in nodes:
+            if isinstance(node, VariableNode):
+                if not known(node.path[0]):
+                    unknown.append(f"unknown field {{{{{node.name}}}}}")
+            elif isinstance(node, SectionNode):
+                if not known(node.name):
+                    unknown.append(f"unknown section {{{{#{node.name}}}}}")
+                check(node.children, scopes)
+            elif isinstance(node, ListNode):
+                field = node.path[0]
+                item_type = next((scope[field] for scope in reversed(scopes) if field in scope), None)
+                if item_type is None:
+                    unknown.append(f"{{{{#{node.name}}}}} loops over {field!r}, which is not a list field")
+                    check(node.children, scopes)
+                elif item_type is str:
+                    check(node.children, scopes + [{node.item_alias: None}])
+                else:
+                    check(node.children, scopes + [_fields(item_type)])
+
+    check(compiled.nodes, [{**_fields(CV), **dict.fromkeys(_CV_DERIVED)}])
+    # The node tree keeps no line numbers; unknown names are reported after the tag problems
+    problems += [(None, message) for message in dict.fromkeys(unknown)]
+    return problems
+
+def lint_template(template_path: str) -> list[str]:
+    """Problems found in a template file, as "path:line: message" strings."""
+    messages = []
+    for line, message in lint_compiled(load_template(template_path)):
+        location = f"{template_path}:{line}" if line is not None else template_path
+        messages.append(f"{location}: {message}")
+    return messages
+
+if __name__ == "__main__":
+    paths = sys.argv[1:]
+    if not paths:
+        if not os.path.isdir(TEMPLATES_DIR):
+            print(f"Error: {TEMPLATES_DIR} folder not found")
+            sys.exit(1)
+        paths = [os.path.join(TEMPLATES_DIR, name)
+                 for name in sorted(os.listdir(TEMPLATES_DIR)) if name.endswith('.html')]
+
+    failed = 0
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"{path}: file not found")
+            failed += 1
+            continue
+        messages = lint_template(path)
+        for message in messages:
+            print(message)
+        failed += bool(messages)
+
+    print(f"{len(paths) - failed} of {len(paths)} templates OK")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,145 @@
+import os
+import re
+import sys
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdf_render
+from pdf_render import PdfRenderPool
+from render_cache import HtmlCache, PdfStore
+from render_service import RenderService
+
+PIXEL = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+INJECTED = '<img src="http://attacker.example/ping.png">'
+
+
+class FakeBrowserLog:
+    """What the fake browser was asked to do: page options and the URLs it loaded or blocked."""
+
+    def __init__(self):
+        self.page_options = []
+        self.fetched = []
+        self.aborted = []
+
+
+class FakeRoute:
+    def __init__(self, url, log):
+        self.request = type('Request', (), {'url': url})()
+        self.log = log
+
+    def continue_(self):
+        if not self.request.url.startswith('data:'):
+            self.log.fetched.append(self.request.url)
+
+    def abort(self):
+        self.log.aborted.append(self.request.url)
+
+
+class FakePage:
+    def __init__(self, log):
+        self.log = log
+        self.routes = []
+        self.content = ''
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+    def on(self, event, handler):
+        pass
+
+    def set_default_timeout(self, timeout):
+        pass
+
+    def route(self, pattern, handler):
+        self.routes.append(handler)
+
+    def set_content(self, html, **kwargs):
+        # Request every src/href in the page, as a browser loading subresources would
+        self.content = html
+        for url in re.findall(r'(?:src|href)="([^"]+)"', html):
+            if self.routes:
+                self.routes[-1](FakeRoute(url, self.log))
+            elif not url.startswith('data:'):
+                self.log.fetched.append(url)
+
+    def evaluate(self, expression, *args):
+        return 'loaded'
+
+    def pdf(self, **kwargs):
+        return b'%PDF-fake'
+
+
+def fake_playwright(log):
+    class Browser:
+        def is_connected(self):
+            return True
+
+        def new_page(self, **options):
+            log.page_options.append(options)
+            return FakePage(log)
+
+        def close(self):
+            pass
+
+    class Chromium:
+        def launch(self, **kwargs):
+            return Browser()
+
+    class Playwright:
+        chromium = Chromium()
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            pass
+
+    return Playwright
+
+
+def test_pool_blocks_network_only_when_asked(monkeypatch):
+    log = FakeBrowserLog()
+    monkeypatch.setattr(pdf_render, 'sync_playwright', fake_playwright(log))
+    html = f'<html><body><img src="{PIXEL}">{INJECTED}</body></html>'
+
+    with PdfRenderPool(workers=1) as pool:
+        pool.render(html)
+    assert log.fetched == ['http://attacker.example/ping.png']
+
+    log.fetched.clear()
+    with PdfRenderPool(workers=1, block_network=True, javascript=False) as pool:
+        pool.render(html)
+    assert log.fetched == []
+    assert log.aborted == ['http://attacker.example/ping.png']
+    assert log.page_options[-1] == {'java_script_enabled': False}
+
+
+def test_injected_markup_in_cv_field_triggers_no_request(tmp_path, monkeypatch):
+    log = FakeBrowserLog()
+    monkeypatch.setattr(pdf_render, 'sync_playwright', fake_playwright(log))
+    # Inlined templates are cached relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    (templates / "plain.html").write_text(
+        '<html><body><img src="{{image}}"><h1>{{name}}</h1><p>{{summary}}</p></body></html>', encoding='utf-8')
+
+    async def render():
+        service = RenderService(templates_dir=str(templates), browsers=1, html_cache=HtmlCache(),
+                                pdf_store=PdfStore(str(tmp_path / "pdfs")))
+        await service.start()
+        try:
+            return await service.render('plain.html', 'pdf', {
+                'name': 'Jane Doe', 'image': PIXEL, 'summary': f'Engineer {INJECTED}'})
+        finally:
+            await service.close()
+
+    assert asyncio.run(render()) == b'%PDF-fake'
+    assert log.fetched == []
+    assert log.aborted == ['http://attacker.example/ping.png']
+    assert all(options == {'java_script_enabled': False} for options in log.page_options)
@@ -0,0 +1,28 @@
+import os
+import sys
+import shutil
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resume_reader import CACHE_FOLDER, STAMPS_FOLDER, ingest_resumes
+
+
+def test_threaded_ingestion_returns_every_record(tmp_path):
+    # Files share their content in groups of eight, so threads write the same cached text file at once;
+    # the text is long enough for those writes to overlap
+    skills = "Skills: Python, SQL\n" * 20000
+    for i in range(64):
+        (tmp_path / f"resume{i:02d}.txt").write_text(f"Candidate {i % 8}\n{skills}", encoding='utf-8')
+    cache_dir = tmp_path / CACHE_FOLDER
+
+    for _ in range(10):
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        records = list(ingest_resumes(str(tmp_path), workers=16, use_processes=False))
+        assert len(records) == 64
+        assert [r.error for r in records if r.error is not None] == []
+        for record in records:
+            index = int(os.path.basename(record.path)[6:8])
+            assert record.text.strip() == f"Candidate {index % 8}\n{skills}".strip()
+
+        assert len(os.listdir(cache_dir / STAMPS_FOLDER)) == 64
+        assert not [name for name in os.listdir(cache_dir) if name.endswith('.tmp')]
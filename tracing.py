@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Lightweight tracing and metrics for the tailoring and PDF pipeline.
+
+Stages are wrapped in spans:
+
+    with span("llm.generate", tokens_in=1200) as s:
+        response = backend.generate(prompt)
+        s.set(bytes_out=len(response))
+
+Every finished span updates in-process metrics (a duration histogram per
+stage, plus totals of bytes_in, bytes_out, tokens_in and tokens_out and an
+error count), which costs a few microseconds. Spans nest through
+contextvars, so a span started inside another one (in the same thread or
+task) gets its trace and parent id.
+
+Export is configured by environment variables, read on the first span:
+
+    CV_TRACE_FILE    Append one JSON line per span to this file
+    CV_METRICS_FILE  Write the metrics in Prometheus text format to this file
+                     when the process exits (for the node_exporter textfile
+                     collector, suited to batch runs)
+    CV_METRICS_PORT  Serve the metrics at http://<host>:<port>/metrics
+                     (for long-running processes)
+
+Worker processes (process pools) only write trace lines: the metrics file
+and endpoint belong to the main process. Export failures print a warning
+and never propagate out of a span.
+
+To summarise a trace file per stage:
+
+    python tracing.py trace.jsonl
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+import multiprocessing
+import contextvars
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRIC_PREFIX = "cv_pipeline"
+
+# Histogram buckets for stage durations, in seconds
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Numeric span attributes that are also summed per stage
+COUNTED_ATTRIBUTES = ('bytes_in', 'bytes_out', 'tokens_in', 'tokens_out')
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+class Span:
+    """One timed stage. Attributes can be added with set() until the span ends."""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'start_time', 'duration', 'attributes', 'error')
+
+    def __init__(self, name: str, parent, attributes: dict):
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start_time = time.time()
+        self.duration = None
+        self.attributes = attributes
+        self.error = None
+
+    def set(self, **attributes):
+        """Add or update attributes such as bytes_out or tokens_in."""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start': self.start_time,
+            'duration_ms': round(self.duration * 1000, 3),
+            'pid': os.getpid(),
+            'thread': threading.current_thread().name,
+            'error': self.error,
+            'attributes': self.attributes,
+        }
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class Metrics:
+    """Per-stage duration histograms and counters, rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # stage -> [bucket counts..., +Inf count, sum]
+            self._durations = {}
+            self._counters = {attribute: {} for attribute in COUNTED_ATTRIBUTES}
+            self._errors = {}
+
+    def observe(self, span: Span):
+        """Record a finished span."""
+        with self._lock:
+            histogram = self._durations.get(span.name)
+            if histogram is None:
+                histogram = self._durations[span.name] = [0] * (len(DURATION_BUCKETS) + 1) + [0.0]
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if span.duration <= bound:
+                    histogram[i] += 1
+            histogram[-2] += 1
+            histogram[-1] += span.duration
+
+            for attribute in COUNTED_ATTRIBUTES:
+                value = span.attributes.get(attribute)
+                if isinstance(value, (int, float)):
+                    counter = self._counters[attribute]
+                    counter[span.name] = counter.get(span.name, 0) + value
+            if span.error is not None:
+                self._errors[span.name] = self._errors.get(span.name, 0) + 1
+
+    def render(self) -> str:
+        """The metrics in Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            name = f"{METRIC_PREFIX}_stage_duration_seconds"
+            lines += [f"# HELP {name} Time spent in each pipeline stage.", f"# TYPE {name} histogram"]
+            for stage, histogram in sorted(self._durations.items()):
+                label = f'stage="{_escape_label(stage)}"'
+                for bound, count in zip(DURATION_BUCKETS, histogram):
+                    lines.append(f'{name}_bucket{{{label},le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{{label},le="+Inf"}} {histogram[-2]}')
+                lines.append(f'{name}_sum{{{label}}} {histogram[-1]}')
+                lines.append(f'{name}_count{{{label}}} {histogram[-2]}')
+
+            for attribute in COUNTED_ATTRIBUTES:
+                name = f"{METRIC_PREFIX}_stage_{attribute}_total"
+                lines += [f"# HELP {name} Sum of {attribute} over pipeline stages.", f"# TYPE {name} counter"]
+                for stage, value in sorted(self._counters[attribute].items()):
+                    lines.append(f'{name}{{stage="{_escape_label(stage)}"}} {value}')
+
+            name = f"{METRIC_PREFIX}_stage_errors_total"
+            lines += [f"# HELP {name} Pipeline stages that raised.", f"# TYPE {name} counter"]
+            for stage, value in sorted(self._errors.items()):
+                lines.append(f'{name}{{stage="{_escape_label(stage)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+class TraceWriter:
+    """Appends spans to a JSONL file, one line each, safely from many threads."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write(self, span: Span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+METRICS = Metrics()
+
+_trace_writer = None
+_configured = False
+_config_lock = threading.Lock()
+_export_failed = False
+
+def configure(trace_file: str = None, metrics_file: str = None, metrics_port: int = None,
+              metrics_host: str = "127.0.0.1"):
+    """
+    Set up span export explicitly instead of through the environment.
+
+    Args:
+        trace_file: Append every span as a JSON line to this file.
+        metrics_file: Write Prometheus metrics to this file at exit.
+        metrics_port: Serve Prometheus metrics on this port (0 or None: do not serve).
+        metrics_host: Interface the metrics endpoint listens on.
+    """
+    with _config_lock:
+        _configure(trace_file, metrics_file, metrics_port, metrics_host)
+
+def _configure(trace_file, metrics_file, metrics_port, metrics_host):
+    # Called with _config_lock held. Exporters that cannot start are skipped with a warning.
+    global _trace_writer, _configured
+    _configured = True
+    if _trace_writer is not None:
+        _trace_writer.close()
+        _trace_writer = None
+    if trace_file:
+        try:
+            _trace_writer = TraceWriter(trace_file)
+        except OSError as e:
+            print(f"Warning: not writing trace to {trace_file}: {e}")
+    if metrics_file:
+        atexit.register(_write_metrics_at_exit, metrics_file)
+    if metrics_port:
+        try:
+            serve_metrics(metrics_port, metrics_host)
+        except OSError as e:
+            print(f"Warning: not serving metrics on {metrics_host}:{metrics_port}: {e}")
+
+def _configure_from_env():
+    with _config_lock:
+        if _configured:
+            return
+        # Pool workers would all write the same metrics file and bind the same port
+        main_process = multiprocessing.parent_process() is None
+        port = os.getenv("CV_METRICS_PORT") if main_process else None
+        try:
+            port = int(port) if port else None
+        except ValueError:
+            print(f"Warning: ignoring invalid CV_METRICS_PORT: {port}")
+            port = None
+        _configure(
+            trace_file=os.getenv("CV_TRACE_FILE"),
+            metrics_file=os.getenv("CV_METRICS_FILE") if main_process else None,
+            metrics_port=port,
+            metrics_host=os.getenv("CV_METRICS_HOST", "127.0.0.1"),
+        )
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Time a pipeline stage.
+
+    Yields the Span, so attributes known only at the end (bytes_out, ...)
+    can be added with span.set(). An exception is recorded on the span and
+    re-raised.
+    """
+    if not _configured:
+        _configure_from_env()
+
+    current = Span(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        current.duration = time.perf_counter() - start
+        _current_span.reset(token)
+        try:
+            METRICS.observe(current)
+            writer = _trace_writer
+            if writer is not None:
+                writer.write(current)
+        except Exception as e:
+            _report_export_failure(e)
+
+def _report_export_failure(error: Exception):
+    # Tracing must never break the stage it measures; warn once and carry on
+    global _export_failed
+    if not _export_failed:
+        _export_failed = True
+        print(f"Warning: exporting spans failed: {error}")
+
+def current_span():
+    """The innermost active span in this thread or task, or None."""
+    return _current_span.get()
+
+def write_metrics(path: str):
+    """Write the metrics in Prometheus text format, atomically."""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(METRICS.render())
+    os.replace(temp_path, path)
+
+def _write_metrics_at_exit(path: str):
+    try:
+        write_metrics(path)
+    except OSError as e:
+        print(f"Warning: could not write metrics to {path}: {e}")
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = METRICS.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_metrics(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics from a daemon thread and return the server (call shutdown() to stop it)."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+def summarize_trace(path: str) -> list[dict]:
+    """Per-stage count, error count, p50/p99/total milliseconds and summed counters of a trace file."""
+    stages = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            stage = stages.setdefault(record['name'], {'durations': [], 'errors': 0,
+                                                       **{a: 0 for a in COUNTED_ATTRIBUTES}})
+            stage['durations'].append(record['duration_ms'])
+            stage['errors'] += record['error'] is not None
+            for attribute in COUNTED_ATTRIBUTES:
+                value = record['attributes'].get(attribute)
+                if isinstance(value, (int, float)):
+                    stage[attribute] += value
+
+    rows = []
+    for name, stage in sorted(stages.items()):
+        durations = sorted(stage.pop('durations'))
+        rows.append({
+            'stage': name,
+            'count': len(durations),
+            'p50_ms': durations[(len(durations) - 1) // 2],
+            'p99_ms': durations[min(len(durations) - 1, int(len(durations) * 0.99))],
+            'total_ms': sum(durations),
+            **stage,
+        })
+    return rows
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python tracing.py TRACE_JSONL")
+        sys.exit(1)
+
+    print(f"{'stage':<22} {'count':>6} {'errors':>6} {'p50 ms':>9} {'p99 ms':>9} {'total ms':>10} "
+          f"{'bytes in':>10} {'bytes out':>10} {'tokens in':>9} {'tokens out':>10}")
+    for row in summarize_trace(sys.argv[1]):
+        print(f"{row['stage']:<22} {row['count']:>6} {row['errors']:>6} {row['p50_ms']:>9.1f} {row['p99_ms']:>9.1f} "
+              f"{row['total_ms']:>10.1f} {row['bytes_in']:>10} {row['bytes_out']:>10} "
+              f"{row['tokens_in']:>9} {row['tokens_out']:>10}")